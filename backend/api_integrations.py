@@ -1,9 +1,15 @@
 import requests
 import json
 import time
+import datetime
 import numpy as np
-from typing import Dict, Optional, Tuple
+from contextlib import nullcontext
+from typing import Callable, Dict, Optional, Tuple
 from geopy.geocoders import Nominatim
+from metrics import UPSTREAM_ERRORS
+
+def _untimed(stage: str):
+    return nullcontext()
 
 class WeatherAPI:
     """Integration with weather APIs for real-time data."""
@@ -34,6 +40,7 @@ class WeatherAPI:
                 return 28.6139, 77.2090  # Default to Delhi, India
         except Exception as e:
             print(f"Geocoding error: {e}")
+            UPSTREAM_ERRORS.inc(service='geocode')
             return 28.6139, 77.2090  # Default to Delhi, India
     
     def get_weather_data(self, lat: float, lon: float) -> Dict:
@@ -65,6 +72,7 @@ class WeatherAPI:
             }
         except Exception as e:
             print(f"Weather API error: {e}")
+            UPSTREAM_ERRORS.inc(service='weather')
             return self._get_mock_weather_data(lat, lon)
     
     def _get_mock_weather_data(self, lat: float, lon: float) -> Dict:
@@ -139,12 +147,11 @@ class NDVIAPI:
             }
         except Exception as e:
             print(f"NDVI API error: {e}")
+            UPSTREAM_ERRORS.inc(service='ndvi')
             return self._get_mock_ndvi_data(lat, lon)
     
     def _get_mock_ndvi_data(self, lat: float, lon: float) -> Dict:
         """Generate mock NDVI data based on location and season."""
-        import datetime
-        
         # Seasonal variation
         month = datetime.datetime.now().month
         if month in [12, 1, 2]:  # Winter
@@ -206,6 +213,7 @@ class SoilMoistureAPI:
             }
         except Exception as e:
             print(f"Soil moisture API error: {e}")
+            UPSTREAM_ERRORS.inc(service='soil')
             return self._estimate_soil_moisture(lat, lon, weather_data)
     
     def _estimate_soil_moisture(self, lat: float, lon: float, weather_data: Dict) -> Dict:
@@ -243,19 +251,37 @@ class EnvironmentalDataFetcher:
         self.ndvi_api = NDVIAPI(ndvi_api_key)
         self.soil_api = SoilMoistureAPI(soil_api_key)
     
-    def fetch_all_data(self, location: str) -> Dict:
-        """Fetch all environmental data for a location."""
+    def fetch_all_data(self, location: str, timer: Callable = None) -> Dict:
+        """
+        Fetch all environmental data for a location. ``timer(stage)`` (e.g.
+        metrics.stage_timer) times each upstream call; by default nothing is recorded.
+        """
+        timer = timer or _untimed
+        
         # Get coordinates
-        lat, lon = self.weather_api.get_coordinates(location)
+        with timer('geocode'):
+            lat, lon = self.weather_api.get_coordinates(location)
+        
+        return self.fetch_coordinates_data(lat, lon, location, timer)
+    
+    def fetch_coordinates_data(self, lat: float, lon: float, location: str = None,
+                               timer: Callable = None) -> Dict:
+        """Fetch all environmental data for known coordinates, skipping geocoding."""
+        timer = timer or _untimed
+        if location is None:
+            location = f"{lat},{lon}"
         
         # Fetch weather data
-        weather_data = self.weather_api.get_weather_data(lat, lon)
+        with timer('weather'):
+            weather_data = self.weather_api.get_weather_data(lat, lon)
         
         # Fetch NDVI data
-        ndvi_data = self.ndvi_api.get_ndvi_data(lat, lon)
+        with timer('ndvi'):
+            ndvi_data = self.ndvi_api.get_ndvi_data(lat, lon)
         
         # Fetch soil moisture data
-        soil_data = self.soil_api.get_soil_moisture(lat, lon, weather_data)
+        with timer('soil'):
+            soil_data = self.soil_api.get_soil_moisture(lat, lon, weather_data)
         
         # Calculate rainfall index (mock for now)
         rainfall_index = self._calculate_rainfall_index(weather_data)
@@ -271,6 +297,50 @@ class EnvironmentalDataFetcher:
             'timestamp': time.time()
         }
     
+    def estimate_grid(self, lat: np.ndarray, lon: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Vectorized, noise-free version of the fallback climate models above,
+        evaluated for every (lat, lon) point at once. Used by gridded risk
+        maps for sample points whose upstream fetch fails.
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        northern = lat > 40
+        southern = lat < -20
+        
+        # Weather by climate zone (see WeatherAPI._get_mock_weather_data)
+        temperature = np.select([northern, southern], [15.0, 18.0], 28.0)
+        humidity = np.select([northern, southern], [60.0, 65.0], 75.0)
+        pressure = np.full(lat.shape, 1013.0)
+        
+        # Seasonal NDVI with latitude adjustment (see NDVIAPI._get_mock_ndvi_data)
+        month = datetime.datetime.now().month
+        if month in [12, 1, 2]:
+            base_ndvi = 0.4
+        elif month in [3, 4, 5]:
+            base_ndvi = 0.7
+        elif month in [6, 7, 8]:
+            base_ndvi = 0.8
+        else:
+            base_ndvi = 0.6
+        temperate = (lat > 40) | (lat < -40)
+        subtropical = ((lat > 20) & (lat < 40)) | ((lat > -40) & (lat < -20))
+        ndvi = base_ndvi * np.select([temperate, subtropical], [0.8, 0.9], 1.0)
+        
+        # Water balance estimate (see SoilMoistureAPI._estimate_soil_moisture)
+        temp_factor = np.maximum(0, (35 - temperature) / 35)
+        base_moisture = np.select([northern, southern], [0.6, 0.5], 0.7)
+        soil_moisture = base_moisture * temp_factor * (humidity / 100)
+        
+        rainfall_index = (humidity / 100) * (1 - (pressure - 1000) / 50)
+        
+        return {
+            'temperature': temperature,
+            'humidity': humidity,
+            'ndvi': np.clip(ndvi, 0.1, 1.0),
+            'soil_moisture': np.clip(soil_moisture, 0.1, 1.0),
+            'rainfall_index': np.clip(rainfall_index, 0.1, 1.0)
+        }
+    
     def _calculate_rainfall_index(self, weather_data: Dict) -> float:
         """Calculate rainfall index based on weather conditions."""
         # Mock rainfall calculation
@@ -1,24 +1,51 @@
-from flask import Flask, request, jsonify
+# Cap native thread pools before numpy and sklearn load them (see thread_budget.py)
+import thread_budget
+thread_budget.apply_native_thread_limits()
+
+from flask import Flask, request, jsonify, g, Response, stream_with_context, has_request_context
 from flask_cors import CORS
 import os
-import json
-from typing import Dict, Any
+from typing import Dict, Any, List
 import traceback
+import atexit
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 
 # Import our custom modules
 from api_integrations import EnvironmentalDataFetcher
 from model import CropRiskModel
+from model_registry import ModelRegistry
 from risk_calculator import RiskCalculator
 from recommendations import RecommendationEngine
 from geospatial_processor import GeospatialProcessor
 from database_manager import DatabaseManager
 from cloud_integration import CloudIntegration
+from crop_catalog import get_catalog_store
+from batch_scoring import BatchRiskScorer
+from persistence_queue import PersistenceQueue
+from response_cache import AssessmentCache
+from risk_grid import RiskGridService
+from environment_stream import EnvironmentStreamHub, event_stream
+from inference_batcher import InferenceBatcher
+from thread_budget import InferenceExecutor
+from metrics import REGISTRY, HTTP_REQUEST_DURATION, UPSTREAM_ERRORS, stage_timer
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
+# Batch assessment limits
+MAX_BATCH_ITEMS = int(os.getenv('MAX_BATCH_ITEMS', 1000))
+ENV_FETCH_WORKERS = int(os.getenv('ENV_FETCH_WORKERS', 8))
+
+# Cache key crop slot for all-crop suitability rankings
+SUITABILITY_CACHE_CROP = '*'
+
 # Initialize components
+crop_catalog_store = get_catalog_store('data/crop_database.json')
 data_fetcher = EnvironmentalDataFetcher()
+environment_stream_hub = EnvironmentStreamHub(data_fetcher)
 risk_calculator = RiskCalculator()
 recommendation_engine = RecommendationEngine()
 geospatial_processor = GeospatialProcessor()
@@ -27,63 +54,191 @@ database_manager = DatabaseManager()
 # Initialize cloud integration (optional - prints warnings if not available)
 cloud_integration = CloudIntegration()
 
-# Initialize database connections (optional - will continue even if they fail)
-try:
-    database_manager.connect_mongodb()
-except Exception as e:
-    print(f"MongoDB connection warning: {e}")
-    
-try:
-    database_manager.connect_cassandra()
-except Exception as e:
-    print(f"Cassandra connection warning: {e}")
+# Persist assessments in the background so slow databases don't add latency
+persistence_queue = PersistenceQueue(database_manager, cloud_integration)
+persistence_queue.start()
+atexit.register(persistence_queue.shutdown)
+
+# Cache assessment responses for repeat views; entries are dropped whenever
+# the crop catalog or the model changes
+assessment_cache = AssessmentCache()
+crop_catalog_store.add_listener(
+    lambda catalog: assessment_cache.invalidate(f'crop catalog {catalog.version}')
+)
+
+# All model predicts run on this process's inference threads, sized to its
+# share of the node's cores
+inference_executor = InferenceExecutor()
+atexit.register(inference_executor.shutdown)
+
+# Concurrent single assessments share one forest call per micro-batch
+inference_batcher = (InferenceBatcher(executor=inference_executor)
+                     if os.getenv('INFERENCE_BATCHING', 'true').lower() == 'true' else None)
+
+# New model versions on disk are loaded in the background and swapped in
+model_registry = ModelRegistry("models/trained_model.pkl")
+
+# Startup progress reported by /api/ready; requests use rule-based scoring
+# until the model is loaded
+startup_status = {
+    'started_at': time.time(),
+    'model': 'loading',
+    'model_ready_at': None,
+    'model_error': None,
+    'databases': 'connecting'
+}
 
-# Initialize schemas only if databases are connected
-if database_manager.mongodb_client or database_manager.cassandra_session:
+def initialize_databases():
+    """Connect to databases and create schemas (optional - failures are logged)."""
     try:
-        database_manager.initialize_schemas()
+        database_manager.connect_mongodb()
     except Exception as e:
-        print(f"Schema initialization warning: {e}")
-
-# Load or train model
-model = CropRiskModel()
-model_path = "models/trained_model.pkl"
+        print(f"MongoDB connection warning: {e}")
+    
+    try:
+        database_manager.connect_cassandra()
+    except Exception as e:
+        print(f"Cassandra connection warning: {e}")
+    
+    # Initialize schemas only if databases are connected
+    if database_manager.mongodb_client or database_manager.cassandra_session:
+        try:
+            database_manager.initialize_schemas()
+        except Exception as e:
+            print(f"Schema initialization warning: {e}")
+    
+    startup_status['databases'] = 'ready'
 
-if os.path.exists(model_path):
+def load_or_train_model():
+    """Load the trained model, training a new one if it is missing or unreadable."""
     try:
-        model.load_model(model_path)
-        print("Loaded existing trained model")
+        try:
+            model_registry.reload()
+            print(f"Loaded model {model_registry.version} from {model_registry.source}")
+        except Exception as e:
+            print(f"Error loading model: {e}")
+            print("Training new model...")
+            startup_status['model'] = 'training'
+            model_registry.train()
+        
+        startup_status['model'] = 'ready'
+        startup_status['model_ready_at'] = time.time()
+        model_registry.start_watching()
     except Exception as e:
-        print(f"Error loading model: {e}")
-        print("Training new model...")
-        # Train new model if loading fails
-        from data.synthetic_data import SyntheticDataGenerator
-        generator = SyntheticDataGenerator()
-        training_data = generator.generate_training_data(samples_per_crop=500)
-        model.train(training_data)
-        model.save_model(model_path)
-        print("Model training complete!")
-else:
-    print("No existing model found. Training new model...")
-    from data.synthetic_data import SyntheticDataGenerator
-    generator = SyntheticDataGenerator()
-    training_data = generator.generate_training_data(samples_per_crop=500)
-    model.train(training_data)
-    model.save_model(model_path)
-    print("Model training complete!")
+        print(f"Model startup error: {e}")
+        startup_status['model'] = 'failed'
+        startup_status['model_error'] = str(e)
+
+# Connect databases and load the model off the import path so the worker
+# can accept traffic immediately
+for startup_task in (initialize_databases, load_or_train_model):
+    threading.Thread(target=startup_task, name=startup_task.__name__, daemon=True).start()
+
+def active_model() -> CropRiskModel:
+    """The model bound to this request in before_request, so a hot swap can't change it mid-request."""
+    if has_request_context() and 'model' in g:
+        return g.model
+    return model_registry.current()
+
+batch_scorer = BatchRiskScorer(active_model, risk_calculator, inference_executor)
+risk_grid_service = RiskGridService(data_fetcher, batch_scorer)
+crop_catalog_store.add_listener(
+    lambda catalog: risk_grid_service.tile_cache.invalidate(f'crop catalog {catalog.version}')
+)
+
+def invalidate_model_caches(new_model: CropRiskModel):
+    # Cached responses were scored by the previous model, or by rules before the
+    # first load. Keys also carry the model version, so requests still bound to
+    # the previous model after this runs store entries no new request reads.
+    assessment_cache.invalidate(f'model {new_model.version}')
+    risk_grid_service.tile_cache.invalidate(f'model {new_model.version}')
+
+model_registry.add_listener(invalidate_model_caches)
+
+def collect_service_metrics():
+    """Scrape-time gauges and counters from the cache, write queue and model."""
+    cache = assessment_cache.get_stats()
+    queue_status = persistence_queue.get_status()
+    tile_cache = risk_grid_service.tile_cache.get_stats()
+    streams = environment_stream_hub.get_status()
+    
+    return [
+        ('assessment_cache_lookups_total', 'counter', 'Assessment cache lookups by result',
+         [({'result': 'hit'}, cache['hits']), ({'result': 'miss'}, cache['misses'])]),
+        ('assessment_cache_hit_ratio', 'gauge', 'Fraction of assessment cache lookups that hit',
+         [({}, cache['hit_ratio'])]),
+        ('assessment_cache_evictions_total', 'counter', 'Entries evicted by the LRU size limit',
+         [({}, cache['evictions'])]),
+        ('assessment_cache_entries', 'gauge', 'Entries currently cached',
+         [({}, cache['size'])]),
+        ('persistence_queue_depth', 'gauge', 'Writes waiting in the persistence queue',
+         [({}, queue_status['queue_depth'])]),
+        ('persistence_queue_items_total', 'counter', 'Persistence queue items by outcome',
+         [({'outcome': key}, queue_status[key]) for key in ('enqueued', 'dropped', 'written', 'unpersisted', 'failed')]),
+        ('risk_tile_cache_lookups_total', 'counter', 'Risk tile cache lookups by result',
+         [({'result': 'hit'}, tile_cache['hits']), ({'result': 'miss'}, tile_cache['misses'])]),
+        ('environment_stream_subscribers', 'gauge', 'Open environmental data streams',
+         [({}, streams['subscribers'])]),
+        ('environment_stream_channels', 'gauge', 'Locations with an active stream poller',
+         [({}, streams['channels'])]),
+        ('environment_stream_refreshes_total', 'counter', 'Upstream refreshes made by stream pollers',
+         [({}, streams['refreshes'])]),
+        ('model_ready', 'gauge', '1 once the ML model is serving predictions',
+         [({}, 1 if model_registry.current().is_trained else 0)]),
+        ('model_swaps_total', 'counter', 'Model versions hot-swapped in after startup',
+         [({}, model_registry.swaps)])
+    ]
+
+REGISTRY.add_collector(collect_service_metrics)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.model = model_registry.current()
+
+@app.after_request
+def record_request_metrics(response):
+    started = getattr(g, 'request_started', None)
+    if started is not None:
+        HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            endpoint=request.url_rule.rule if request.url_rule else 'unmatched',
+            status=response.status_code
+        )
+    
+    serving_model = getattr(g, 'model', None) or model_registry.current()
+    response.headers['X-Model-Version'] = serving_model.version if serving_model.is_trained else 'none'
+    return response
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics in text exposition format."""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
     db_status = database_manager.get_database_status()
     cloud_status = cloud_integration.get_cloud_status()
+    model = active_model()
+    lookup = model.artifacts.lookup if model.artifacts else None
     
     return jsonify({
         'status': 'healthy',
         'model_loaded': model.is_trained,
+        'model_version': model.version,
+        'model_registry': model_registry.get_status(),
+        'startup': startup_status,
         'message': 'Crop Risk Assessment API is running',
         'database_status': db_status,
         'cloud_status': cloud_status,
+        'persistence_queue': persistence_queue.get_status(),
+        'assessment_cache': assessment_cache.get_stats(),
+        'environment_streams': environment_stream_hub.get_status(),
+        'inference_batcher': inference_batcher.get_status() if inference_batcher else None,
+        'inference_executor': inference_executor.get_status(),
+        'risk_lookup': lookup.error if lookup else None,
         'geospatial_available': True,
         'features': {
             'geolocation': True,
@@ -95,20 +250,25 @@ def health_check():
         }
     })
 
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: 200 once the ML model is serving, 503 before."""
+    ready = active_model().is_trained
+    
+    return jsonify({
+        'ready': ready,
+        'model': startup_status['model'],
+        'model_error': startup_status['model_error'],
+        'databases': startup_status['databases'],
+        'scoring': 'ml' if ready else 'rules',
+        'uptime_seconds': round(time.time() - startup_status['started_at'], 1)
+    }), 200 if ready else 503
+
 @app.route('/api/crops', methods=['GET'])
 def get_crops():
     """Get list of available crops."""
     try:
-        with open('data/crop_database.json', 'r') as f:
-            crop_db = json.load(f)
-        
-        crops = []
-        for crop_name, crop_data in crop_db['crops'].items():
-            crops.append({
-                'name': crop_name,
-                'category': crop_data['category'],
-                'display_name': crop_name.title()
-            })
+        crops = crop_catalog_store.current().list_crops()
         
         return jsonify({
             'crops': crops,
@@ -139,6 +299,25 @@ def get_environmental_data():
             'traceback': traceback.format_exc()
         }), 500
 
+@app.route('/api/environmental-data/stream', methods=['GET'])
+def stream_environmental_data():
+    """
+    Server-sent events with live environmental data; updates carry changed fields only.
+    Each open stream holds its handler: deploy with an async worker class (see environment_stream.py).
+    """
+    location = request.args.get('location')
+    if not location:
+        return jsonify({'error': 'Location parameter is required'}), 400
+    
+    return Response(
+        stream_with_context(event_stream(environment_stream_hub, location)),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
 @app.route('/api/assess-risk', methods=['POST'])
 def assess_risk():
     """Assess crop risk for given location and crop."""
@@ -155,14 +334,21 @@ def assess_risk():
         crop = data['crop']
         
         # Validate crop
-        with open('data/crop_database.json', 'r') as f:
-            crop_db = json.load(f)
-        
-        if crop not in crop_db['crops']:
+        if crop not in crop_catalog_store.current():
             return jsonify({'error': f'Invalid crop: {crop}'}), 400
         
-        # Fetch environmental data
-        env_data = data_fetcher.fetch_all_data(location)
+        # Serve repeat views of the same field from the cache; the generation
+        # read here keeps a response scored before an invalidation out of it
+        cache_generation = assessment_cache.generation
+        cache_key = assessment_cache.make_key(location, crop, active_model().version)
+        cached_response = assessment_cache.get(cache_key)
+        if cached_response is not None:
+            response = jsonify(dict(cached_response, location=location))
+            response.headers['X-Cache'] = 'HIT'
+            return response
+        
+        # Fetch environmental data; only single assessments record upstream stages
+        env_data = data_fetcher.fetch_all_data(location, timer=stage_timer)
         
         # Extract environmental factors
         temperature = env_data['temperature']
@@ -172,34 +358,55 @@ def assess_risk():
         rainfall = env_data['rainfall_index']
         
         # Calculate risk using both methods
-        # Method 1: ML Model prediction
-        try:
-            ml_prediction = model.predict_risk(
-                crop, temperature, moisture, humidity, ndvi, rainfall
-            )
-        except Exception as e:
-            print(f"ML model error: {e}")
-            ml_prediction = None
+        # Method 1: ML Model prediction (skipped while the model is still loading)
+        model = active_model()
+        ml_prediction = None
+        if model.is_trained:
+            try:
+                with stage_timer('ml_predict'):
+                    if inference_batcher is not None:
+                        ml_prediction = inference_batcher.predict_risk(
+                            model, crop, temperature, moisture, humidity, ndvi, rainfall
+                        )
+                    else:
+                        ml_prediction = inference_executor.run(
+                            model.predict_risk, crop, temperature, moisture, humidity, ndvi, rainfall
+                        )
+            except Exception as e:
+                print(f"ML model error: {e}")
+                UPSTREAM_ERRORS.inc(service='ml_model')
         
         # Method 2: Rule-based calculation
-        risk_analysis = risk_calculator.calculate_risk_score(
-            crop, temperature, moisture, humidity, ndvi, rainfall
-        )
+        with stage_timer('rule_scoring'):
+            risk_analysis = risk_calculator.calculate_risk_score(
+                crop, temperature, moisture, humidity, ndvi, rainfall
+            )
         
         # Use ML prediction if available, otherwise use rule-based
         if ml_prediction:
             risk_score = ml_prediction['risk_score']
             risk_level = ml_prediction['risk_level']
             formula_weights = ml_prediction['formula_weights']
+            model_version = model.version
+            explanation = {
+                'baseline_risk': round(ml_prediction['baseline_risk'], 4),
+                'factor_contributions': {
+                    k: round(v, 4) for k, v in ml_prediction['factor_contributions'].items()
+                },
+                'crop_contribution': round(ml_prediction['crop_contribution'], 4)
+            }
         else:
             risk_score = risk_analysis['risk_score']
             risk_level = risk_analysis['risk_level']
             formula_weights = risk_analysis['weights']
+            model_version = None
+            explanation = {}
         
         # Generate recommendations
-        recommendations = recommendation_engine.generate_recommendations(
-            crop, risk_analysis, risk_analysis['current_values']
-        )
+        with stage_timer('recommendations'):
+            recommendations = recommendation_engine.generate_recommendations(
+                crop, risk_analysis, risk_analysis['current_values']
+            )
         
         # Prepare response
         response = {
@@ -209,6 +416,8 @@ def assess_risk():
             'risk_score': round(risk_score, 3),
             'risk_level': risk_level,
             'formula_weights': formula_weights,
+            'model_version': model_version,
+            **explanation,
             'current_values': {
                 'temperature': round(temperature, 1),
                 'moisture': round(moisture, 2),
@@ -227,28 +436,187 @@ def assess_risk():
             )
         }
         
-        # Save to databases
-        try:
-            # Save risk assessment
-            database_manager.save_risk_assessment(response)
-            
-            # Save environmental data
-            database_manager.save_environmental_data(location, {
-                'temperature': temperature,
-                'humidity': humidity,
-                'moisture': moisture,
-                'ndvi': ndvi,
-                'rainfall_index': rainfall
-            })
-            
-            # Backup to cloud
-            cloud_integration.backup_data_to_cloud(response, 'risk_assessment')
+        # Queue database writes and cloud backup; the background writer
+        # persists them without holding up the response
+        persistence_queue.enqueue_assessment(response)
+        persistence_queue.enqueue_environmental_data(location, {
+            'temperature': temperature,
+            'humidity': humidity,
+            'moisture': moisture,
+            'ndvi': ndvi,
+            'rainfall_index': rainfall
+        })
+        
+        assessment_cache.put(cache_key, response, cache_generation)
+        
+        response = jsonify(response)
+        response.headers['X-Cache'] = 'MISS'
+        return response
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }), 500
+
+@app.route('/api/assess-risk/batch', methods=['POST'])
+def assess_risk_batch():
+    """Assess crop risk for many (location, crop) pairs in one call."""
+    try:
+        data = request.get_json()
+        items = data.get('items') if isinstance(data, dict) else None
+        
+        # Validate input
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'Missing required field: items'}), 400
+        if len(items) > MAX_BATCH_ITEMS:
+            return jsonify({'error': f'Too many items: {len(items)} (max {MAX_BATCH_ITEMS})'}), 400
+        
+        include_recommendations = bool(data.get('include_recommendations', False))
+        crop_catalog = crop_catalog_store.current()
+        
+        results = [None] * len(items)
+        pending = []
+        for i, item in enumerate(items):
+            if not isinstance(item, dict) or 'location' not in item or 'crop' not in item:
+                results[i] = {'index': i, 'success': False, 'error': 'Each item needs location and crop'}
+            elif item['crop'] not in crop_catalog:
+                results[i] = {'index': i, 'success': False, 'error': f"Invalid crop: {item['crop']}"}
+            else:
+                pending.append(i)
+        
+        # Fetch environmental data once per distinct location
+        locations = list(dict.fromkeys(items[i]['location'] for i in pending))
+        env_by_location = fetch_environmental_data_many(locations)
+        
+        scorable = []
+        for i in pending:
+            env_data = env_by_location[items[i]['location']]
+            if isinstance(env_data, Exception):
+                results[i] = {'index': i, 'success': False, 'error': str(env_data)}
+            else:
+                scorable.append(i)
+        
+        if scorable:
+            crops = [items[i]['crop'] for i in scorable]
+            env_rows = [env_by_location[items[i]['location']] for i in scorable]
+            scored = batch_scorer.score(
+                crops,
+                np.array([env['temperature'] for env in env_rows]),
+                np.array([env['soil_moisture'] for env in env_rows]),
+                np.array([env['humidity'] for env in env_rows]),
+                np.array([env['ndvi'] for env in env_rows]),
+                np.array([env['rainfall_index'] for env in env_rows])
+            )
+            rows = batch_scorer.to_results(
+                scored, crops, recommendation_engine if include_recommendations else None
+            )
+            for i, row in zip(scorable, rows):
+                results[i] = {'index': i, 'success': True, 'location': items[i]['location'], **row}
+                persistence_queue.enqueue_assessment(results[i])
             
-        except Exception as db_error:
-            print(f"Database save error: {db_error}")
-            # Continue even if database save fails
+            for location in dict.fromkeys(items[i]['location'] for i in scorable):
+                env = env_by_location[location]
+                persistence_queue.enqueue_environmental_data(location, {
+                    'temperature': env['temperature'],
+                    'humidity': env['humidity'],
+                    'moisture': env['soil_moisture'],
+                    'ndvi': env['ndvi'],
+                    'rainfall_index': env['rainfall_index']
+                })
+        
+        return jsonify({
+            'success': True,
+            'results': results,
+            'total': len(results),
+            'failed': sum(1 for r in results if not r['success']),
+            'unique_locations': len(locations)
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }), 500
+
+def fetch_environmental_data_many(locations: List[str]) -> Dict[str, Any]:
+    """Fetch environmental data for distinct locations concurrently; failures map to the exception."""
+    def fetch(location):
+        try:
+            return data_fetcher.fetch_all_data(location)
+        except Exception as e:
+            return e
+    
+    if len(locations) <= 1:
+        return {location: fetch(location) for location in locations}
+    
+    with ThreadPoolExecutor(max_workers=min(ENV_FETCH_WORKERS, len(locations))) as executor:
+        return dict(zip(locations, executor.map(fetch, locations)))
+
+@app.route('/api/crop-suitability', methods=['GET'])
+def get_crop_suitability():
+    """Rank every crop in the catalog by risk at one location."""
+    try:
+        location = request.args.get('location')
+        if not location:
+            return jsonify({'error': 'Location parameter is required'}), 400
+        
+        crop_catalog = crop_catalog_store.current()
+        
+        cache_generation = assessment_cache.generation
+        cache_key = assessment_cache.make_key(location, SUITABILITY_CACHE_CROP, active_model().version)
+        cached_response = assessment_cache.get(cache_key)
+        if cached_response is not None:
+            response = jsonify(dict(cached_response, location=location))
+            response.headers['X-Cache'] = 'HIT'
+            return response
+        
+        # Fetch environmental data once and score every crop against it
+        env_data = data_fetcher.fetch_all_data(location)
+        crops = list(crop_catalog.crop_names)
+        n = len(crops)
+        scored = batch_scorer.score(
+            crops,
+            np.full(n, env_data['temperature']),
+            np.full(n, env_data['soil_moisture']),
+            np.full(n, env_data['humidity']),
+            np.full(n, env_data['ndvi']),
+            np.full(n, env_data['rainfall_index'])
+        )
+        
+        rankings = batch_scorer.to_results(scored, crops)
+        for result in rankings:
+            result['display_name'] = result['crop'].title()
+            result['category'] = crop_catalog.category_of(result['crop'])
+        rankings.sort(key=lambda result: result['risk_score'])
+        for rank, result in enumerate(rankings, start=1):
+            result['rank'] = rank
+        
+        response = {
+            'success': True,
+            'location': location,
+            'scoring': scored['source'],
+            'model_version': scored['model_version'],
+            'current_values': rankings[0]['current_values'] if rankings else {},
+            'rankings': rankings,
+            'total': len(rankings)
+        }
         
-        return jsonify(response)
+        persistence_queue.enqueue_environmental_data(location, {
+            'temperature': env_data['temperature'],
+            'humidity': env_data['humidity'],
+            'moisture': env_data['soil_moisture'],
+            'ndvi': env_data['ndvi'],
+            'rainfall_index': env_data['rainfall_index']
+        })
+        
+        assessment_cache.put(cache_key, response, cache_generation)
+        
+        response = jsonify(response)
+        response.headers['X-Cache'] = 'MISS'
+        return response
         
     except Exception as e:
         return jsonify({
@@ -257,17 +625,78 @@ def assess_risk():
             'traceback': traceback.format_exc()
         }), 500
 
+@app.route('/api/risk-grid', methods=['GET'])
+def get_risk_grid():
+    """Risk for a crop over a bounding box at a given grid resolution."""
+    try:
+        crop = request.args.get('crop')
+        bbox_param = request.args.get('bbox')
+        
+        if not crop or not bbox_param:
+            return jsonify({'error': 'crop and bbox parameters are required'}), 400
+        try:
+            resolution = int(request.args.get('resolution', 50))
+        except ValueError:
+            return jsonify({'error': 'resolution must be an integer'}), 400
+        if crop not in crop_catalog_store.current():
+            return jsonify({'error': f'Invalid crop: {crop}'}), 400
+        if not 1 <= resolution <= risk_grid_service.max_resolution:
+            return jsonify({'error': f'resolution must be between 1 and {risk_grid_service.max_resolution}'}), 400
+        
+        # bbox is min_lon,min_lat,max_lon,max_lat
+        try:
+            bbox = tuple(map(float, bbox_param.split(',')))
+        except ValueError:
+            return jsonify({'error': 'bbox must be min_lon,min_lat,max_lon,max_lat'}), 400
+        if len(bbox) != 4 or bbox[0] >= bbox[2] or bbox[1] >= bbox[3]:
+            return jsonify({'error': 'bbox must be min_lon,min_lat,max_lon,max_lat'}), 400
+        
+        grid = risk_grid_service.compute_bbox(crop, bbox, resolution)
+        
+        return jsonify({'success': True, **grid})
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/risk-tiles/<crop>/<int:z>/<int:x>/<int:y>', methods=['GET'])
+def get_risk_tile(crop, z, x, y):
+    """Risk grid for one XYZ map tile, served from the tile cache when possible."""
+    try:
+        try:
+            size = int(request.args.get('size', 64))
+        except ValueError:
+            return jsonify({'error': 'size must be an integer'}), 400
+        
+        if crop not in crop_catalog_store.current():
+            return jsonify({'error': f'Invalid crop: {crop}'}), 400
+        if not 0 <= z <= 18 or not 0 <= x < 2 ** z or not 0 <= y < 2 ** z:
+            return jsonify({'error': f'Invalid tile: {z}/{x}/{y}'}), 400
+        if not 1 <= size <= risk_grid_service.max_resolution:
+            return jsonify({'error': f'size must be between 1 and {risk_grid_service.max_resolution}'}), 400
+        
+        grid, cached = risk_grid_service.get_tile(crop, z, x, y, size)
+        
+        response = jsonify({'success': True, **grid})
+        response.headers['X-Cache'] = 'HIT' if cached else 'MISS'
+        return response
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/api/crop-info/<crop>', methods=['GET'])
 def get_crop_info(crop):
     """Get detailed information about a specific crop."""
     try:
-        with open('data/crop_database.json', 'r') as f:
-            crop_db = json.load(f)
+        crop_catalog = crop_catalog_store.current()
         
-        if crop not in crop_db['crops']:
+        if crop not in crop_catalog:
             return jsonify({'error': f'Crop not found: {crop}'}), 404
         
-        crop_data = crop_db['crops'][crop]
+        crop_data = crop_catalog.get(crop)
         
         return jsonify({
             'crop': crop,
@@ -287,13 +716,12 @@ def get_crop_info(crop):
 def get_risk_formula(crop):
     """Get risk formula for a specific crop."""
     try:
-        with open('data/crop_database.json', 'r') as f:
-            crop_db = json.load(f)
+        crop_catalog = crop_catalog_store.current()
         
-        if crop not in crop_db['crops']:
+        if crop not in crop_catalog:
             return jsonify({'error': f'Crop not found: {crop}'}), 404
         
-        crop_data = crop_db['crops'][crop]
+        crop_data = crop_catalog.get(crop)
         weights = risk_calculator._get_category_weights(crop_data['category'])
         
         formula = risk_calculator.generate_risk_formula(crop, weights)
@@ -447,9 +875,16 @@ if __name__ == '__main__':
     print("Starting Crop Risk Assessment API...")
     print("Available endpoints:")
     print("  GET  /api/health - Health check")
+    print("  GET  /api/ready - Readiness probe")
+    print("  GET  /api/metrics - Prometheus metrics")
     print("  GET  /api/crops - List all crops")
     print("  GET  /api/environmental-data?location=<location> - Get environmental data")
+    print("  GET  /api/environmental-data/stream?location=<location> - Live data (SSE)")
     print("  POST /api/assess-risk - Assess crop risk")
+    print("  POST /api/assess-risk/batch - Assess many (location, crop) pairs")
+    print("  GET  /api/crop-suitability?location=<location> - Rank all crops at a location")
+    print("  GET  /api/risk-grid?crop=<crop>&bbox=<bbox>&resolution=<n> - Gridded risk")
+    print("  GET  /api/risk-tiles/<crop>/<z>/<x>/<y> - Cached risk tile")
     print("  GET  /api/crop-info/<crop> - Get crop information")
     print("  GET  /api/risk-formula/<crop> - Get risk formula")
     
@@ -0,0 +1,121 @@
+"""
+Vectorized risk scoring for many (crop, conditions) rows at once
+"""
+
+import numpy as np
+from typing import Callable, Dict, List, Sequence
+from crop_catalog import FACTORS
+from metrics import UPSTREAM_ERRORS, stage_timer
+
+class BatchRiskScorer:
+    """
+    Scores rows with one CropRiskModel predict call and one vectorized
+    RiskCalculator pass, falling back to rule-based scores when the model
+    cannot be used. ``get_model`` returns the CropRiskModel to score with,
+    so a batch is scored by one model version even across a hot swap.
+    Model calls run on ``executor`` (an InferenceExecutor) when one is given.
+    """
+    
+    def __init__(self, get_model: Callable, risk_calculator, executor=None):
+        self.get_model = get_model
+        self.risk_calculator = risk_calculator
+        self.executor = executor
+    
+    def score(self, crops: Sequence[str], temperature: np.ndarray, moisture: np.ndarray,
+              humidity: np.ndarray, ndvi: np.ndarray, rainfall: np.ndarray,
+              approximate: bool = False) -> Dict:
+        """
+        Score all rows; returns array columns plus the rule-based analysis.
+        ``approximate`` lets the model answer from its risk lookup grid.
+        """
+        with stage_timer('batch_rule_scoring'):
+            risk_analysis = self.risk_calculator.calculate_risk_scores(
+                crops, temperature, moisture, humidity, ndvi, rainfall
+            )
+        
+        # Method 1: ML Model prediction (skipped while the model is still loading)
+        model = self.get_model()
+        ml_prediction = None
+        if model.is_trained:
+            try:
+                with stage_timer('batch_ml_predict'):
+                    args = (crops, temperature, moisture, humidity, ndvi, rainfall)
+                    if self.executor is not None:
+                        ml_prediction = self.executor.run(model.predict_batch, *args, approximate=approximate)
+                    else:
+                        ml_prediction = model.predict_batch(*args, approximate=approximate)
+            except Exception as e:
+                print(f"ML model error: {e}")
+                UPSTREAM_ERRORS.inc(service='ml_model')
+        
+        # Use ML prediction if available, otherwise use rule-based
+        if ml_prediction:
+            return {
+                'source': 'ml',
+                'model_version': model.version,
+                'risk_score': ml_prediction['risk_score'],
+                'risk_level': ml_prediction['risk_level'],
+                'formula_weights': [ml_prediction['formula_weights']] * len(crops),
+                'analysis': risk_analysis
+            }
+        
+        return {
+            'source': 'rules',
+            'model_version': None,
+            'risk_score': risk_analysis['risk_score'],
+            'risk_level': risk_analysis['risk_level'],
+            'formula_weights': [
+                dict(zip(FACTORS, row.tolist())) for row in risk_analysis['weights']
+            ],
+            'analysis': risk_analysis
+        }
+    
+    @staticmethod
+    def row_analysis(scored: Dict, i: int) -> Dict:
+        """Rebuild the calculate_risk_score dict for row i of a scored batch."""
+        analysis = scored['analysis']
+        values = analysis['current_values'][i].tolist()
+        return {
+            'risk_score': float(analysis['risk_score'][i]),
+            'risk_level': str(analysis['risk_level'][i]),
+            'factor_risks': dict(zip(FACTORS, analysis['factor_risks'][i].tolist())),
+            'weights': dict(zip(FACTORS, analysis['weights'][i].tolist())),
+            'weakest_factor': str(analysis['weakest_factor'][i]),
+            'current_values': dict(zip(FACTORS, values))
+        }
+    
+    def to_results(self, scored: Dict, crops: Sequence[str],
+                   recommendation_engine=None) -> List[Dict]:
+        """Format scored rows like the /api/assess-risk response body."""
+        analysis = scored['analysis']
+        results = []
+        for i, crop in enumerate(crops):
+            temperature, moisture, humidity, ndvi, rainfall = analysis['current_values'][i].tolist()
+            result = {
+                'crop': crop,
+                'risk_score': round(float(scored['risk_score'][i]), 3),
+                'risk_level': str(scored['risk_level'][i]),
+                'formula_weights': scored['formula_weights'][i],
+                'current_values': {
+                    'temperature': round(temperature, 1),
+                    'moisture': round(moisture, 2),
+                    'humidity': round(humidity, 1),
+                    'ndvi': round(ndvi, 2),
+                    'rainfall_index': round(rainfall, 2)
+                },
+                'factor_risks': {
+                    factor: round(risk, 3)
+                    for factor, risk in zip(FACTORS, analysis['factor_risks'][i].tolist())
+                },
+                'weakest_factor': str(analysis['weakest_factor'][i])
+            }
+            
+            if recommendation_engine is not None:
+                row = self.row_analysis(scored, i)
+                result['recommendations'] = recommendation_engine.generate_recommendations(
+                    crop, row, row['current_values']
+                )
+            
+            results.append(result)
+        
+        return results
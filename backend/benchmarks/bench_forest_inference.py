@@ -0,0 +1,106 @@
+"""
+Benchmark FlatForest against the sklearn predict path.
+
+Checks the flattened forest is bit-for-bit equal to scaler.transform +
+model.predict, and that CropRiskModel.predict_batch on a DataFrame
+matches per-row predict_risk, then reports single-row latency percentiles and batch
+throughput for both.
+
+Run from backend/:  python benchmarks/bench_forest_inference.py
+"""
+
+import os
+import sys
+import time
+import argparse
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from forest_engine import FlatForest
+from model import CropRiskModel, INPUT_COLUMNS
+
+def latency_percentiles(predict, rows: np.ndarray, repeats: int) -> dict:
+    """Per-call latency in microseconds over ``repeats`` single-row calls."""
+    for row in rows[:20]:
+        predict(row[np.newaxis, :])
+    samples = np.empty(repeats)
+    for i in range(repeats):
+        row = rows[i % len(rows)][np.newaxis, :]
+        started = time.perf_counter()
+        predict(row)
+        samples[i] = time.perf_counter() - started
+    p50, p95, p99 = np.percentile(samples * 1e6, [50, 95, 99])
+    return {'p50': p50, 'p95': p95, 'p99': p99}
+
+def check_predict_batch(model_path: str, rows: int):
+    """predict_batch on a DataFrame must equal predict_risk called row by row."""
+    model = CropRiskModel()
+    model.load_model(model_path)
+    
+    rng = np.random.default_rng(7)
+    batch = pd.DataFrame(
+        rng.uniform([-5, 0.1, 20, 0.1, 0.1], [45, 1.0, 100, 1.0, 2.0], (rows, 5)), columns=INPUT_COLUMNS
+    )
+    batch.insert(0, 'crop', rng.choice(model.catalog.crop_names, rows))
+    
+    batched = model.predict_batch(batch)
+    per_row = np.array([
+        model.predict_risk(row.crop, *(getattr(row, c) for c in INPUT_COLUMNS))['risk_score']
+        for row in batch.itertuples()
+    ])
+    if not np.array_equal(batched['risk_score'], per_row):
+        mismatched = int(np.sum(batched['risk_score'] != per_row))
+        raise SystemExit(f"predict_batch differs from predict_risk on {mismatched:,} of {rows:,} rows")
+    print(f"Check ({rows:,} rows): predict_batch identical to per-row predict_risk")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model', default='models/trained_model.pkl')
+    parser.add_argument('--check-rows', type=int, default=100_000)
+    parser.add_argument('--repeats', type=int, default=1_000)
+    parser.add_argument('--batch-sizes', default='10,100,1000,10000')
+    parser.add_argument('--batch-check-rows', type=int, default=2_000,
+                        help='rows compared between predict_batch and predict_risk')
+    args = parser.parse_args()
+    
+    model_data = joblib.load(args.model)
+    forest, scaler = model_data['model'], model_data['scaler']
+    
+    started = time.perf_counter()
+    engine = FlatForest.from_estimator(forest, scaler)
+    print(f"Flattened {engine.n_trees} trees ({len(engine.value):,} nodes, depth {engine.depth}) "
+          f"in {(time.perf_counter() - started) * 1000:.1f}ms")
+    
+    # Rows spread around the training distribution, including outliers
+    rng = np.random.default_rng(42)
+    X = scaler.mean_ + rng.standard_normal((args.check_rows, len(scaler.mean_))) * scaler.scale_ * 1.5
+    
+    expected = forest.predict(scaler.transform(X))
+    actual = engine.predict(X)
+    if not np.array_equal(expected, actual):
+        mismatched = int(np.sum(expected != actual))
+        raise SystemExit(f"FlatForest differs from sklearn on {mismatched:,} of {len(X):,} rows")
+    print(f"Check ({len(X):,} rows): bit-for-bit identical to sklearn")
+    check_predict_batch(args.model, args.batch_check_rows)
+    
+    sklearn_predict = lambda x: forest.predict(scaler.transform(x))
+    print(f"\nSingle-row latency over {args.repeats:,} calls (microseconds)")
+    for name, predict in (('sklearn', sklearn_predict), ('flat', engine.predict)):
+        stats = latency_percentiles(predict, X, args.repeats)
+        print(f"  {name:8s} p50 {stats['p50']:9.1f}  p95 {stats['p95']:9.1f}  p99 {stats['p99']:9.1f}")
+    
+    print("\nBatch latency (milliseconds)")
+    for size in (int(s) for s in args.batch_sizes.split(',')):
+        batch = X[:size]
+        timings = []
+        for predict in (sklearn_predict, engine.predict):
+            started = time.perf_counter()
+            predict(batch)
+            timings.append((time.perf_counter() - started) * 1000)
+        print(f"  {size:>7,} rows  sklearn {timings[0]:8.2f}  flat {timings[1]:8.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark micro-batched predict_risk under concurrent load.
+
+Fires --requests single-row predictions from --threads threads, once
+calling CropRiskModel.predict_risk directly, once through the
+InferenceBatcher and once through a batcher that predicts on an
+InferenceExecutor of --executor-threads threads, as app.py configures it.
+Checks all give identical results, then reports throughput, per-call
+latency and the batch sizes each dispatcher formed.
+
+Run from backend/:  python benchmarks/bench_inference_batching.py --threads 32
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model import CropRiskModel
+from inference_batcher import InferenceBatcher
+from thread_budget import InferenceExecutor, inference_threads
+
+def run_load(predict, crops, values, threads: int):
+    """Call ``predict`` for every row from a thread pool; returns results, wall time, latencies."""
+    latencies = np.empty(len(crops))
+    
+    def call(i):
+        started = time.perf_counter()
+        result = predict(crops[i], *values[i])
+        latencies[i] = time.perf_counter() - started
+        return result['risk_score']
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        scores = list(pool.map(call, range(len(crops))))
+    return np.array(scores), time.perf_counter() - started, latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model', default='models/trained_model.pkl')
+    parser.add_argument('--requests', type=int, default=20_000)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--window-ms', type=float, default=0.0)
+    parser.add_argument('--max-rows', type=int, default=64)
+    parser.add_argument('--executor-threads', type=int, default=inference_threads(),
+                        help='InferenceExecutor size for the executor run (default INFERENCE_THREADS budget)')
+    args = parser.parse_args()
+    
+    model = CropRiskModel()
+    model.load_model(args.model)
+    
+    rng = np.random.default_rng(42)
+    crops = rng.choice(model.catalog.crop_names, args.requests).tolist()
+    values = np.column_stack([
+        rng.uniform(-5, 45, args.requests), rng.uniform(0.1, 1.0, args.requests),
+        rng.uniform(20, 100, args.requests), rng.uniform(0.1, 1.0, args.requests),
+        rng.uniform(0.1, 2.0, args.requests)
+    ]).tolist()
+    
+    executor = InferenceExecutor(args.executor_threads)
+    batchers = {
+        'batched': InferenceBatcher(window=args.window_ms / 1000, max_rows=args.max_rows),
+        'executor': InferenceBatcher(window=args.window_ms / 1000, max_rows=args.max_rows,
+                                     executor=executor)
+    }
+    runs = {
+        'direct': lambda crop, *row: model.predict_risk(crop, *row),
+        'batched': lambda crop, *row: batchers['batched'].predict_risk(model, crop, *row),
+        'executor': lambda crop, *row: batchers['executor'].predict_risk(model, crop, *row)
+    }
+    
+    results = {}
+    print(f"{args.requests:,} predictions from {args.threads} threads "
+          f"(window {args.window_ms}ms, max {args.max_rows} rows, "
+          f"{args.executor_threads} executor threads)")
+    for name, predict in runs.items():
+        run_load(predict, crops[:500], values[:500], args.threads)
+        scores, seconds, latencies = run_load(predict, crops, values, args.threads)
+        results[name] = scores
+        p50, p95, p99 = np.percentile(latencies * 1e3, [50, 95, 99])
+        print(f"  {name:8s} {args.requests / seconds:10,.0f} predictions/s   "
+              f"latency p50 {p50:6.2f}ms  p95 {p95:6.2f}ms  p99 {p99:6.2f}ms")
+    
+    for name, batcher in batchers.items():
+        if not np.array_equal(results['direct'], results[name]):
+            raise SystemExit(f"{name} predictions differ from predict_risk")
+    print("Identical results")
+    for name, batcher in batchers.items():
+        status = batcher.get_status()
+        print(f"  {name:8s} {status['batches']:,} batches, mean size {status['mean_batch_size']:.1f}")
+    executor.shutdown()
+
+if __name__ == "__main__":
+    main()
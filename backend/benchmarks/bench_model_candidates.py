@@ -0,0 +1,204 @@
+"""
+Benchmark candidate estimators on accuracy and serving cost.
+
+Every candidate is fit on the same seeded SyntheticDataGenerator split
+and scored on the same holdout. Each fitted model is then saved the way
+save_model stores it and loaded in a fresh process that serves it as
+predict_risk / predict_batch would: forests through FlatForest (sklearn
+above FLAT_FOREST_MAX_ROWS), other estimators through scaler + predict.
+The table shows holdout MAE and R², single-row p50/p99 latency, batch
+throughput, saved model size and the serving process's memory.
+
+Run from backend/:
+    python benchmarks/bench_model_candidates.py
+    python benchmarks/bench_model_candidates.py --candidates forest,hist_gb --report models/candidates.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# name -> (estimator class, parameters); the first is the served configuration
+CANDIDATES = {
+    'forest': ('RandomForestRegressor', {}),
+    'forest_d8_50': ('RandomForestRegressor', {'max_depth': 8, 'n_estimators': 50}),
+    'forest_d6_25': ('RandomForestRegressor', {'max_depth': 6, 'n_estimators': 25}),
+    'hist_gb': ('HistGradientBoostingRegressor', {'max_iter': 200, 'learning_rate': 0.1, 'random_state': 42}),
+    'ridge': ('Ridge', {'alpha': 1.0})
+}
+
+def make_estimator(name: str):
+    from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor
+    from sklearn.linear_model import Ridge
+    from model import DEFAULT_MODEL_PARAMS
+    
+    kind, params = CANDIDATES[name]
+    if kind == 'RandomForestRegressor':
+        return RandomForestRegressor(**{**DEFAULT_MODEL_PARAMS, **params})
+    if kind == 'HistGradientBoostingRegressor':
+        return HistGradientBoostingRegressor(**params)
+    return Ridge(**params)
+
+def rss_mb() -> float:
+    """Current resident set size (Linux /proc), falling back to the peak from getrusage."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def serve(args):
+    """Child process: load one saved model and time it on the serving path."""
+    import joblib
+    from sklearn.ensemble import RandomForestRegressor
+    from forest_engine import FlatForest
+    from model import FLAT_FOREST_MAX_ROWS
+    
+    with np.load(args.holdout) as data:
+        X = data['X']
+    baseline_rss = rss_mb()
+    
+    model_data = joblib.load(args.serve)
+    estimator, scaler = model_data['model'], model_data['scaler']
+    if isinstance(estimator, RandomForestRegressor):
+        estimator.n_jobs = 1
+        engine = FlatForest.from_estimator(estimator, scaler)
+        predict = lambda rows: (engine.predict(rows) if len(rows) <= FLAT_FOREST_MAX_ROWS
+                                else estimator.predict(scaler.transform(rows)))
+    else:
+        predict = lambda rows: estimator.predict(scaler.transform(rows))
+    
+    for row in X[:50]:
+        predict(row[np.newaxis, :])
+    samples = np.empty(args.repeats)
+    for i in range(args.repeats):
+        row = X[i % len(X)][np.newaxis, :]
+        started = time.perf_counter()
+        predict(row)
+        samples[i] = time.perf_counter() - started
+    
+    batch = X[np.arange(args.batch_rows) % len(X)]
+    predict(batch)
+    batches = 0
+    started = time.perf_counter()
+    while batches < 3 or time.perf_counter() - started < 1.0:
+        predict(batch)
+        batches += 1
+    rows_per_second = batches * len(batch) / (time.perf_counter() - started)
+    
+    p50, p99 = np.percentile(samples * 1e6, [50, 99])
+    print(json.dumps({
+        'latency_p50_us': float(p50),
+        'latency_p99_us': float(p99),
+        'batch_rows_per_second': rows_per_second,
+        'model_rss_mb': rss_mb() - baseline_rss,
+        'process_rss_mb': rss_mb()
+    }))
+
+def run_serving(args, model_path: str, holdout_path: str) -> dict:
+    command = [sys.executable, os.path.abspath(__file__), '--serve', model_path,
+               '--holdout', holdout_path, '--repeats', str(args.repeats),
+               '--batch-rows', str(args.batch_rows)]
+    output = subprocess.run(command, cwd=BACKEND_DIR, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--candidates', default=','.join(CANDIDATES),
+                        help=f"comma-separated subset of {', '.join(CANDIDATES)}")
+    parser.add_argument('--samples-per-crop', type=int, default=500)
+    parser.add_argument('--seed', type=int, help='training data seed (default TRAINING_DATA_SEED)')
+    parser.add_argument('--repeats', type=int, default=2_000, help='single-row predictions timed per candidate')
+    parser.add_argument('--batch-rows', type=int, default=1_000)
+    parser.add_argument('--report', help='write the results as JSON')
+    parser.add_argument('--serve', help=argparse.SUPPRESS)
+    parser.add_argument('--holdout', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.serve:
+        serve(args)
+        return
+    
+    import joblib
+    from sklearn.metrics import mean_absolute_error, r2_score
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+    from data.synthetic_data import SyntheticDataGenerator
+    from model import CropRiskModel
+    from training_cache import TrainingCache, TRAINING_DATA_SEED
+    
+    names = args.candidates.split(',')
+    unknown = [name for name in names if name not in CANDIDATES]
+    if unknown:
+        raise SystemExit(f"Unknown candidates: {', '.join(unknown)}")
+    
+    seed = TRAINING_DATA_SEED if args.seed is None else args.seed
+    training_data = SyntheticDataGenerator().generate_training_data(
+        samples_per_crop=args.samples_per_crop, seed=seed
+    )
+    X, y = TrainingCache().features(training_data, CropRiskModel())
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    scaler = StandardScaler().fit(X_train)
+    print(f"{len(X_train):,} training / {len(X_test):,} holdout rows (seed {seed}), "
+          f"{args.batch_rows:,}-row batches, {os.cpu_count()} cores")
+    print(f"{'candidate':14s} {'MAE':>7s} {'R²':>7s} {'fit s':>7s} {'p50 us':>8s} {'p99 us':>8s} "
+          f"{'rows/s':>11s} {'size MB':>8s} {'RSS MB':>7s}")
+    
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        holdout_path = os.path.join(work_dir, 'holdout.npz')
+        np.savez(holdout_path, X=X_test)
+        
+        for name in names:
+            estimator = make_estimator(name)
+            started = time.perf_counter()
+            estimator.fit(scaler.transform(X_train), y_train)
+            fit_seconds = time.perf_counter() - started
+            y_pred = np.clip(estimator.predict(scaler.transform(X_test)), 0.0, 1.0)
+            
+            model_path = os.path.join(work_dir, f'{name}.pkl')
+            joblib.dump({'model': estimator, 'scaler': scaler}, model_path)
+            
+            result = {
+                'candidate': name,
+                'estimator': CANDIDATES[name][0],
+                'params': CANDIDATES[name][1],
+                'mae': float(mean_absolute_error(y_test, y_pred)),
+                'r2': float(r2_score(y_test, y_pred)),
+                'fit_seconds': fit_seconds,
+                'model_size_mb': os.path.getsize(model_path) / 2**20,
+                **run_serving(args, model_path, holdout_path)
+            }
+            results.append(result)
+            print(f"{name:14s} {result['mae']:7.4f} {result['r2']:7.4f} {fit_seconds:7.2f} "
+                  f"{result['latency_p50_us']:8.1f} {result['latency_p99_us']:8.1f} "
+                  f"{result['batch_rows_per_second']:11,.0f} {result['model_size_mb']:8.2f} "
+                  f"{result['model_rss_mb']:7.1f}")
+    
+    print("RSS MB is the serving process's growth from loading the model; "
+          "predictions are clamped to [0, 1] as predict_risk does")
+    
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({
+                'seed': seed,
+                'samples_per_crop': args.samples_per_crop,
+                'train_rows': len(X_train),
+                'holdout_rows': len(X_test),
+                'batch_rows': args.batch_rows,
+                'cpu_count': os.cpu_count(),
+                'results': results
+            }, f, indent=2)
+        print(f"Report written to {args.report}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark CropRiskModel.prepare_features at training-history scale.
+
+Checks the vectorized pipeline against the original row-by-row loop on a
+small sample, then times it at --rows rows (10M by default).
+
+Run from backend/:  python benchmarks/bench_prepare_features.py --rows 10000000
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model import CropRiskModel, INPUT_COLUMNS
+
+def make_frame(model: CropRiskModel, rows: int, seed: int = 42) -> pd.DataFrame:
+    """Random environmental rows spread over every catalog crop."""
+    rng = np.random.default_rng(seed)
+    crops = np.asarray(model.catalog.crop_names)
+    return pd.DataFrame({
+        'temperature': rng.uniform(-5, 45, rows),
+        'moisture': rng.uniform(0.1, 1.0, rows),
+        'humidity': rng.uniform(20, 100, rows),
+        'ndvi': rng.uniform(0.1, 1.0, rows),
+        'rainfall': rng.uniform(0.1, 1.0, rows),
+        'crop': crops[rng.integers(0, len(crops), rows)],
+        'risk_score': rng.uniform(0, 1, rows)
+    })
+
+def legacy_prepare_features(model: CropRiskModel, df: pd.DataFrame) -> np.ndarray:
+    """The original iterrows implementation, kept here as the reference."""
+    features = df[INPUT_COLUMNS].copy()
+    features['crop_encoded'] = LabelEncoder().fit_transform(df['crop'])
+    crop_categories = df['crop'].map({
+        crop: model.crop_db['crops'][crop]['category']
+        for crop in model.crop_db['crops'].keys()
+    })
+    features['crop_category_encoded'] = LabelEncoder().fit_transform(crop_categories)
+    features['temp_moisture'] = features['temperature'] * features['moisture']
+    features['humidity_ndvi'] = features['humidity'] * features['ndvi']
+    features['temp_humidity'] = features['temperature'] * features['humidity']
+    for idx, row in df.iterrows():
+        crop_data = model.crop_db['crops'][row['crop']]
+        features.loc[idx, 'temp_deviation'] = abs(row['temperature'] - crop_data['optimal_temp'])
+        features.loc[idx, 'moisture_deviation'] = abs(row['moisture'] - crop_data['optimal_moisture'])
+        features.loc[idx, 'humidity_deviation'] = abs(row['humidity'] - crop_data['optimal_humidity'])
+        features.loc[idx, 'ndvi_deviation'] = abs(row['ndvi'] - crop_data['optimal_ndvi'])
+        features.loc[idx, 'rainfall_deviation'] = abs(row['rainfall'] - crop_data['optimal_rainfall'])
+    return features.values
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--check-rows', type=int, default=5_000,
+                        help='rows compared against the legacy loop')
+    args = parser.parse_args()
+    
+    model = CropRiskModel()
+    
+    sample = make_frame(model, args.check_rows, seed=7)
+    started = time.perf_counter()
+    expected = legacy_prepare_features(model, sample)
+    legacy_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    actual, _ = model.prepare_features(sample)
+    vectorized_seconds = time.perf_counter() - started
+    if not np.array_equal(expected, actual):
+        raise SystemExit("Vectorized features differ from the legacy loop")
+    print(f"Check ({args.check_rows:,} rows): identical output; "
+          f"legacy {legacy_seconds:.3f}s, vectorized {vectorized_seconds:.4f}s "
+          f"({legacy_seconds / vectorized_seconds:,.0f}x)")
+    
+    df = make_frame(model, args.rows)
+    started = time.perf_counter()
+    X, y = model.prepare_features(df)
+    seconds = time.perf_counter() - started
+    print(f"prepare_features: {args.rows:,} rows -> {X.shape} in {seconds:.2f}s "
+          f"({args.rows / seconds / 1e6:.1f}M rows/s, {X.nbytes / 2**20:,.0f} MiB)")
+
+if __name__ == '__main__':
+    main()
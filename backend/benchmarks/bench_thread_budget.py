@@ -0,0 +1,125 @@
+"""
+Benchmark inference throughput against worker and thread settings.
+
+Each configuration starts --workers processes side by side, the way
+gunicorn runs the app, with the given INFERENCE_N_JOBS / NATIVE_THREADS /
+INFERENCE_THREADS environment. Every process scores --batch-rows row
+batches from --request-threads concurrent request threads for --seconds
+seconds. The table shows node-wide throughput and the thread count each
+setting actually started.
+
+Run from backend/:
+    python benchmarks/bench_thread_budget.py --workers 1,4,16
+    python benchmarks/bench_thread_budget.py --jobs -1,1 --workers 16 --seconds 20
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import itertools
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def child(args):
+    """One worker process: score batches through the InferenceExecutor until time is up."""
+    sys.path.insert(0, BACKEND_DIR)
+    import thread_budget
+    thread_budget.apply_native_thread_limits()
+    
+    import threading
+    import numpy as np
+    from model import CropRiskModel
+    from thread_budget import InferenceExecutor
+    
+    model = CropRiskModel()
+    model.load_model(args.model)
+    executor = InferenceExecutor()
+    
+    rng = np.random.default_rng(os.getpid())
+    crops = rng.choice(model.catalog.crop_names, args.batch_rows).tolist()
+    values = rng.uniform([-5, 0.1, 20, 0.1, 0.1], [45, 1.0, 100, 1.0, 2.0], (args.batch_rows, 5))
+    executor.run(model.predict_batch, crops, *values.T)
+    
+    rows = [0] * args.request_threads
+    deadline = time.perf_counter() + args.seconds
+    
+    def request_loop(i):
+        while time.perf_counter() < deadline:
+            executor.run(model.predict_batch, crops, *values.T)
+            rows[i] += args.batch_rows
+    
+    threads = [threading.Thread(target=request_loop, args=(i,)) for i in range(args.request_threads)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds / 2)
+    peak_threads = _os_thread_count()
+    for thread in threads:
+        thread.join()
+    print(json.dumps({'rows': sum(rows), 'threads': peak_threads}))
+
+def _os_thread_count() -> int:
+    """All threads of this process, including joblib/OpenMP/BLAS workers (Linux /proc)."""
+    import threading
+    try:
+        return len(os.listdir(f'/proc/{os.getpid()}/task'))
+    except OSError:
+        return threading.active_count()
+
+def run_config(args, workers: int, n_jobs: int, native: int, inference: int) -> dict:
+    env = dict(os.environ, INFERENCE_N_JOBS=str(n_jobs), NATIVE_THREADS=str(native),
+               INFERENCE_THREADS=str(inference), FLAT_FOREST_MAX_ROWS='0', RISK_LOOKUP_GRID='false')
+    # The budget only applies if nothing upstream already pinned the pools
+    for name in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                 'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS'):
+        env.pop(name, None)
+    
+    command = [sys.executable, os.path.abspath(__file__), '--child', '--model', args.model,
+               '--batch-rows', str(args.batch_rows), '--request-threads', str(args.request_threads),
+               '--seconds', str(args.seconds)]
+    processes = [subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.PIPE,
+                                  stderr=subprocess.DEVNULL, text=True) for _ in range(workers)]
+    results = [json.loads(p.communicate()[0].strip().splitlines()[-1]) for p in processes]
+    return {
+        'rows_per_second': sum(r['rows'] for r in results) / args.seconds,
+        'threads_per_worker': max(r['threads'] for r in results)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model', default='models/trained_model.pkl')
+    parser.add_argument('--workers', default='1,2,4', help='comma-separated worker process counts')
+    parser.add_argument('--jobs', default='-1,1', help='comma-separated INFERENCE_N_JOBS values')
+    parser.add_argument('--native-threads', default='1', help='comma-separated NATIVE_THREADS values')
+    parser.add_argument('--inference-threads', default='0',
+                        help='comma-separated INFERENCE_THREADS values; 0 = cores / workers')
+    parser.add_argument('--batch-rows', type=int, default=2000,
+                        help='rows per predict; always on the sklearn path, where n_jobs applies')
+    parser.add_argument('--request-threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        child(args)
+        return
+    
+    cores = os.cpu_count() or 1
+    print(f"{cores} cores, {args.request_threads} request threads per worker, "
+          f"{args.batch_rows}-row batches, {args.seconds:.0f}s per configuration")
+    print(f"{'workers':>7} {'n_jobs':>6} {'native':>6} {'infer':>5} {'rows/s':>12} {'threads/worker':>15}")
+    
+    grid = itertools.product(
+        [int(v) for v in args.workers.split(',')], [int(v) for v in args.jobs.split(',')],
+        [int(v) for v in args.native_threads.split(',')], [int(v) for v in args.inference_threads.split(',')]
+    )
+    for workers, n_jobs, native, inference in grid:
+        inference = inference or max(1, cores // workers)
+        result = run_config(args, workers, n_jobs, native, inference)
+        print(f"{workers:7d} {n_jobs:6d} {native:6d} {inference:5d} "
+              f"{result['rows_per_second']:12,.0f} {result['threads_per_worker']:15d}")
+
+if __name__ == "__main__":
+    main()
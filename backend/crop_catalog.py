@@ -0,0 +1,179 @@
+"""
+Shared, indexed crop catalog loaded once from crop_database.json
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+DEFAULT_CROP_DATABASE_PATH = "data/crop_database.json"
+
+# Environmental factors in the column order used by every parameter table
+FACTORS = ('temperature', 'moisture', 'humidity', 'ndvi', 'rainfall')
+
+# Map factor names to database field names
+FIELD_MAPPING = {
+    'temperature': 'temp',
+    'moisture': 'moisture',
+    'humidity': 'humidity',
+    'ndvi': 'ndvi',
+    'rainfall': 'rainfall'
+}
+
+class CropCatalog:
+    """
+    Immutable snapshot of the crop database with array-backed parameter tables.
+    
+    Rows of ``optimal`` and ``tolerance`` follow ``crop_names`` and columns
+    follow ``FACTORS``. Arrays are read-only; a reload builds a new catalog
+    instead of mutating this one.
+    """
+    
+    def __init__(self, crop_db: Dict, version: str = ''):
+        self.crop_db = crop_db
+        self.version = version
+        
+        self.crop_names = tuple(crop_db['crops'].keys())
+        self.crop_index = {name: i for i, name in enumerate(self.crop_names)}
+        
+        categories = []
+        for crop_data in crop_db['crops'].values():
+            if crop_data['category'] not in categories:
+                categories.append(crop_data['category'])
+        self.categories = tuple(categories)
+        self.category_index = {name: i for i, name in enumerate(self.categories)}
+        
+        self.optimal = self._freeze(np.array([
+            [crop_data[f'optimal_{FIELD_MAPPING[f]}'] for f in FACTORS]
+            for crop_data in crop_db['crops'].values()
+        ], dtype=np.float64).reshape(-1, len(FACTORS)))
+        self.tolerance = self._freeze(np.array([
+            [crop_data[f'{FIELD_MAPPING[f]}_tolerance'] for f in FACTORS]
+            for crop_data in crop_db['crops'].values()
+        ], dtype=np.float64).reshape(-1, len(FACTORS)))
+        self.category_ids = self._freeze(np.array([
+            self.category_index[crop_data['category']]
+            for crop_data in crop_db['crops'].values()
+        ], dtype=np.int64))
+    
+    @staticmethod
+    def _freeze(array: np.ndarray) -> np.ndarray:
+        array.setflags(write=False)
+        return array
+    
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_CROP_DATABASE_PATH) -> 'CropCatalog':
+        """Parse a crop database file into a catalog."""
+        with open(path, 'rb') as f:
+            raw = f.read()
+        return cls(json.loads(raw), hashlib.sha1(raw).hexdigest()[:12])
+    
+    def __contains__(self, crop: str) -> bool:
+        return crop in self.crop_index
+    
+    def __len__(self) -> int:
+        return len(self.crop_names)
+    
+    def get(self, crop: str) -> Dict:
+        """Get the raw parameter dict for a crop."""
+        return self.crop_db['crops'][crop]
+    
+    def category_of(self, crop: str) -> str:
+        return self.crop_db['crops'][crop]['category']
+    
+    def indices(self, crops: Sequence[str]) -> np.ndarray:
+        """Map crop names to row indices; raises KeyError for unknown crops."""
+        return np.fromiter((self.crop_index[c] for c in crops), dtype=np.int64, count=len(crops))
+    
+    def list_crops(self) -> List[Dict]:
+        """Crop summaries in catalog order, as served by /api/crops."""
+        return [
+            {
+                'name': crop_name,
+                'category': crop_data['category'],
+                'display_name': crop_name.title()
+            }
+            for crop_name, crop_data in self.crop_db['crops'].items()
+        ]
+
+class CropCatalogStore:
+    """
+    Holds the current CropCatalog for one file and swaps in a new one when the
+    file changes on disk.
+    """
+    
+    def __init__(self, path: str = DEFAULT_CROP_DATABASE_PATH,
+                 reload_interval: Optional[float] = None):
+        self.path = path
+        if reload_interval is None:
+            reload_interval = float(os.getenv('CROP_CATALOG_RELOAD_INTERVAL', 2.0))
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._stamp = self._file_stamp()
+        self._catalog = CropCatalog.from_file(path)
+        self._last_check = time.monotonic()
+    
+    def _file_stamp(self):
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def current(self) -> CropCatalog:
+        """Get the current catalog, reloading first if the file has changed."""
+        if self.reload_interval >= 0 and time.monotonic() - self._last_check >= self.reload_interval:
+            self.reload()
+        return self._catalog
+    
+    def reload(self, force: bool = False) -> bool:
+        """Reload the catalog if the file changed. Returns True if swapped."""
+        with self._lock:
+            self._last_check = time.monotonic()
+            try:
+                stamp = self._file_stamp()
+                if not force and stamp == self._stamp:
+                    return False
+                catalog = CropCatalog.from_file(self.path)
+            except Exception as e:
+                # Keep serving the previous snapshot if the file is mid-write or invalid
+                print(f"Crop catalog reload warning: {e}")
+                return False
+            
+            changed = catalog.version != self._catalog.version
+            self._stamp = stamp
+            self._catalog = catalog
+        
+        if changed:
+            print(f"Crop catalog reloaded (version {catalog.version})")
+            for listener in list(self._listeners):
+                try:
+                    listener(catalog)
+                except Exception as e:
+                    print(f"Crop catalog listener error: {e}")
+        return changed
+    
+    def add_listener(self, callback):
+        """Register a callback invoked with the new catalog after each reload."""
+        self._listeners.append(callback)
+
+_stores: Dict[str, CropCatalogStore] = {}
+_stores_lock = threading.Lock()
+
+def get_catalog_store(path: str = DEFAULT_CROP_DATABASE_PATH) -> CropCatalogStore:
+    """Get the process-wide store for a crop database file."""
+    key = os.path.abspath(path)
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                store = CropCatalogStore(path)
+                _stores[key] = store
+    return store
+
+def get_crop_catalog(path: str = DEFAULT_CROP_DATABASE_PATH) -> CropCatalog:
+    """Get the current shared crop catalog."""
+    return get_catalog_store(path).current()
@@ -1,14 +1,22 @@
 import numpy as np
 import pandas as pd
-import json
 import random
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+from crop_catalog import get_crop_catalog
+
+# Factor weights per crop category, in temperature/moisture/humidity/ndvi/rainfall order
+CATEGORY_WEIGHTS = {
+    'high_moisture': [0.15, 0.35, 0.20, 0.20, 0.10],  # Moisture and NDVI most important
+    'moderate_moisture': [0.20, 0.25, 0.20, 0.25, 0.10],  # Balanced
+    'drought_tolerant': [0.30, 0.15, 0.20, 0.25, 0.10],  # Temperature and NDVI most important
+    'temperature_sensitive': [0.35, 0.20, 0.15, 0.20, 0.10]  # Temperature most important
+}
 
 class SyntheticDataGenerator:
     def __init__(self, crop_database_path: str = "data/crop_database.json"):
         """Initialize the synthetic data generator with crop database."""
-        with open(crop_database_path, 'r') as f:
-            self.crop_db = json.load(f)
+        self.catalog = get_crop_catalog(crop_database_path)
+        self.crop_db = self.catalog.crop_db
         
         self.crops = list(self.crop_db['crops'].keys())
         self.categories = {
@@ -68,17 +76,9 @@ class SyntheticDataGenerator:
         ndvi_dev = abs(row['ndvi'] - crop_data['optimal_ndvi']) / crop_data['ndvi_tolerance']
         rainfall_dev = abs(row['rainfall'] - crop_data['optimal_rainfall']) / crop_data['rainfall_tolerance']
         
-        # Weighted risk score (weights learned from crop category)
-        category = crop_data['category']
-        
-        if category == 'high_moisture':
-            weights = [0.15, 0.35, 0.20, 0.20, 0.10]  # Moisture and NDVI most important
-        elif category == 'moderate_moisture':
-            weights = [0.20, 0.25, 0.20, 0.25, 0.10]  # Balanced
-        elif category == 'drought_tolerant':
-            weights = [0.30, 0.15, 0.20, 0.25, 0.10]  # Temperature and NDVI most important
-        else:  # temperature_sensitive
-            weights = [0.35, 0.20, 0.15, 0.20, 0.10]  # Temperature most important
+        # Weighted risk score (weights learned from crop category; unknown
+        # categories are weighted like temperature_sensitive)
+        weights = CATEGORY_WEIGHTS.get(crop_data['category'], CATEGORY_WEIGHTS['temperature_sensitive'])
         
         risk_score = (weights[0] * temp_dev + 
                      weights[1] * moisture_dev + 
@@ -88,8 +88,33 @@ class SyntheticDataGenerator:
         
         return min(risk_score, 1.0)  # Cap at 1.0
     
-    def generate_training_data(self, samples_per_crop: int = 500) -> pd.DataFrame:
-        """Generate complete training dataset for all crops."""
+    def calculate_risk_scores(self, df: pd.DataFrame) -> np.ndarray:
+        """Vectorized calculate_risk_score over every row of ``df``; results are identical."""
+        row_crop_ids, unique_crops = pd.factorize(df['crop'])
+        crop_idx = self.catalog.indices(unique_crops)[row_crop_ids]
+        
+        values = df[['temperature', 'moisture', 'humidity', 'ndvi', 'rainfall']].to_numpy(dtype=np.float64)
+        deviations = np.abs(values - self.catalog.optimal[crop_idx]) / self.catalog.tolerance[crop_idx]
+        
+        category_weights = np.array([
+            CATEGORY_WEIGHTS.get(category, CATEGORY_WEIGHTS['temperature_sensitive'])
+            for category in self.catalog.categories
+        ])
+        weights = category_weights[self.catalog.category_ids[crop_idx]]
+        
+        # Same left-to-right summation as the row-wise formula
+        risk_score = weights[:, 0] * deviations[:, 0]
+        for i in range(1, deviations.shape[1]):
+            risk_score = risk_score + weights[:, i] * deviations[:, i]
+        
+        return np.minimum(risk_score, 1.0)  # Cap at 1.0
+    
+    def generate_training_data(self, samples_per_crop: int = 500, seed: Optional[int] = None) -> pd.DataFrame:
+        """Generate complete training dataset for all crops; a ``seed`` makes it reproducible."""
+        if seed is not None:
+            random.seed(seed)
+            np.random.seed(seed)
+        
         all_data = []
         
         for crop in self.crops:
@@ -99,7 +124,7 @@ class SyntheticDataGenerator:
         df = pd.concat(all_data, ignore_index=True)
         
         # Calculate risk scores
-        df['risk_score'] = df.apply(self.calculate_risk_score, axis=1)
+        df['risk_score'] = self.calculate_risk_scores(df)
         
         # Add categorical features
         df['crop_category'] = df['crop'].map({
@@ -3,7 +3,7 @@ Database management module for MongoDB and Cassandra integration
 """
 
 import os
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 from datetime import datetime, timedelta
 import json
 
@@ -78,10 +78,16 @@ class DatabaseManager:
             if self.mongodb_config['username'] and self.mongodb_config['password']:
                 connection_string = f"mongodb://{self.mongodb_config['username']}:{self.mongodb_config['password']}@{self.mongodb_config['host']}:{self.mongodb_config['port']}"
             
-            self.mongodb_client = MongoClient(connection_string, serverSelectionTimeoutMS=5000)
+            client = MongoClient(connection_string, serverSelectionTimeoutMS=5000)
             
-            # Test connection
-            self.mongodb_client.server_info()
+            # Test connection before publishing the client so writes never
+            # wait on server selection against an unreachable host
+            try:
+                client.server_info()
+            except Exception:
+                client.close()
+                raise
+            self.mongodb_client = client
             print("MongoDB connected successfully")
             return True
             
@@ -287,6 +293,103 @@ class DatabaseManager:
         
         return data_id
     
+    def save_risk_assessments(self, assessments: List[Dict[str, Any]],
+                              timestamps: Optional[List[datetime]] = None) -> List[str]:
+        """
+        Save many risk assessments with one insert per database. Returns the
+        ids that were stored, which is empty when no database is connected.
+        """
+        timestamps = timestamps or [datetime.now()] * len(assessments)
+        assessment_ids = [f"{ts.timestamp()}_{i}" for i, ts in enumerate(timestamps)]
+        
+        # Save to MongoDB
+        if self.mongodb_client and assessments:
+            db = self.mongodb_client[self.mongodb_config['database']]
+            collection = db['risk_assessments']
+            
+            documents = [
+                {
+                    '_id': assessment_id,
+                    'location': assessment_data.get('location'),
+                    'crop': assessment_data.get('crop'),
+                    'risk_score': assessment_data.get('risk_score'),
+                    'risk_level': assessment_data.get('risk_level'),
+                    'timestamp': ts,
+                    'data': json.dumps(assessment_data)
+                }
+                for assessment_id, ts, assessment_data in zip(assessment_ids, timestamps, assessments)
+            ]
+            
+            collection.insert_many(documents, ordered=False)
+        
+        # Save to Cassandra
+        if self.cassandra_session:
+            for assessment_id, ts, assessment_data in zip(assessment_ids, timestamps, assessments):
+                self.cassandra_session.execute("""
+                    INSERT INTO risk_assessments (id, location, crop, risk_score, risk_level, timestamp, data)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    assessment_id,
+                    assessment_data.get('location'),
+                    assessment_data.get('crop'),
+                    assessment_data.get('risk_score'),
+                    assessment_data.get('risk_level'),
+                    ts,
+                    json.dumps(assessment_data)
+                ))
+        
+        if not assessments or not (self.mongodb_client or self.cassandra_session):
+            return []
+        return assessment_ids
+    
+    def save_environmental_data_many(self, records: List[Dict[str, Any]],
+                                     timestamps: Optional[List[datetime]] = None) -> List[str]:
+        """
+        Save many environmental readings; each record holds 'location' and 'data'.
+        Returns the ids that were stored, which is empty when no database is connected.
+        """
+        timestamps = timestamps or [datetime.now()] * len(records)
+        data_ids = [f"{ts.timestamp()}_{i}" for i, ts in enumerate(timestamps)]
+        
+        # Save to MongoDB
+        if self.mongodb_client and records:
+            db = self.mongodb_client[self.mongodb_config['database']]
+            collection = db['environmental_data']
+            
+            documents = [
+                {
+                    '_id': data_id,
+                    'location': record['location'],
+                    'timestamp': ts,
+                    **record['data']
+                }
+                for data_id, ts, record in zip(data_ids, timestamps, records)
+            ]
+            
+            collection.insert_many(documents, ordered=False)
+        
+        # Save to Cassandra
+        if self.cassandra_session:
+            for data_id, ts, record in zip(data_ids, timestamps, records):
+                data = record['data']
+                self.cassandra_session.execute("""
+                    INSERT INTO environmental_data (id, location, timestamp, temperature, humidity, moisture, ndvi, rainfall_index)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    data_id,
+                    record['location'],
+                    ts,
+                    data.get('temperature'),
+                    data.get('humidity'),
+                    data.get('moisture'),
+                    data.get('ndvi'),
+                    data.get('rainfall_index')
+                ))
+        
+        if not records or not (self.mongodb_client or self.cassandra_session):
+            return []
+        return data_ids
+    
     def get_historical_data(self, location: str, days: int = 30) -> List[Dict[str, Any]]:
         """
         Get historical environmental data for a location
@@ -340,6 +443,33 @@ class DatabaseManager:
         
         return assessments
     
+    def iter_risk_assessments_since(self, since: Optional[datetime] = None,
+                                    batch_size: int = 5000) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Stream stored risk assessments newer than ``since`` in timestamp order,
+        ``batch_size`` documents at a time, without loading the collection
+        into memory
+        """
+        if not self.mongodb_client:
+            return
+        
+        db = self.mongodb_client[self.mongodb_config['database']]
+        collection = db['risk_assessments']
+        
+        query = {'timestamp': {'$gt': since}} if since else {}
+        cursor = collection.find(
+            query, {'crop': 1, 'timestamp': 1, 'data': 1}
+        ).sort('timestamp', 1).batch_size(batch_size)
+        
+        batch = []
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
     def close_connections(self):
         """
         Close all database connections
@@ -0,0 +1,145 @@
+"""
+Distil the CropRiskModel forest into a compact boosted model
+
+A shallow GradientBoostingRegressor is fit to the forest's own
+predictions and flattened for serving. The student is written as a
+serving artifact only if its holdout MAE against the true labels is no
+more than --max-mae-regression worse than the forest's. The forest stays
+the reference model for offline validation.
+
+Run from backend/:  python distillation.py --output models/distilled_model
+"""
+
+import os
+import time
+import argparse
+import numpy as np
+from typing import Dict, Tuple
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.metrics import mean_absolute_error
+from forest_engine import FlatForest
+from model import CropRiskModel, INPUT_COLUMNS
+from model_artifact import write_artifact
+
+DEFAULT_DISTILLED_MODEL_DIR = 'models/distilled_model'
+
+def _single_row_latency_us(engine: FlatForest, X: np.ndarray, rows: int = 500) -> float:
+    samples = np.empty(min(rows, len(X)))
+    for i in range(len(samples)):
+        started = time.perf_counter()
+        engine.predict(X[i], scaled=True)
+        samples[i] = time.perf_counter() - started
+    return float(np.percentile(samples, 50) * 1e6)
+
+def distill(teacher: CropRiskModel, samples_per_crop: int = 2000, n_estimators: int = 150,
+            max_depth: int = 3, learning_rate: float = 0.1,
+            max_mae_regression: float = None) -> Tuple[FlatForest, GradientBoostingRegressor, Dict]:
+    """
+    Fit a student to ``teacher``'s predictions on fresh synthetic data and
+    evaluate both on an independent holdout. Returns the student engine,
+    the fitted booster and a report whose ``accepted`` flag applies the gate.
+    """
+    from data.synthetic_data import SyntheticDataGenerator
+    
+    if max_mae_regression is None:
+        max_mae_regression = float(os.getenv('DISTILL_MAX_MAE_REGRESSION', 0.01))
+    
+    generator = SyntheticDataGenerator()
+    teacher_engine = teacher.artifacts.engine
+    
+    def scaled_features(df):
+        return teacher_engine.transform(teacher.transform_features(df['crop'], df[INPUT_COLUMNS]))
+    
+    train_df = generator.generate_training_data(samples_per_crop=samples_per_crop)
+    holdout_df = generator.generate_training_data(samples_per_crop=max(samples_per_crop // 4, 50))
+    X_train, X_holdout = scaled_features(train_df), scaled_features(holdout_df)
+    y_holdout = holdout_df['risk_score'].to_numpy()
+    
+    # The student learns the forest's served output, not the raw labels
+    teacher_train = np.clip(teacher_engine.predict(X_train, scaled=True), 0.0, 1.0)
+    teacher_holdout = np.clip(teacher_engine.predict(X_holdout, scaled=True), 0.0, 1.0)
+    
+    started = time.perf_counter()
+    booster = GradientBoostingRegressor(
+        n_estimators=n_estimators, max_depth=max_depth,
+        learning_rate=learning_rate, random_state=42
+    )
+    booster.fit(X_train, teacher_train)
+    fit_seconds = time.perf_counter() - started
+    
+    student = FlatForest.from_boosting(booster)
+    student.mean, student.scale = teacher_engine.mean, teacher_engine.scale
+    student_holdout = np.clip(student.predict(X_holdout, scaled=True), 0.0, 1.0)
+    
+    teacher_mae = float(mean_absolute_error(y_holdout, teacher_holdout))
+    student_mae = float(mean_absolute_error(y_holdout, student_holdout))
+    report = {
+        'teacher_version': teacher.version,
+        'train_rows': len(X_train),
+        'holdout_rows': len(X_holdout),
+        'n_estimators': n_estimators,
+        'max_depth': max_depth,
+        'learning_rate': learning_rate,
+        'fit_seconds': fit_seconds,
+        'mae_vs_teacher': float(mean_absolute_error(teacher_holdout, student_holdout)),
+        'max_error_vs_teacher': float(np.max(np.abs(teacher_holdout - student_holdout))),
+        'teacher_mae': teacher_mae,
+        'student_mae': student_mae,
+        'mae_regression': student_mae - teacher_mae,
+        'max_mae_regression': max_mae_regression,
+        'teacher_nodes': int(len(teacher_engine.value)),
+        'student_nodes': int(len(student.value)),
+        'teacher_latency_p50_us': _single_row_latency_us(teacher_engine, X_holdout),
+        'student_latency_p50_us': _single_row_latency_us(student, X_holdout)
+    }
+    report['accepted'] = report['mae_regression'] <= max_mae_regression
+    return student, booster, report
+
+def export_student(teacher: CropRiskModel, student: FlatForest, booster: GradientBoostingRegressor,
+                   report: Dict, artifact_dir: str = DEFAULT_DISTILLED_MODEL_DIR):
+    """Write an accepted student as a serving artifact alongside the forest's."""
+    if not report['accepted']:
+        raise ValueError("Refusing to export a distilled model that failed the accuracy gate")
+    
+    metadata = teacher.artifact_metadata()
+    metadata.update({
+        'model_kind': 'distilled',
+        'model_version': f"{teacher.version}-distilled",
+        'feature_importances': booster.feature_importances_.tolist(),
+        'distillation': report
+    })
+    write_artifact(artifact_dir, student, metadata)
+    print(f"Distilled model exported to {artifact_dir}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Distil the crop risk forest into a compact boosted model')
+    parser.add_argument('--model-path', default='models/trained_model.pkl')
+    parser.add_argument('--output', default=os.getenv('DISTILLED_MODEL_DIR', DEFAULT_DISTILLED_MODEL_DIR))
+    parser.add_argument('--samples-per-crop', type=int, default=2000)
+    parser.add_argument('--n-estimators', type=int, default=150)
+    parser.add_argument('--max-depth', type=int, default=3)
+    parser.add_argument('--learning-rate', type=float, default=0.1)
+    parser.add_argument('--max-mae-regression', type=float)
+    args = parser.parse_args()
+    
+    teacher = CropRiskModel()
+    teacher.load_model(args.model_path)
+    
+    student, booster, report = distill(
+        teacher, args.samples_per_crop, args.n_estimators,
+        args.max_depth, args.learning_rate, args.max_mae_regression
+    )
+    
+    print(f"Student: {report['student_nodes']:,} nodes vs teacher {report['teacher_nodes']:,}")
+    print(f"MAE vs teacher: {report['mae_vs_teacher']:.4f} (max error {report['max_error_vs_teacher']:.4f})")
+    print(f"Holdout MAE: teacher {report['teacher_mae']:.4f}, student {report['student_mae']:.4f} "
+          f"({report['mae_regression']:+.4f}, limit {report['max_mae_regression']:+.4f})")
+    print(f"Single-row p50: teacher {report['teacher_latency_p50_us']:.1f}us, "
+          f"student {report['student_latency_p50_us']:.1f}us")
+    
+    if not report['accepted']:
+        raise SystemExit("Rejected: MAE regression exceeds the threshold; nothing exported")
+    export_student(teacher, student, booster, report, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Server-sent event fan-out of live environmental data per location
+
+Each open stream keeps its request handler alive for as long as the client
+stays connected. One poller per location takes the upstream calls off the
+request path, but under gunicorn's default sync workers every subscriber
+still occupies a whole worker. Serve the app with an async worker class,
+e.g. ``gunicorn -k gevent --worker-connections 1000 app:app`` (or
+eventlet), so idle streams cost a greenlet rather than a worker.
+"""
+
+import os
+import json
+import queue
+import threading
+from typing import Dict, List, Optional
+from response_cache import quantize_location
+
+# Fields pushed to subscribers; the rest of fetch_all_data is metadata
+STREAM_FIELDS = ('temperature', 'humidity', 'soil_moisture', 'ndvi', 'rainfall_index')
+
+def format_sse(data: Dict, event: Optional[str] = None) -> str:
+    """Encode one server-sent event."""
+    message = f"data: {json.dumps(data)}\n\n"
+    if event:
+        message = f"event: {event}\n{message}"
+    return message
+
+def diff_fields(previous: Dict, current: Dict) -> Dict:
+    """Fields of ``current`` that are new or differ from ``previous``."""
+    return {k: v for k, v in current.items() if previous.get(k) != v}
+
+class Subscription:
+    """One client's bounded event queue. Old events are dropped if the client falls behind."""
+    
+    def __init__(self, channel_key: str, max_pending: int):
+        self.channel_key = channel_key
+        self.events = queue.Queue(maxsize=max_pending)
+        self.dropped = 0
+    
+    def push(self, event: str):
+        while True:
+            try:
+                self.events.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self.events.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+    
+    def next_event(self, timeout: float) -> Optional[str]:
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class _Channel:
+    """Shared poller for every subscriber of one quantized location."""
+    
+    def __init__(self, key: str, location: str):
+        self.key = key
+        self.location = location
+        self.subscribers: List[Subscription] = []
+        self.snapshot: Dict = {}
+        self.thread: Optional[threading.Thread] = None
+        self.wakeup = threading.Event()
+
+class EnvironmentStreamHub:
+    """
+    Refreshes fetch_all_data once per interval per location, no matter how
+    many clients are watching it, and pushes only the changed fields to
+    each subscriber. A location's poller stops when its last client leaves.
+    """
+    
+    def __init__(self, data_fetcher, interval: Optional[float] = None,
+                 precision: Optional[float] = None, max_pending: Optional[int] = None):
+        self.data_fetcher = data_fetcher
+        self.interval = interval or float(os.getenv('STREAM_REFRESH_INTERVAL', 30))
+        self.precision = precision or float(os.getenv('STREAM_LOCATION_PRECISION', 0.01))
+        self.max_pending = max_pending or int(os.getenv('STREAM_MAX_PENDING_EVENTS', 16))
+        self._channels: Dict[str, _Channel] = {}
+        self._lock = threading.Lock()
+        self._stats = {'refreshes': 0, 'refresh_errors': 0, 'events_sent': 0}
+    
+    def subscribe(self, location: str) -> Subscription:
+        key = quantize_location(location, self.precision)
+        subscription = Subscription(key, self.max_pending)
+        
+        with self._lock:
+            channel = self._channels.get(key)
+            if channel is None:
+                channel = self._channels[key] = _Channel(key, location)
+            channel.subscribers.append(subscription)
+            
+            # Late joiners start from the latest full snapshot
+            if channel.snapshot:
+                subscription.push(format_sse(channel.snapshot, 'snapshot'))
+            
+            if channel.thread is None:
+                channel.thread = threading.Thread(
+                    target=self._poll, args=(channel,),
+                    name=f'env-stream-{key}', daemon=True
+                )
+                channel.thread.start()
+        
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            channel = self._channels.get(subscription.channel_key)
+            if channel is None:
+                return
+            if subscription in channel.subscribers:
+                channel.subscribers.remove(subscription)
+            if not channel.subscribers:
+                del self._channels[channel.key]
+                channel.wakeup.set()
+    
+    def _poll(self, channel: _Channel):
+        while True:
+            with self._lock:
+                if self._channels.get(channel.key) is not channel:
+                    return
+            
+            try:
+                data = self.data_fetcher.fetch_all_data(channel.location)
+                current = {k: data[k] for k in STREAM_FIELDS}
+                self._count('refreshes')
+            except Exception as e:
+                print(f"Environment stream refresh error for {channel.key}: {e}")
+                self._count('refresh_errors')
+                current = None
+            
+            if current is not None:
+                self._publish(channel, current, data.get('timestamp'))
+            
+            channel.wakeup.wait(self.interval)
+    
+    def _count(self, stat: str, amount: int = 1):
+        with self._lock:
+            self._stats[stat] += amount
+    
+    def _publish(self, channel: _Channel, current: Dict, timestamp: Optional[float]):
+        with self._lock:
+            first = not channel.snapshot
+            changed = current if first else diff_fields(channel.snapshot, current)
+            channel.snapshot = current
+            subscribers = list(channel.subscribers)
+        
+        if not changed:
+            return
+        
+        if first:
+            event = format_sse(current, 'snapshot')
+        else:
+            event = format_sse({'changed': changed, 'timestamp': timestamp}, 'update')
+        for subscription in subscribers:
+            subscription.push(event)
+        self._count('events_sent', len(subscribers))
+    
+    def get_status(self) -> Dict:
+        with self._lock:
+            channels = len(self._channels)
+            subscribers = sum(len(c.subscribers) for c in self._channels.values())
+            stats = dict(self._stats)
+        return {
+            'channels': channels,
+            'subscribers': subscribers,
+            'interval_seconds': self.interval,
+            **stats
+        }
+
+def event_stream(hub: EnvironmentStreamHub, location: str, heartbeat: Optional[float] = None):
+    """
+    Yield SSE messages for ``location`` until the client disconnects. The
+    subscription is made on first iteration, so a response closed before it
+    is iterated never registers one that nothing would unsubscribe.
+    """
+    heartbeat = heartbeat or float(os.getenv('STREAM_HEARTBEAT_INTERVAL', 15))
+    subscription = hub.subscribe(location)
+    try:
+        # Tell EventSource how long to wait before reconnecting
+        yield f"retry: {int(hub.interval * 1000)}\n\n"
+        while True:
+            event = subscription.next_event(heartbeat)
+            # A comment line keeps proxies from closing an idle stream
+            yield event if event is not None else ": keep-alive\n\n"
+    finally:
+        hub.unsubscribe(subscription)
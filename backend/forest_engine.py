@@ -0,0 +1,178 @@
+"""
+Array-backed inference for a fitted RandomForestRegressor and StandardScaler
+"""
+
+import numpy as np
+from typing import Optional, Tuple
+
+class FlatForest:
+    """
+    The trees of a fitted forest concatenated into contiguous node arrays
+    (feature, threshold, left, right, value), evaluated level by level for
+    all trees at once. Leaves point at themselves, so every row can take
+    the same number of steps.
+    
+    predict() reproduces RandomForestRegressor.predict bit for bit: inputs
+    are rounded to float32 as sklearn does, compared against float64
+    thresholds, and leaf values are summed in tree order before dividing
+    by the tree count. It runs on the calling thread with no joblib dispatch.
+    
+    With ``tree_weight`` set, trees are instead combined as a boosted
+    ensemble, ``initial + sum(tree_weight * leaf)``, matching
+    GradientBoostingRegressor.predict.
+    """
+    
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray,
+                 right: np.ndarray, value: np.ndarray, roots: np.ndarray, depth: int,
+                 mean: Optional[np.ndarray] = None, scale: Optional[np.ndarray] = None,
+                 initial: float = 0.0, tree_weight: Optional[float] = None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.depth = depth
+        self.mean = mean
+        self.scale = scale
+        self.initial = initial
+        self.tree_weight = tree_weight
+        self.n_trees = len(roots)
+        self.n_features = None
+    
+    @classmethod
+    def from_estimator(cls, forest, scaler=None) -> 'FlatForest':
+        """Flatten a fitted forest, optionally folding in a fitted StandardScaler."""
+        return cls._flatten([estimator.tree_ for estimator in forest.estimators_],
+                            forest.n_features_in_, scaler)
+    
+    @classmethod
+    def from_boosting(cls, booster, scaler=None) -> 'FlatForest':
+        """Flatten a fitted single-output GradientBoostingRegressor."""
+        initial = float(booster.init_.predict(np.zeros((1, booster.n_features_in_)))[0])
+        return cls._flatten([estimator.tree_ for estimator in booster.estimators_[:, 0]],
+                            booster.n_features_in_, scaler,
+                            initial=initial, tree_weight=booster.learning_rate)
+    
+    @classmethod
+    def _flatten(cls, trees, n_features: int, scaler=None, **combine) -> 'FlatForest':
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        for tree in trees:
+            n_nodes = tree.node_count
+            node_ids = np.arange(offset, offset + n_nodes, dtype=np.int64)
+            is_leaf = tree.children_left == -1
+            
+            feature = tree.feature.astype(np.int64)
+            feature[is_leaf] = 0
+            left = np.where(is_leaf, node_ids, tree.children_left + offset)
+            right = np.where(is_leaf, node_ids, tree.children_right + offset)
+            
+            features.append(feature)
+            thresholds.append(tree.threshold.astype(np.float64))
+            lefts.append(left)
+            rights.append(right)
+            values.append(tree.value[:, 0, 0].astype(np.float64))
+            roots.append(offset)
+            depth = max(depth, tree.max_depth)
+            offset += n_nodes
+        
+        engine = cls(
+            np.concatenate(features), np.concatenate(thresholds),
+            np.concatenate(lefts), np.concatenate(rights),
+            np.concatenate(values), np.asarray(roots, dtype=np.int64), depth,
+            mean=None if scaler is None else np.asarray(scaler.mean_, dtype=np.float64),
+            scale=None if scaler is None else np.asarray(scaler.scale_, dtype=np.float64),
+            **combine
+        )
+        engine.n_features = n_features
+        return engine
+    
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """Apply the folded StandardScaler, in the same operation order as sklearn."""
+        X = np.array(X, dtype=np.float64)
+        if self.mean is not None:
+            X -= self.mean
+            X /= self.scale
+        return X
+    
+    def predict(self, X: np.ndarray, scaled: bool = False) -> np.ndarray:
+        """Forest prediction for each row of X; pass scaled=True if X is already scaled."""
+        if not scaled:
+            X = self.transform(X)
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        
+        n_rows = X.shape[0]
+        rows = np.arange(n_rows)
+        nodes = np.repeat(self.roots[:, np.newaxis], n_rows, axis=1)
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        
+        # cumsum accumulates trees strictly in order, as sklearn does, so
+        # rounding matches (a plain sum may use pairwise summation)
+        leaf_values = self.value[nodes]
+        if self.tree_weight is None:
+            total = np.cumsum(leaf_values, axis=0)[-1]
+            total /= self.n_trees
+            return total
+        
+        terms = np.empty((self.n_trees + 1, n_rows), dtype=np.float64)
+        terms[0] = self.initial
+        np.multiply(leaf_values, self.tree_weight, out=terms[1:])
+        return np.cumsum(terms, axis=0)[-1]
+    
+    def predict_with_contributions(self, X: np.ndarray,
+                                   scaled: bool = False) -> Tuple[np.ndarray, float, np.ndarray]:
+        """
+        predict() plus a per-row decision-path attribution, in the same pass.
+        
+        Each split a row passes through moves its prediction from the parent
+        node's value to the child's; that change is credited to the split
+        feature. Returns (predictions, bias, contributions) where bias is the
+        ensemble's prediction at the roots and contributions has one column
+        per feature, so ``bias + contributions.sum(axis=1)`` equals the
+        prediction up to float rounding.
+        """
+        if not scaled:
+            X = self.transform(X)
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        
+        n_rows, n_features = X.shape
+        rows = np.arange(n_rows)
+        # Flat (row, feature) bin for every tree's current split, per level
+        row_bins = rows * n_features
+        contributions = np.zeros(n_rows * n_features, dtype=np.float64)
+        nodes = np.repeat(self.roots[:, np.newaxis], n_rows, axis=1)
+        for _ in range(self.depth):
+            split_feature = self.feature[nodes]
+            go_left = X[rows, split_feature] <= self.threshold[nodes]
+            children = np.where(go_left, self.left[nodes], self.right[nodes])
+            # Leaves loop to themselves, so finished trees add zero
+            contributions += np.bincount(
+                (row_bins + split_feature).ravel(),
+                weights=(self.value[children] - self.value[nodes]).ravel(),
+                minlength=contributions.size
+            )
+            nodes = children
+        contributions = contributions.reshape(n_rows, n_features)
+        
+        leaf_values = self.value[nodes]
+        root_values = self.value[self.roots]
+        if self.tree_weight is None:
+            predictions = np.cumsum(leaf_values, axis=0)[-1]
+            predictions /= self.n_trees
+            contributions /= self.n_trees
+            return predictions, float(root_values.mean()), contributions
+        
+        terms = np.empty((self.n_trees + 1, n_rows), dtype=np.float64)
+        terms[0] = self.initial
+        np.multiply(leaf_values, self.tree_weight, out=terms[1:])
+        contributions *= self.tree_weight
+        bias = self.initial + self.tree_weight * float(root_values.sum())
+        return np.cumsum(terms, axis=0)[-1], bias, contributions
@@ -0,0 +1,220 @@
+"""
+Parallel hyperparameter search for the crop risk forest
+
+Fits every configuration of a grid in a process pool. Training and
+holdout arrays live in shared memory, so workers attach to them instead
+of receiving pickled copies. Reports wall time, fit time, serving
+latency and accuracy per configuration and marks the latency/accuracy
+Pareto front.
+
+Run from backend/:
+    python hyperparameter_search.py --workers 4 --report models/search_report.json
+    python hyperparameter_search.py --save-best --max-latency-us 150
+"""
+
+import os
+import json
+import time
+import argparse
+import itertools
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from forest_engine import FlatForest
+from model import CropRiskModel
+from training_cache import TrainingCache, TRAINING_DATA_SEED
+
+DEFAULT_GRID = {
+    'n_estimators': [25, 50, 100, 200],
+    'max_depth': [6, 8, 10, 14],
+    'min_samples_leaf': [1, 5],
+    'max_features': [1.0, 0.5]
+}
+
+# Arrays attached by each worker process, keyed by name
+_shared_arrays: Dict[str, np.ndarray] = {}
+_shared_blocks: List[shared_memory.SharedMemory] = []
+
+def share_arrays(arrays: Dict[str, np.ndarray]) -> Tuple[Dict[str, Tuple], List[shared_memory.SharedMemory]]:
+    """Copy arrays into shared memory blocks; returns worker specs and the blocks to unlink."""
+    specs, blocks = {}, []
+    for key, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        specs[key] = (block.name, array.shape, array.dtype.str)
+        blocks.append(block)
+    return specs, blocks
+
+def _attach_arrays(specs: Dict[str, Tuple]):
+    """Pool initializer: map the parent's shared blocks into this worker."""
+    for key, (name, shape, dtype) in specs.items():
+        # Workers share the parent's resource tracker; the parent unlinks the block
+        block = shared_memory.SharedMemory(name=name)
+        _shared_blocks.append(block)
+        _shared_arrays[key] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+def evaluate_config(params: Dict, latency_rows: int = 200) -> Dict:
+    """Fit one configuration on the shared data and measure accuracy and latency."""
+    X_train, y_train = _shared_arrays['X_train'], _shared_arrays['y_train']
+    X_test, y_test = _shared_arrays['X_test'], _shared_arrays['y_test']
+    
+    forest = RandomForestRegressor(random_state=42, n_jobs=1, **params)
+    started = time.perf_counter()
+    forest.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    y_pred = forest.predict(X_test)
+    predict_seconds = time.perf_counter() - started
+    
+    # Single-row latency on the serving path (FlatForest, as in predict_risk)
+    engine = FlatForest.from_estimator(forest)
+    rows = X_test[:latency_rows]
+    samples = np.empty(len(rows))
+    for i, row in enumerate(rows):
+        row_started = time.perf_counter()
+        engine.predict(row, scaled=True)
+        samples[i] = time.perf_counter() - row_started
+    
+    return {
+        'params': params,
+        'mae': float(mean_absolute_error(y_test, y_pred)),
+        'r2': float(r2_score(y_test, y_pred)),
+        'fit_seconds': fit_seconds,
+        'batch_predict_ms_per_1k': predict_seconds / len(X_test) * 1000 * 1000,
+        'latency_p50_us': float(np.percentile(samples, 50) * 1e6),
+        'latency_p95_us': float(np.percentile(samples, 95) * 1e6),
+        'n_nodes': int(len(engine.value))
+    }
+
+def pareto_front(results: List[Dict]) -> List[Dict]:
+    """Configurations no other configuration beats on both p50 latency and MAE."""
+    front = []
+    for candidate in results:
+        dominated = any(
+            other['latency_p50_us'] <= candidate['latency_p50_us'] and other['mae'] <= candidate['mae']
+            and (other['latency_p50_us'] < candidate['latency_p50_us'] or other['mae'] < candidate['mae'])
+            for other in results
+        )
+        if not dominated:
+            front.append(candidate)
+    return front
+
+def expand_grid(grid: Dict[str, List]) -> List[Dict]:
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+def run_search(X: np.ndarray, y: np.ndarray, configs: List[Dict], workers: int) -> Tuple[List[Dict], float]:
+    """Evaluate every configuration in a process pool; returns (results, wall seconds)."""
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    # Scale with training statistics only, as train_on_features does
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X_train)
+    X_test = scaler.transform(X_test)
+    specs, blocks = share_arrays({
+        'X_train': X_train, 'y_train': y_train, 'X_test': X_test, 'y_test': y_test
+    })
+    
+    results = []
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_arrays,
+                                 initargs=(specs,)) as pool:
+            futures = {pool.submit(evaluate_config, params): params for params in configs}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Config {futures[future]} failed: {e}")
+                    continue
+                results.append(result)
+                print(f"  {_format_params(result['params']):55s} MAE {result['mae']:.4f}  "
+                      f"fit {result['fit_seconds']:6.2f}s  p50 {result['latency_p50_us']:7.1f}us")
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    
+    return results, time.perf_counter() - started
+
+def pick_best(results: List[Dict], max_latency_us: Optional[float]) -> Optional[Dict]:
+    """Most accurate configuration within the latency budget."""
+    eligible = [r for r in results if max_latency_us is None or r['latency_p50_us'] <= max_latency_us]
+    return min(eligible, key=lambda r: r['mae']) if eligible else None
+
+def _format_params(params: Dict) -> str:
+    return ', '.join(f'{k}={v}' for k, v in params.items())
+
+def main():
+    parser = argparse.ArgumentParser(description='Parallel hyperparameter search for the crop risk forest')
+    parser.add_argument('--samples-per-crop', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=TRAINING_DATA_SEED,
+                        help='training data seed; runs with the same seed share cached features')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--grid', help='JSON object mapping parameter names to value lists')
+    parser.add_argument('--report', help='write the full report as JSON')
+    parser.add_argument('--max-latency-us', type=float, help='p50 latency budget for --save-best')
+    parser.add_argument('--save-best', action='store_true',
+                        help='retrain the best configuration and save it as the served model')
+    parser.add_argument('--model-path', default='models/trained_model.pkl')
+    parser.add_argument('--artifact-dir', default=os.getenv('MODEL_ARTIFACT_DIR', 'models/trained_model'))
+    args = parser.parse_args()
+    
+    from data.synthetic_data import SyntheticDataGenerator
+    
+    print("Generating training data...")
+    training_data = SyntheticDataGenerator().generate_training_data(
+        samples_per_crop=args.samples_per_crop, seed=args.seed
+    )
+    training_cache = TrainingCache()
+    model = CropRiskModel()
+    X, y = training_cache.features(training_data, model)
+    
+    configs = expand_grid(json.loads(args.grid) if args.grid else DEFAULT_GRID)
+    print(f"Searching {len(configs)} configurations on {len(X)} rows with {args.workers} workers...")
+    results, wall_seconds = run_search(X, y, configs, args.workers)
+    if not results:
+        raise SystemExit("No configuration finished")
+    
+    front = pareto_front(results)
+    for result in results:
+        result['pareto'] = result in front
+    fit_total = sum(r['fit_seconds'] for r in results)
+    
+    print(f"\nWall time {wall_seconds:.1f}s for {fit_total:.1f}s of fitting "
+          f"({fit_total / wall_seconds:.1f}x parallel speedup)")
+    print("\nLatency/accuracy Pareto front:")
+    for result in sorted(front, key=lambda r: r['latency_p50_us']):
+        print(f"  {_format_params(result['params']):55s} MAE {result['mae']:.4f}  R² {result['r2']:.4f}  "
+              f"p50 {result['latency_p50_us']:7.1f}us  p95 {result['latency_p95_us']:7.1f}us  "
+              f"fit {result['fit_seconds']:6.2f}s")
+    
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({
+                'rows': len(X),
+                'workers': args.workers,
+                'wall_seconds': wall_seconds,
+                'fit_seconds_total': fit_total,
+                'results': sorted(results, key=lambda r: r['mae'])
+            }, f, indent=2)
+        print(f"\nReport written to {args.report}")
+    
+    if args.save_best:
+        best = pick_best(results, args.max_latency_us)
+        if best is None:
+            raise SystemExit(f"No configuration meets p50 <= {args.max_latency_us}us")
+        print(f"\nTraining served model with {_format_params(best['params'])}...")
+        served = CropRiskModel(model_params=best['params'])
+        training_cache.train(served, training_data)
+        served.save_model(args.model_path)
+        served.export_artifact(args.artifact_dir)
+
+if __name__ == "__main__":
+    main()
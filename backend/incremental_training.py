@@ -0,0 +1,155 @@
+"""
+Incremental model retraining from assessments stored in MongoDB
+
+Run from backend/ (e.g. nightly from cron):  python incremental_training.py
+"""
+
+import os
+import json
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+from model import CropRiskModel
+from data.synthetic_data import SyntheticDataGenerator
+
+class IncrementalTrainer:
+    """
+    Streams assessments stored since the last checkpoint, labels them with
+    the same deviation formula as the synthetic training set, grows the
+    forest on them with warm_start and publishes a new model version as
+    both the pickle and the serving artifact.
+    """
+    
+    def __init__(self, model: CropRiskModel, database_manager,
+                 model_path: str = "models/trained_model.pkl",
+                 artifact_dir: Optional[str] = None,
+                 checkpoint_path: Optional[str] = None):
+        self.model = model
+        self.database_manager = database_manager
+        self.model_path = model_path
+        self.artifact_dir = artifact_dir or os.getenv('MODEL_ARTIFACT_DIR', 'models/trained_model')
+        self.checkpoint_path = checkpoint_path or os.getenv('RETRAIN_CHECKPOINT', 'models/retrain_checkpoint.json')
+        self.min_rows = int(os.getenv('RETRAIN_MIN_ROWS', 500))
+        self.max_rows = int(os.getenv('RETRAIN_MAX_ROWS', 1000000))
+        self.trees_per_round = int(os.getenv('RETRAIN_TREES_PER_ROUND', 20))
+        self.max_trees = int(os.getenv('RETRAIN_MAX_TREES', 300))
+        self.batch_size = int(os.getenv('RETRAIN_BATCH_SIZE', 5000))
+        self.max_mae_regression = float(os.getenv('RETRAIN_MAX_MAE_REGRESSION', 0.005))
+        self.max_mae_drift = float(os.getenv('RETRAIN_MAX_MAE_DRIFT', 0.01))
+        self.labeler = SyntheticDataGenerator()
+    
+    def load_checkpoint(self) -> Dict:
+        if not os.path.exists(self.checkpoint_path):
+            return {}
+        with open(self.checkpoint_path) as f:
+            return json.load(f)
+    
+    def save_checkpoint(self, checkpoint: Dict):
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
+    
+    def stream_rows(self, since: Optional[datetime]) -> Iterator[pd.DataFrame]:
+        """Training rows from stored assessments newer than ``since``, one frame per DB batch."""
+        catalog = self.model.catalog
+        for documents in self.database_manager.iter_risk_assessments_since(since, self.batch_size):
+            rows = []
+            for doc in documents:
+                try:
+                    values = json.loads(doc['data'])['current_values']
+                    rows.append({
+                        'crop': doc['crop'],
+                        'temperature': float(values['temperature']),
+                        'moisture': float(values['moisture']),
+                        'humidity': float(values['humidity']),
+                        'ndvi': float(values['ndvi']),
+                        'rainfall': float(values['rainfall_index']),
+                        'timestamp': doc['timestamp']
+                    })
+                except (KeyError, TypeError, ValueError):
+                    continue
+            
+            frame = pd.DataFrame(rows)
+            if not frame.empty:
+                yield frame[frame['crop'].isin(catalog.crop_index)]
+    
+    def run(self) -> Dict:
+        """Retrain once on everything stored since the checkpoint."""
+        if not self.model.estimator_loaded:
+            self.model.load_model(self.model_path)
+        
+        checkpoint = self.load_checkpoint()
+        since = datetime.fromisoformat(checkpoint['last_timestamp']) if checkpoint.get('last_timestamp') else None
+        
+        frames: List[pd.DataFrame] = []
+        row_count = 0
+        truncated = False
+        for frame in self.stream_rows(since):
+            frames.append(frame)
+            row_count += len(frame)
+            if row_count >= self.max_rows:
+                truncated = True
+                break
+        
+        if row_count < self.min_rows:
+            print(f"Incremental retrain skipped: {row_count} new rows (need {self.min_rows})")
+            return {'skipped': True, 'rows': row_count}
+        
+        df = pd.concat(frames, ignore_index=True)
+        if truncated:
+            # Rows sharing the last timestamp may continue past this batch;
+            # leave them all for the next run so none are skipped
+            df = df[df['timestamp'] < df['timestamp'].max()]
+            if len(df) < self.min_rows:
+                print(f"Incremental retrain skipped: {len(df)} rows before the last timestamp "
+                      f"(need {self.min_rows})")
+                return {'skipped': True, 'rows': len(df)}
+        df['risk_score'] = self.labeler.calculate_risk_scores(df)
+        
+        # Regressions are bounded against the MAE recorded when the current
+        # lineage started (reset whenever the model was replaced by a full training)
+        reference_mae = None
+        if checkpoint.get('model_version') == self.model.version:
+            reference_mae = checkpoint.get('reference_mae')
+        
+        print(f"Growing forest on {len(df)} new assessments...")
+        metrics = self.model.partial_fit(
+            df, self.trees_per_round, self.max_trees,
+            max_mae_regression=self.max_mae_regression,
+            reference_mae=reference_mae, max_mae_drift=self.max_mae_drift
+        )
+        
+        if metrics['accepted']:
+            self.model.save_model(self.model_path)
+            self.model.export_artifact(self.artifact_dir)
+        else:
+            # Keep serving the current version; these rows are not retried
+            print(f"Incremental retrain rejected: holdout MAE {metrics['mae_before']:.4f} -> "
+                  f"{metrics['mae_after']:.4f} (limit {self.max_mae_regression:+.4f}, "
+                  f"reference {metrics['reference_mae']:.4f} {self.max_mae_drift:+.4f})")
+        
+        # Only advance the checkpoint once the new version is on disk (or rejected)
+        self.save_checkpoint({
+            'last_timestamp': df['timestamp'].max().isoformat(),
+            'model_version': metrics['version'],
+            'reference_mae': metrics['reference_mae'],
+            'updated_at': datetime.now().isoformat(),
+            'rows': len(df)
+        })
+        
+        if metrics['accepted']:
+            print(f"Published model {metrics['version']}: {metrics['n_trees']} trees, "
+                  f"holdout MAE {metrics['mae_before']:.4f} -> {metrics['mae_after']:.4f}")
+        return metrics
+
+if __name__ == "__main__":
+    from database_manager import DatabaseManager
+    
+    database_manager = DatabaseManager()
+    database_manager.connect_mongodb()
+    if not database_manager.mongodb_client:
+        raise SystemExit("MongoDB is not available; nothing to retrain from")
+    
+    trainer = IncrementalTrainer(CropRiskModel(), database_manager)
+    trainer.run()
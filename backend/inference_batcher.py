@@ -0,0 +1,151 @@
+"""
+Micro-batching dispatcher that merges concurrent single-row predictions
+"""
+
+import os
+import time
+import queue
+import threading
+import numpy as np
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+from metrics import INFERENCE_BATCH_SIZE, INFERENCE_QUEUE_WAIT
+
+class InferenceBatcher:
+    """
+    Collects predict_risk calls from concurrent requests and answers them
+    with one forest call per batch.
+    
+    A single dispatcher thread takes the first waiting row, keeps collecting
+    until ``max_rows`` rows are queued or ``window`` seconds have passed
+    since that row arrived, then predicts the batch and resolves each
+    caller's future. A caller therefore waits at most ``window`` plus one
+    batch predict. With the default window of 0, a batch is whatever
+    queued up while the previous one ran: a lone request pays only the
+    hand-off, while a burst is served in batches. Rows are grouped by model,
+    so requests bound to different versions during a hot swap each get
+    their own model. Given an InferenceExecutor, batches are predicted on
+    its threads, at most one batch per thread at a time; while every
+    thread is busy, new rows keep queuing and join the next batch.
+    """
+    
+    def __init__(self, window: Optional[float] = None, max_rows: Optional[int] = None,
+                 executor=None):
+        self.window = window if window is not None else float(os.getenv('INFERENCE_BATCH_WINDOW_MS', 0)) / 1000
+        self.max_rows = max_rows or int(os.getenv('INFERENCE_BATCH_MAX_ROWS', 64))
+        self.executor = executor
+        # Free executor threads; the dispatcher waits for one before collecting a batch
+        self._slots = threading.Semaphore(executor.threads) if executor is not None else None
+        
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self._stats = {
+            'requests': 0,
+            'batches': 0,
+            'errors': 0
+        }
+    
+    def predict_risk(self, model, crop: str, temperature: float, moisture: float,
+                     humidity: float, ndvi: float, rainfall: float) -> Dict:
+        """Same result as ``model.predict_risk``, computed in a shared batch."""
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((model, crop, (temperature, moisture, humidity, ndvi, rainfall),
+                         future, time.perf_counter()))
+        return future.result()
+    
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        
+        return {
+            'running': self._worker is not None and self._worker.is_alive(),
+            'pending': self._queue.qsize(),
+            'window_ms': self.window * 1000,
+            'max_rows': self.max_rows,
+            'mean_batch_size': stats['requests'] / stats['batches'] if stats['batches'] else 0.0,
+            **stats
+        }
+    
+    def _ensure_worker(self):
+        # Started on first use so pre-fork servers get one dispatcher per worker
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name='inference-batcher', daemon=True
+                )
+                self._worker.start()
+    
+    def _run(self):
+        while True:
+            if self._slots is not None:
+                self._slots.acquire()
+            batch = [self._queue.get()]
+            deadline = batch[0][4] + self.window
+            while len(batch) < self.max_rows:
+                remaining = deadline - time.perf_counter()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if self.executor is not None:
+                try:
+                    self.executor.submit(self._dispatch_safely, batch, release=True)
+                except Exception as e:
+                    self._slots.release()
+                    self._fail(batch, e)
+            else:
+                self._dispatch_safely(batch)
+    
+    def _dispatch_safely(self, batch: List, release: bool = False):
+        try:
+            self._dispatch(batch)
+        except Exception as e:
+            self._fail(batch, e)
+        finally:
+            if release:
+                self._slots.release()
+    
+    def _fail(self, batch: List, error: Exception):
+        # Never leave a caller blocked on a future the dispatcher dropped
+        for item in batch:
+            if not item[3].done():
+                item[3].set_exception(error)
+    
+    def _dispatch(self, batch: List):
+        started = time.perf_counter()
+        for item in batch:
+            INFERENCE_QUEUE_WAIT.observe(started - item[4])
+        INFERENCE_BATCH_SIZE.observe(len(batch))
+        with self._lock:
+            self._stats['requests'] += len(batch)
+            self._stats['batches'] += 1
+        
+        groups = {}
+        for item in batch:
+            groups.setdefault(id(item[0]), []).append(item)
+        
+        for items in groups.values():
+            model = items[0][0]
+            try:
+                results = model.predict_risk_rows(
+                    [item[1] for item in items], np.array([item[2] for item in items])
+                )
+            except Exception:
+                # A bad row (e.g. an unknown crop) must not fail its neighbours
+                self._dispatch_individually(model, items)
+                continue
+            for item, result in zip(items, results):
+                item[3].set_result(result)
+    
+    def _dispatch_individually(self, model, items: List):
+        for _, crop, values, future, _ in items:
+            try:
+                future.set_result(model.predict_risk(crop, *values))
+            except Exception as e:
+                with self._lock:
+                    self._stats['errors'] += 1
+                future.set_exception(e)
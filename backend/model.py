@@ -2,66 +2,190 @@ import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import joblib
-import json
-from typing import Dict, List, Tuple
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+from datetime import datetime
+import copy
+import hashlib
 import os
+import threading
+import uuid
+from crop_catalog import CropCatalog, get_catalog_store
+from risk_calculator import RISK_LEVEL_THRESHOLDS, RISK_LEVELS, risk_level
+from forest_engine import FlatForest
+from model_artifact import read_artifact, write_artifact
+from risk_lookup import RiskLookupGrid
+from thread_budget import estimator_n_jobs
+
+# Raw environmental inputs, in crop catalog factor order
+INPUT_COLUMNS = ['temperature', 'moisture', 'humidity', 'ndvi', 'rainfall']
+
+FEATURE_COLUMNS = INPUT_COLUMNS + [
+    'crop_encoded', 'crop_category_encoded',
+    'temp_moisture', 'humidity_ndvi', 'temp_humidity',
+    'temp_deviation', 'moisture_deviation', 'humidity_deviation',
+    'ndvi_deviation', 'rainfall_deviation'
+]
+
+# Batches up to this size use the flattened forest; larger ones go to sklearn
+FLAT_FOREST_MAX_ROWS = int(os.getenv('FLAT_FOREST_MAX_ROWS', 1000))
+
+# Build a precomputed per-crop interpolation table for approximate
+# (risk grid / heatmap) batch predictions; it is built in the background on
+# the first approximate request, which is answered exactly until it is ready
+RISK_LOOKUP_GRID = os.getenv('RISK_LOOKUP_GRID', 'false').lower() == 'true'
+
+# Environmental factor(s) each engineered feature's contribution is credited
+# to; interaction terms are split evenly, crop codes are reported as 'crop'
+FEATURE_FACTOR_SHARES = {
+    **{name: {name: 1.0} for name in INPUT_COLUMNS},
+    'temp_moisture': {'temperature': 0.5, 'moisture': 0.5},
+    'humidity_ndvi': {'humidity': 0.5, 'ndvi': 0.5},
+    'temp_humidity': {'temperature': 0.5, 'humidity': 0.5},
+    'temp_deviation': {'temperature': 1.0},
+    'moisture_deviation': {'moisture': 1.0},
+    'humidity_deviation': {'humidity': 1.0},
+    'ndvi_deviation': {'ndvi': 1.0},
+    'rainfall_deviation': {'rainfall': 1.0}
+}
+
+def new_model_version() -> str:
+    """Unique version id: a microsecond timestamp plus a random suffix."""
+    return f"{datetime.now().strftime('%Y%m%d%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+
+def factor_attribution_matrix(feature_names: Sequence[str]) -> np.ndarray:
+    """(n_features, 6) matrix mapping feature contributions to INPUT_COLUMNS + ['crop']."""
+    factors = INPUT_COLUMNS + ['crop']
+    matrix = np.zeros((len(feature_names), len(factors)), dtype=np.float64)
+    for i, name in enumerate(feature_names):
+        for factor, share in FEATURE_FACTOR_SHARES.get(name, {'crop': 1.0}).items():
+            matrix[i, factors.index(factor)] = share
+    return matrix
+
+def build_feature_matrix(values: np.ndarray, crop_codes: np.ndarray,
+                         category_codes: np.ndarray, optimal: np.ndarray) -> np.ndarray:
+    """
+    Assemble the FEATURE_COLUMNS matrix from (n, 5) raw values, per-row
+    encoded crop/category codes and the (n, 5) optimal values of each row's crop.
+    """
+    features = np.empty((values.shape[0], len(FEATURE_COLUMNS)), dtype=np.float64)
+    t, m, h, n = values[:, 0], values[:, 1], values[:, 2], values[:, 3]
+    features[:, 0:5] = values
+    features[:, 5] = crop_codes
+    features[:, 6] = category_codes
+    np.multiply(t, m, out=features[:, 7])
+    np.multiply(h, n, out=features[:, 8])
+    np.multiply(t, h, out=features[:, 9])
+    np.subtract(values, optimal, out=features[:, 10:15])
+    np.abs(features[:, 10:15], out=features[:, 10:15])
+    return features
+
+# Forest settings used unless a search picked others
+DEFAULT_MODEL_PARAMS = {
+    'n_estimators': 100,
+    'max_depth': 10,
+    'random_state': 42,
+    'n_jobs': -1
+}
+
+class FrozenDict(dict):
+    """A dict that refuses mutation, so one instance can be shared by every request."""
+    
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Model artifacts are read-only")
+    
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+    
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+class EncodingTables(NamedTuple):
+    """Integer codes for crop names and crop categories, fixed when a model is trained."""
+    crops: FrozenDict
+    categories: FrozenDict
+    
+    @classmethod
+    def fit(cls, crops: Sequence[str], categories: Sequence[str]) -> 'EncodingTables':
+        # Codes follow sorted order, as the LabelEncoder codes earlier models were trained on
+        return cls(
+            FrozenDict((str(name), i) for i, name in enumerate(sorted(set(crops)))),
+            FrozenDict((str(name), i) for i, name in enumerate(sorted(set(categories))))
+        )
+    
+    def catalog_codes(self, catalog: CropCatalog) -> Tuple[np.ndarray, np.ndarray]:
+        """Crop and category codes per catalog row; -1 where the model never saw the name."""
+        crop_codes = np.array([self.crops.get(name, -1) for name in catalog.crop_names], dtype=np.int64)
+        category_codes = np.array([
+            self.categories.get(catalog.categories[c], -1) for c in catalog.category_ids
+        ], dtype=np.int64)
+        return crop_codes, category_codes
+
+class ModelArtifacts(NamedTuple):
+    """Values derived from a trained forest, computed once per model version."""
+    version: str
+    formula_weights: FrozenDict
+    feature_importance: FrozenDict
+    engine: FlatForest
+    factor_matrix: np.ndarray
+    lookup: Optional[RiskLookupGrid] = None
 
 class CropRiskModel:
     """Machine Learning model for crop risk assessment."""
     
-    def __init__(self, crop_database_path: str = "data/crop_database.json"):
-        self.model = RandomForestRegressor(
-            n_estimators=100,
-            max_depth=10,
-            random_state=42,
-            n_jobs=-1
-        )
+    def __init__(self, crop_database_path: str = "data/crop_database.json",
+                 model_params: Dict = None):
+        self.model = RandomForestRegressor(**{**DEFAULT_MODEL_PARAMS, **(model_params or {})})
         self.scaler = StandardScaler()
-        self.crop_encoder = LabelEncoder()
-        self.crop_db = self._load_crop_database(crop_database_path)
+        self.encoding = None
+        # (catalog version, crop codes, category codes) for the serving catalog
+        self._catalog_codes = None
+        self.catalog_store = get_catalog_store(crop_database_path)
         self.feature_columns = None
+        self.version = None
+        self.artifacts = None
+        # False when serving from an artifact, which carries no sklearn estimator
+        self.estimator_loaded = False
+        # (model version, catalog version) whose lookup grid build has started
+        self._lookup_key = None
+        self._lookup_lock = threading.Lock()
         self.is_trained = False
     
-    def _load_crop_database(self, path: str) -> Dict:
-        """Load crop database with optimal ranges."""
-        with open(path, 'r') as f:
-            return json.load(f)
+    @property
+    def catalog(self) -> CropCatalog:
+        return self.catalog_store.current()
+    
+    @property
+    def crop_db(self) -> Dict:
+        return self.catalog.crop_db
     
     def prepare_features(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
         """Prepare features for training."""
-        # Create feature matrix
-        features = df[['temperature', 'moisture', 'humidity', 'ndvi', 'rainfall']].copy()
-        
-        # Add crop as categorical feature
-        features['crop_encoded'] = self.crop_encoder.fit_transform(df['crop'])
-        
-        # Add crop category
-        crop_categories = df['crop'].map({
-            crop: self.crop_db['crops'][crop]['category'] 
-            for crop in self.crop_db['crops'].keys()
-        })
-        features['crop_category_encoded'] = self.crop_encoder.fit_transform(crop_categories)
-        
-        # Add interaction features
-        features['temp_moisture'] = features['temperature'] * features['moisture']
-        features['humidity_ndvi'] = features['humidity'] * features['ndvi']
-        features['temp_humidity'] = features['temperature'] * features['humidity']
-        
-        # Add deviation features from optimal ranges
-        for idx, row in df.iterrows():
-            crop_data = self.crop_db['crops'][row['crop']]
-            features.loc[idx, 'temp_deviation'] = abs(row['temperature'] - crop_data['optimal_temp'])
-            features.loc[idx, 'moisture_deviation'] = abs(row['moisture'] - crop_data['optimal_moisture'])
-            features.loc[idx, 'humidity_deviation'] = abs(row['humidity'] - crop_data['optimal_humidity'])
-            features.loc[idx, 'ndvi_deviation'] = abs(row['ndvi'] - crop_data['optimal_ndvi'])
-            features.loc[idx, 'rainfall_deviation'] = abs(row['rainfall'] - crop_data['optimal_rainfall'])
-        
-        self.feature_columns = features.columns.tolist()
-        X = features.values
-        y = df['risk_score'].values
+        catalog = self.catalog
+        values = df[INPUT_COLUMNS].to_numpy(dtype=np.float64)
+        
+        # Join rows to the crop parameter table through their distinct crops
+        row_crop_ids, unique_crops = pd.factorize(df['crop'])
+        unique_idx = self._crop_indices(catalog, unique_crops)
+        unique_categories = [catalog.categories[c] for c in catalog.category_ids[unique_idx]]
+        
+        # Add crop and crop category as categorical features, from tables
+        # fixed here and used unchanged at serving time
+        self.encoding = EncodingTables.fit(unique_crops, unique_categories)
+        self._catalog_codes = None
+        crop_codes, category_codes = self._encode(catalog, unique_idx)
+        
+        # Interaction and deviation-from-optimal features
+        features = build_feature_matrix(
+            values, crop_codes[row_crop_ids], category_codes[row_crop_ids],
+            catalog.optimal[unique_idx][row_crop_ids]
+        )
+        
+        self.feature_columns = list(FEATURE_COLUMNS)
+        X = features
+        y = df['risk_score'].to_numpy()
         
         return X, y
     
@@ -69,6 +193,16 @@ class CropRiskModel:
         """Train the model on the provided dataset."""
         print("Preparing features...")
         X, y = self.prepare_features(df)
+        return self.train_on_features(X, y)
+    
+    def train_on_features(self, X: np.ndarray, y: np.ndarray, encoding: EncodingTables = None) -> Dict:
+        """
+        Fit on an already engineered FEATURE_COLUMNS matrix. ``encoding`` is
+        the table the matrix was built with, when it did not come from
+        prepare_features on this model (e.g. from the training cache).
+        """
+        if encoding is not None:
+            self.set_encoding(encoding)
         
         print("Splitting data...")
         X_train, X_test, y_train, y_test = train_test_split(
@@ -106,6 +240,10 @@ class CropRiskModel:
             'cv_mae_std': cv_scores.std()
         }
         
+        # Train on every core, predict within the process's thread budget
+        self.model.n_jobs = estimator_n_jobs()
+        self.estimator_loaded = True
+        self._publish_artifacts(new_model_version())
         self.is_trained = True
         
         print(f"Training completed!")
@@ -122,42 +260,281 @@ class CropRiskModel:
         if not self.is_trained:
             raise ValueError("Model must be trained before making predictions")
         
+        catalog = self.catalog
+        crop_idx = self._crop_indices(catalog, [crop])
+        crop_data = catalog.get(crop)
+        crop_codes, category_codes = self._encode(catalog, crop_idx)
+        
         # Create feature vector
         features = np.array([[
             temperature, moisture, humidity, ndvi, rainfall,
-            self.crop_encoder.transform([crop])[0],
-            self.crop_encoder.transform([self.crop_db['crops'][crop]['category']])[0],
+            crop_codes[0],
+            category_codes[0],
             temperature * moisture,
             humidity * ndvi,
             temperature * humidity,
-            abs(temperature - self.crop_db['crops'][crop]['optimal_temp']),
-            abs(moisture - self.crop_db['crops'][crop]['optimal_moisture']),
-            abs(humidity - self.crop_db['crops'][crop]['optimal_humidity']),
-            abs(ndvi - self.crop_db['crops'][crop]['optimal_ndvi']),
-            abs(rainfall - self.crop_db['crops'][crop]['optimal_rainfall'])
+            abs(temperature - crop_data['optimal_temp']),
+            abs(moisture - crop_data['optimal_moisture']),
+            abs(humidity - crop_data['optimal_humidity']),
+            abs(ndvi - crop_data['optimal_ndvi']),
+            abs(rainfall - crop_data['optimal_rainfall'])
         ]])
         
-        # Scale features
-        features_scaled = self.scaler.transform(features)
+        # Scale and predict on the flattened forest, without joblib dispatch;
+        # the same pass attributes the score to this row's split features
+        return self._explained_results(features)[0]
+    
+    def predict_risk_rows(self, crops: Sequence[str], values: np.ndarray) -> List[Dict]:
+        """predict_risk results for many rows with one flattened-forest pass (no lookup grid)."""
+        if not self.is_trained:
+            raise ValueError("Model must be trained before making predictions")
         
-        # Predict risk score
-        risk_score = self.model.predict(features_scaled)[0]
-        risk_score = max(0.0, min(1.0, risk_score))  # Clamp to [0, 1]
+        return self._explained_results(self.transform_features(crops, values))
+    
+    def predict_batch(self, data: Union[pd.DataFrame, np.ndarray, Sequence[str]],
+                      temperature: np.ndarray = None, moisture: np.ndarray = None,
+                      humidity: np.ndarray = None, ndvi: np.ndarray = None,
+                      rainfall: np.ndarray = None, approximate: bool = False) -> Dict:
+        """
+        Predict risk scores for many rows with a single forest call.
+        
+        ``data`` is either a DataFrame or structured array with a ``crop``
+        column plus the INPUT_COLUMNS, or a sequence of crop names followed
+        by the five environmental arrays. With ``approximate=True`` the
+        scores come from the risk lookup grid once it is built; otherwise
+        they are always the model's exact predictions.
+        """
+        if not self.is_trained:
+            raise ValueError("Model must be trained before making predictions")
         
-        # Get feature importance
-        feature_importance = self.model.feature_importances_
-        feature_names = self.feature_columns
+        if temperature is None:
+            crops, values = self._batch_columns(data)
+        else:
+            crops = data
+            values = np.column_stack([temperature, moisture, humidity, ndvi, rainfall])
         
-        # Create risk formula weights
-        formula_weights = self._create_risk_formula(crop, feature_importance, feature_names)
+        lookup = self._risk_lookup() if approximate else None
+        if lookup is not None:
+            risk_scores = lookup.interpolate(crops, values)
+        else:
+            risk_scores = self.predict_exact(crops, values)
         
         return {
-            'risk_score': risk_score,
-            'risk_level': self._get_risk_level(risk_score),
-            'formula_weights': formula_weights,
-            'feature_importance': dict(zip(feature_names, feature_importance))
+            'risk_score': risk_scores,
+            'risk_level': RISK_LEVELS[np.searchsorted(RISK_LEVEL_THRESHOLDS, risk_scores, side='right')],
+            'formula_weights': self.artifacts.formula_weights
         }
     
+    def _risk_lookup(self) -> Optional[RiskLookupGrid]:
+        """Lookup grid for the serving version and catalog, or None while it is not built."""
+        artifacts = self.artifacts
+        catalog_version = self.catalog.version
+        if artifacts.lookup is not None and artifacts.lookup.catalog_version == catalog_version:
+            return artifacts.lookup
+        if not RISK_LOOKUP_GRID:
+            return None
+        
+        with self._lookup_lock:
+            key = (artifacts.version, catalog_version)
+            if self._lookup_key != key:
+                self._lookup_key = key
+                threading.Thread(
+                    target=self._build_lookup, args=(artifacts,),
+                    name=f'risk-lookup-{artifacts.version}', daemon=True
+                ).start()
+        return None
+    
+    def _build_lookup(self, artifacts: ModelArtifacts):
+        try:
+            lookup = RiskLookupGrid.build(self)
+        except Exception as e:
+            print(f"Risk lookup grid not built, serving exact predictions: {e}")
+            return
+        
+        # Attach it only if no other version was published meanwhile
+        with self._lookup_lock:
+            if self.artifacts is not artifacts:
+                return
+            self.artifacts = artifacts._replace(lookup=lookup)
+        print(f"Risk lookup grid for {artifacts.version} built in {lookup.error['build_seconds']:.1f}s, "
+              f"max interpolation error {lookup.error['max_abs_error']:.4f}")
+    
+    def predict_exact(self, crops: Sequence[str], values: np.ndarray) -> np.ndarray:
+        """Clamped model risk scores for crop names and (n, 5) inputs, bypassing any lookup grid."""
+        features = self.transform_features(crops, values)
+        if len(features) <= FLAT_FOREST_MAX_ROWS or not self.estimator_loaded:
+            raw_scores = self.artifacts.engine.predict(features)
+        else:
+            raw_scores = self.model.predict(self.scaler.transform(features))
+        return np.clip(raw_scores, 0.0, 1.0)
+    
+    def transform_features(self, crops: Sequence[str], values: np.ndarray) -> np.ndarray:
+        """Feature matrix for crop names and (n, 5) inputs using the model's encoding tables."""
+        values = np.asarray(values, dtype=np.float64)
+        catalog = self.catalog
+        
+        # Encode each distinct crop once instead of once per row
+        inverse, unique_crops = pd.factorize(np.asarray(crops))
+        crop_idx = self._crop_indices(catalog, unique_crops)
+        crop_codes, category_codes = self._encode(catalog, crop_idx)
+        
+        return build_feature_matrix(
+            values, crop_codes[inverse], category_codes[inverse], catalog.optimal[crop_idx][inverse]
+        )
+    
+    def _explained_results(self, features: np.ndarray) -> List[Dict]:
+        """predict_risk dicts for feature rows, with per-row factor contributions."""
+        artifacts = self.artifacts
+        raw_scores, baseline, contributions = artifacts.engine.predict_with_contributions(features)
+        factor_contributions = contributions @ artifacts.factor_matrix
+        
+        results = []
+        for risk_score, row in zip(np.clip(raw_scores, 0.0, 1.0).tolist(), factor_contributions.tolist()):
+            results.append({
+                'risk_score': risk_score,
+                'risk_level': self._get_risk_level(risk_score),
+                # Formula weights and feature importance are fixed per model version
+                'formula_weights': artifacts.formula_weights,
+                'feature_importance': artifacts.feature_importance,
+                # baseline_risk + contributions = this row's unclamped score
+                'baseline_risk': baseline,
+                'factor_contributions': dict(zip(INPUT_COLUMNS, row[:-1])),
+                'crop_contribution': row[-1]
+            })
+        return results
+    
+    def set_encoding(self, encoding: EncodingTables):
+        """Adopt encoding tables fixed elsewhere, as prepare_features would have built them."""
+        self.encoding = encoding
+        self._catalog_codes = None
+        self.feature_columns = list(FEATURE_COLUMNS)
+    
+    def _crop_indices(self, catalog: CropCatalog, crops: Sequence[str]) -> np.ndarray:
+        """Catalog rows for crop names; raises ValueError for crops not in the catalog."""
+        unknown = [crop for crop in crops if crop not in catalog]
+        if unknown:
+            raise ValueError(f"Unknown crop: {', '.join(map(str, unknown))}")
+        return catalog.indices(crops)
+    
+    def _encode(self, catalog: CropCatalog, crop_idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Crop and category codes for catalog rows ``crop_idx``."""
+        cached = self._catalog_codes
+        if cached is None or cached[0] != catalog.version:
+            cached = (catalog.version, *self.encoding.catalog_codes(catalog))
+            self._catalog_codes = cached
+        crop_codes, category_codes = cached[1][crop_idx], cached[2][crop_idx]
+        
+        if (crop_codes < 0).any() or (category_codes < 0).any():
+            unknown = [catalog.crop_names[i] for i in np.unique(crop_idx[(crop_codes < 0) | (category_codes < 0)])]
+            raise ValueError(f"Model was not trained on crop(s): {', '.join(unknown)}")
+        return crop_codes, category_codes
+    
+    def partial_fit(self, df: pd.DataFrame, n_new_trees: int = 20, max_trees: int = 300,
+                    version: str = None, max_mae_regression: float = None,
+                    reference_mae: float = None, max_mae_drift: float = None) -> Dict:
+        """
+        Grow the forest with ``n_new_trees`` trees fit on ``df`` only (warm_start),
+        keeping the encoders and scaler fixed. The oldest trees beyond
+        ``max_trees`` are dropped, so the forest follows a rolling window of
+        recent data. The grown forest is swapped in only once it is complete,
+        and only if its holdout MAE on ``df`` is at most ``max_mae_regression``
+        worse than the current forest's and at most ``max_mae_drift`` worse
+        than ``reference_mae`` (the current forest's MAE when not given), so
+        small regressions cannot pile up over many rounds. Otherwise
+        ``accepted`` is False and the current model stays in place.
+        """
+        if max_mae_regression is None:
+            max_mae_regression = float(os.getenv('RETRAIN_MAX_MAE_REGRESSION', 0.005))
+        if max_mae_drift is None:
+            max_mae_drift = float(os.getenv('RETRAIN_MAX_MAE_DRIFT', 0.01))
+        if not self.estimator_loaded:
+            raise ValueError("Incremental training needs the pickled estimator, not a serving artifact")
+        version = version or new_model_version()
+        if version == self.version:
+            raise ValueError(f"Model version {version} is already in use")
+        
+        X = self.transform_features(df['crop'], df[INPUT_COLUMNS])
+        y = df['risk_score'].to_numpy()
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42
+        )
+        X_train_scaled = self.scaler.transform(X_train)
+        X_test_scaled = self.scaler.transform(X_test)
+        
+        mae_before = mean_absolute_error(y_test, self.model.predict(X_test_scaled))
+        if reference_mae is None:
+            reference_mae = mae_before
+        
+        # Grow a copy so requests keep using the current forest meanwhile
+        forest = copy.deepcopy(self.model)
+        keep = max(0, min(len(forest.estimators_), max_trees - n_new_trees))
+        trees_dropped = len(forest.estimators_) - keep
+        forest.estimators_ = forest.estimators_[trees_dropped:]
+        forest.warm_start = True
+        forest.n_estimators = keep + n_new_trees
+        # warm_start seeds tree i from position i of random_state's stream, so
+        # with the window truncated the same seed would give the new trees the
+        # positions (and bootstrap samples) of earlier ones; draw a new stream
+        forest.random_state = int(hashlib.sha256(version.encode()).hexdigest()[:8], 16)
+        forest.n_jobs = DEFAULT_MODEL_PARAMS['n_jobs']
+        forest.fit(X_train_scaled, y_train)
+        forest.warm_start = False
+        forest.n_jobs = estimator_n_jobs()
+        
+        mae_after = mean_absolute_error(y_test, forest.predict(X_test_scaled))
+        accepted = (mae_after - mae_before <= max_mae_regression
+                    and mae_after - reference_mae <= max_mae_drift)
+        
+        if accepted:
+            self.model = forest
+            self._publish_artifacts(version)
+        
+        return {
+            'accepted': accepted,
+            'version': self.version,
+            'rows': len(df),
+            'trees_added': n_new_trees,
+            'trees_dropped': trees_dropped,
+            'n_trees': len(forest.estimators_),
+            'mae_before': mae_before,
+            'mae_after': mae_after,
+            'reference_mae': reference_mae
+        }
+    
+    @staticmethod
+    def _batch_columns(data: Union[pd.DataFrame, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """Split a DataFrame or structured array into crop names and the (n, 5) input matrix."""
+        if isinstance(data, pd.DataFrame):
+            return data['crop'].to_numpy(), data[INPUT_COLUMNS].to_numpy(dtype=np.float64)
+        
+        names = getattr(getattr(data, 'dtype', None), 'names', None)
+        if not names:
+            raise ValueError("predict_batch expects a DataFrame, a structured array or per-column arrays")
+        missing = [c for c in ['crop'] + INPUT_COLUMNS if c not in names]
+        if missing:
+            raise ValueError(f"Missing batch columns: {', '.join(missing)}")
+        return data['crop'], np.column_stack([data[c] for c in INPUT_COLUMNS])
+    
+    def _publish_artifacts(self, version: str, feature_importance: np.ndarray = None,
+                           engine: FlatForest = None):
+        """Derive formula weights and feature importance for the current forest."""
+        if feature_importance is None:
+            feature_importance = self.model.feature_importances_
+        formula_weights = self._create_risk_formula(None, feature_importance, self.feature_columns)
+        artifacts = ModelArtifacts(
+            version=version,
+            formula_weights=FrozenDict((k, float(v)) for k, v in formula_weights.items()),
+            feature_importance=FrozenDict(
+                (name, float(value)) for name, value in zip(self.feature_columns, feature_importance)
+            ),
+            engine=engine or FlatForest.from_estimator(self.model, self.scaler),
+            factor_matrix=factor_attribution_matrix(self.feature_columns)
+        )
+        # Lookup grid builds attach to artifacts under the same lock
+        with self._lookup_lock:
+            self.artifacts = artifacts
+            self.version = version
+    
     def _create_risk_formula(self, crop: str, feature_importance: np.ndarray, 
                            feature_names: List[str]) -> Dict:
         """Create risk formula with learned weights."""
@@ -202,26 +579,24 @@ class CropRiskModel:
     
     def _get_risk_level(self, risk_score: float) -> str:
         """Convert risk score to risk level."""
-        if risk_score < 0.3:
-            return "Low Risk"
-        elif risk_score < 0.6:
-            return "Medium Risk"
-        else:
-            return "High Risk"
+        return risk_level(risk_score)
     
     def save_model(self, model_path: str = "models/trained_model.pkl"):
         """Save the trained model."""
         if not self.is_trained:
             raise ValueError("Model must be trained before saving")
+        if not self.estimator_loaded:
+            raise ValueError("Model was loaded from a serving artifact and has no estimator to save")
         
         os.makedirs(os.path.dirname(model_path), exist_ok=True)
         
         model_data = {
             'model': self.model,
             'scaler': self.scaler,
-            'crop_encoder': self.crop_encoder,
+            'encoding': {'crops': dict(self.encoding.crops), 'categories': dict(self.encoding.categories)},
             'feature_columns': self.feature_columns,
-            'crop_db': self.crop_db
+            'crop_db': self.crop_db,
+            'version': self.version
         }
         
         joblib.dump(model_data, model_path)
@@ -234,25 +609,91 @@ class CropRiskModel:
         
         model_data = joblib.load(model_path)
         self.model = model_data['model']
+        self.model.n_jobs = estimator_n_jobs()
         self.scaler = model_data['scaler']
-        self.crop_encoder = model_data['crop_encoder']
+        if 'encoding' in model_data:
+            self.encoding = EncodingTables(
+                FrozenDict(model_data['encoding']['crops']), FrozenDict(model_data['encoding']['categories'])
+            )
+        else:
+            # Older pickles kept one LabelEncoder last fitted on categories;
+            # crop codes were the sorted index of the crops it was trained on
+            self.encoding = EncodingTables.fit(
+                model_data['crop_db']['crops'].keys(), model_data['crop_encoder'].classes_
+            )
+        self._catalog_codes = None
         self.feature_columns = model_data['feature_columns']
-        self.crop_db = model_data['crop_db']
+        
+        # Older artifacts carry no version; identify them by content
+        version = model_data.get('version')
+        if version is None:
+            with open(model_path, 'rb') as f:
+                version = hashlib.sha1(f.read()).hexdigest()[:12]
+        self.estimator_loaded = True
+        self._publish_artifacts(version)
         self.is_trained = True
         
         print(f"Model loaded from {model_path}")
+    
+    def export_artifact(self, artifact_dir: str = "models/trained_model"):
+        """Write the serving artifact: memory-mappable tree arrays plus a JSON manifest."""
+        if not self.is_trained:
+            raise ValueError("Model must be trained before exporting")
+        
+        if write_artifact(artifact_dir, self.artifacts.engine, self.artifact_metadata()):
+            print(f"Model artifact exported to {artifact_dir}")
+        else:
+            print(f"Model artifact export skipped: another process is exporting to {artifact_dir}")
+    
+    def artifact_metadata(self) -> Dict:
+        """Manifest fields describing this model, beyond the tree arrays."""
+        return {
+            'model_kind': 'forest',
+            'model_version': self.version,
+            'feature_columns': self.feature_columns,
+            'feature_importances': list(self.artifacts.feature_importance.values()),
+            'crop_codes': dict(self.encoding.crops),
+            'category_codes': dict(self.encoding.categories),
+            'crop_catalog_version': self.catalog.version
+        }
+    
+    def load_artifact(self, artifact_dir: str = "models/trained_model"):
+        """Load a serving artifact; tree arrays are memory-mapped, not copied."""
+        engine, manifest = read_artifact(artifact_dir, FEATURE_COLUMNS)
+        
+        if manifest.get('crop_catalog_version') != self.catalog.version:
+            print(f"Warning: artifact was trained against crop catalog "
+                  f"{manifest.get('crop_catalog_version')}, serving {self.catalog.version}")
+        
+        if 'crop_codes' in manifest:
+            self.encoding = EncodingTables(
+                FrozenDict(manifest['crop_codes']), FrozenDict(manifest['category_codes'])
+            )
+        else:
+            # Artifacts exported before the encoding tables recorded only the category classes
+            self.encoding = EncodingTables.fit(self.catalog.crop_names, manifest['crop_encoder_classes'])
+        self._catalog_codes = None
+        self.feature_columns = manifest['feature_columns']
+        self.estimator_loaded = False
+        self._publish_artifacts(
+            manifest['model_version'], np.asarray(manifest['feature_importances']), engine
+        )
+        self.is_trained = True
+        
+        print(f"Model artifact {manifest['model_version']} loaded from {artifact_dir}")
 
 if __name__ == "__main__":
-    # Generate and train model
+    # Generate and train model, reusing an identical earlier training if cached
     from data.synthetic_data import SyntheticDataGenerator
+    from training_cache import TrainingCache, TRAINING_DATA_SEED
     
     print("Generating synthetic training data...")
     generator = SyntheticDataGenerator()
-    training_data = generator.generate_training_data(samples_per_crop=500)
+    training_data = generator.generate_training_data(samples_per_crop=500, seed=TRAINING_DATA_SEED)
     
     print("Training model...")
     model = CropRiskModel()
-    metrics = model.train(training_data)
+    metrics = TrainingCache().train(model, training_data)
     
     print("Saving model...")
     model.save_model()
@@ -0,0 +1,197 @@
+"""
+Versioned, memory-mappable model artifact: raw .npy tree arrays plus a JSON manifest
+
+An artifact path is a directory of immutable version directories and a
+CURRENT file naming the one being served. Publishing writes a new
+version directory and then replaces CURRENT, so readers always find a
+complete artifact and never rename or delete files another worker may
+have memory-mapped (which Windows refuses).
+"""
+
+import os
+import json
+import time
+import uuid
+import shutil
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Tuple
+from forest_engine import FlatForest
+
+ARTIFACT_FORMAT_VERSION = 2
+# Version 2 added initial/tree_weight for boosted (distilled) models
+SUPPORTED_FORMAT_VERSIONS = (1, 2)
+MANIFEST_NAME = 'manifest.json'
+CURRENT_NAME = 'CURRENT'
+EXPORT_LOCK_NAME = '.export.lock'
+
+# An export lock older than this is left over from a crashed process
+EXPORT_LOCK_STALE_SECONDS = 600
+
+# Array name -> (FlatForest attribute, dtype)
+ARTIFACT_ARRAYS = {
+    'feature': ('feature', np.int64),
+    'threshold': ('threshold', np.float64),
+    'left': ('left', np.int64),
+    'right': ('right', np.int64),
+    'value': ('value', np.float64),
+    'roots': ('roots', np.int64),
+    'scaler_mean': ('mean', np.float64),
+    'scaler_scale': ('scale', np.float64)
+}
+
+class ArtifactSchemaError(ValueError):
+    """Raised when an artifact does not match the format or feature schema we serve."""
+
+def resolve_artifact(path: str) -> str:
+    """Directory of the version ``path`` currently serves (``path`` itself for the old flat layout)."""
+    try:
+        with open(os.path.join(path, CURRENT_NAME)) as f:
+            return os.path.join(path, f.read().strip())
+    except FileNotFoundError:
+        return path
+
+def artifact_manifest_path(path: str) -> str:
+    return os.path.join(resolve_artifact(path), MANIFEST_NAME)
+
+def write_artifact(path: str, engine: FlatForest, metadata: Dict) -> bool:
+    """
+    Publish ``engine`` and ``metadata`` as a new version of the artifact at
+    ``path``. Only one process exports at a time: if another holds the
+    export lock this returns False without writing.
+    """
+    os.makedirs(path, exist_ok=True)
+    lock_path = os.path.join(path, EXPORT_LOCK_NAME)
+    if not _acquire_lock(lock_path):
+        return False
+    try:
+        _write_version(path, engine, metadata)
+    finally:
+        os.remove(lock_path)
+    return True
+
+def _write_version(path: str, engine: FlatForest, metadata: Dict):
+    previous = os.path.basename(resolve_artifact(path))
+    version_name = f"{metadata.get('model_version', 'artifact')}-{uuid.uuid4().hex[:8]}"
+    tmp_path = os.path.join(path, f'.tmp-{version_name}')
+    os.makedirs(tmp_path)
+    
+    arrays = {}
+    for name, (attribute, dtype) in ARTIFACT_ARRAYS.items():
+        array = np.ascontiguousarray(getattr(engine, attribute), dtype=dtype)
+        np.save(os.path.join(tmp_path, f'{name}.npy'), array)
+        arrays[name] = {'dtype': np.dtype(dtype).str, 'shape': list(array.shape)}
+    
+    manifest = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'n_trees': engine.n_trees,
+        'n_nodes': int(len(engine.value)),
+        'depth': engine.depth,
+        'n_features': engine.n_features,
+        'initial': engine.initial,
+        'tree_weight': engine.tree_weight,
+        'arrays': arrays,
+        **metadata
+    }
+    with open(os.path.join(tmp_path, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    # A fresh, unique name: nothing can have it open yet
+    os.rename(tmp_path, os.path.join(path, version_name))
+    
+    # The single atomic step that switches readers to the new version
+    pointer_tmp = os.path.join(path, f'.{CURRENT_NAME}.tmp-{os.getpid()}')
+    with open(pointer_tmp, 'w') as f:
+        f.write(version_name)
+    os.replace(pointer_tmp, os.path.join(path, CURRENT_NAME))
+    
+    # Keep the previous version for workers still mapping it; older ones and
+    # the old flat layout's files go (best effort: mapped files may be locked)
+    for name in os.listdir(path):
+        entry = os.path.join(path, name)
+        if name in (version_name, previous, CURRENT_NAME, EXPORT_LOCK_NAME):
+            continue
+        if os.path.isdir(entry):
+            shutil.rmtree(entry, ignore_errors=True)
+        elif name == MANIFEST_NAME or name.endswith('.npy'):
+            try:
+                os.remove(entry)
+            except OSError:
+                pass
+
+def _acquire_lock(lock_path: str) -> bool:
+    for _ in range(2):
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) < EXPORT_LOCK_STALE_SECONDS:
+                    return False
+                os.remove(lock_path)
+            except FileNotFoundError:
+                pass
+    return False
+
+def read_artifact(path: str, feature_columns: List[str], mmap: bool = True) -> Tuple[FlatForest, Dict]:
+    """
+    Load the current version of an artifact, memory-mapping the tree arrays
+    so every worker process shares the same physical pages. Raises
+    ArtifactSchemaError if it does not match ``feature_columns``.
+    """
+    path = resolve_artifact(path)
+    with open(os.path.join(path, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    
+    if manifest.get('format_version') not in SUPPORTED_FORMAT_VERSIONS:
+        raise ArtifactSchemaError(
+            f"Unsupported artifact format {manifest.get('format_version')}, "
+            f"expected one of {SUPPORTED_FORMAT_VERSIONS}"
+        )
+    if manifest.get('feature_columns') != list(feature_columns):
+        raise ArtifactSchemaError(
+            f"Artifact features {manifest.get('feature_columns')} do not match {list(feature_columns)}"
+        )
+    
+    arrays = {}
+    for name, (attribute, dtype) in ARTIFACT_ARRAYS.items():
+        array = np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r' if mmap else None)
+        expected = manifest['arrays'].get(name, {})
+        if array.dtype != np.dtype(dtype) or list(array.shape) != expected.get('shape'):
+            raise ArtifactSchemaError(
+                f"Array {name} is {array.dtype}{list(array.shape)}, manifest says "
+                f"{expected.get('dtype')}{expected.get('shape')}"
+            )
+        # Plain ndarray views of the mapping avoid memmap subclass overhead on indexing
+        arrays[attribute] = array.view(np.ndarray)
+    
+    _validate_structure(arrays, manifest)
+    
+    engine = FlatForest(
+        arrays['feature'], arrays['threshold'], arrays['left'], arrays['right'],
+        arrays['value'], arrays['roots'], manifest['depth'],
+        mean=arrays['mean'], scale=arrays['scale'],
+        initial=manifest.get('initial', 0.0), tree_weight=manifest.get('tree_weight')
+    )
+    engine.n_features = manifest['n_features']
+    return engine, manifest
+
+def _validate_structure(arrays: Dict[str, np.ndarray], manifest: Dict):
+    """Cheap consistency checks so a corrupt artifact fails at load, not mid-request."""
+    n_nodes = manifest['n_nodes']
+    n_features = manifest['n_features']
+    
+    if n_features != len(manifest['feature_columns']):
+        raise ArtifactSchemaError(f"n_features {n_features} does not match the feature columns")
+    if len(arrays['mean']) != n_features or len(arrays['scale']) != n_features:
+        raise ArtifactSchemaError("Scaler arrays do not match n_features")
+    if len(arrays['roots']) != manifest['n_trees']:
+        raise ArtifactSchemaError("Root count does not match n_trees")
+    for name in ('feature', 'threshold', 'left', 'right', 'value'):
+        if len(arrays[name]) != n_nodes:
+            raise ArtifactSchemaError(f"Array {name} does not have n_nodes entries")
+    if n_nodes and (arrays['feature'].min() < 0 or arrays['feature'].max() >= n_features):
+        raise ArtifactSchemaError("Split features out of range")
+    for name in ('left', 'right', 'roots'):
+        if n_nodes and (arrays[name].min() < 0 or arrays[name].max() >= n_nodes):
+            raise ArtifactSchemaError(f"Node references in {name} out of range")
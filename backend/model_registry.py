@@ -0,0 +1,205 @@
+"""
+Serving model registry with background reload and atomic hot-swap
+"""
+
+import os
+import time
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+from model import CropRiskModel
+from model_artifact import artifact_manifest_path
+
+class ModelRegistry:
+    """
+    Owns the CropRiskModel that serves requests and replaces it when a new
+    version appears on disk.
+    
+    Every candidate is loaded into a fresh CropRiskModel and warmed on the
+    watcher thread, then published with a single reference assignment.
+    Published models are never mutated, so a request that took current()
+    finishes on that version even if a swap happens meanwhile.
+    """
+    
+    def __init__(self, model_path: str = "models/trained_model.pkl",
+                 artifact_dir: str = None, crop_database_path: str = "data/crop_database.json"):
+        self.model_path = model_path
+        self.artifact_dir = artifact_dir or os.getenv('MODEL_ARTIFACT_DIR', 'models/trained_model')
+        # Serve the compact distilled model (see distillation.py) when one has passed its gate
+        self.serve_distilled = os.getenv('SERVE_DISTILLED_MODEL', 'false').lower() == 'true'
+        self.distilled_model_dir = os.getenv('DISTILLED_MODEL_DIR', 'models/distilled_model')
+        self.watch_interval = float(os.getenv('MODEL_WATCH_INTERVAL', 30))
+        self.crop_database_path = crop_database_path
+        
+        # Untrained until the first load; callers fall back to rule-based scoring
+        self._active = CropRiskModel(crop_database_path)
+        self._listeners: List[Callable[[CropRiskModel], None]] = []
+        self._load_lock = threading.Lock()
+        self._source_signature = None
+        self._stop = threading.Event()
+        self._watcher = None
+        
+        self.source = None
+        self.loaded_at = None
+        self.swaps = 0
+        self.rejected = 0
+        self.last_error = None
+    
+    def current(self) -> CropRiskModel:
+        return self._active
+    
+    @property
+    def version(self) -> Optional[str]:
+        return self._active.version
+    
+    def add_listener(self, listener: Callable[[CropRiskModel], None]):
+        """Call ``listener(model)`` after each swap, e.g. to drop cached responses."""
+        self._listeners.append(listener)
+    
+    def publish(self, model: CropRiskModel, source: str):
+        """Make ``model`` the serving model."""
+        previous = self._active
+        self._active = model
+        self.source = source
+        self.loaded_at = time.time()
+        self._source_signature = self._read_source_signature()
+        if previous.is_trained:
+            self.swaps += 1
+            print(f"Model {previous.version} replaced by {model.version} ({source})")
+        
+        for listener in self._listeners:
+            try:
+                listener(model)
+            except Exception as e:
+                print(f"Model swap listener error: {e}")
+    
+    def reload(self) -> bool:
+        """
+        Load the newest model on disk and swap it in once warmed. Returns
+        True if a new version was published. Raises if nothing can be loaded.
+        """
+        with self._load_lock:
+            candidate, source = self._load_candidate()
+            current = self._active
+            if current.is_trained and candidate.version == current.version:
+                self._source_signature = self._read_source_signature()
+                return False
+            
+            try:
+                self._warm(candidate)
+            except Exception as e:
+                # Keep serving a working model rather than one that cannot predict
+                if current.is_trained:
+                    self.rejected += 1
+                    self.last_error = f"Model {candidate.version} failed warm-up: {e}"
+                    self._source_signature = self._read_source_signature()
+                    print(self.last_error)
+                    return False
+                print(f"Model warm-up warning: {e}")
+            
+            self.publish(candidate, source)
+            return True
+    
+    def train(self, samples_per_crop: int = 500):
+        """
+        Train a model on synthetic data, save it and publish it. An identical
+        earlier training is loaded from the training cache instead of refit.
+        """
+        from data.synthetic_data import SyntheticDataGenerator
+        from training_cache import TrainingCache, TRAINING_DATA_SEED
+        
+        with self._load_lock:
+            model = CropRiskModel(self.crop_database_path)
+            training_data = SyntheticDataGenerator().generate_training_data(
+                samples_per_crop=samples_per_crop, seed=TRAINING_DATA_SEED
+            )
+            TrainingCache().train(model, training_data)
+            model.save_model(self.model_path)
+            self._export_artifact(model)
+            self.publish(model, 'trained')
+            print("Model training complete!")
+    
+    def start_watching(self):
+        """Poll for new model versions every MODEL_WATCH_INTERVAL seconds (0 disables)."""
+        if self.watch_interval <= 0 or self._watcher is not None:
+            return
+        self._watcher = threading.Thread(target=self._watch, name='model-registry-watcher', daemon=True)
+        self._watcher.start()
+    
+    def stop(self):
+        self._stop.set()
+    
+    def get_status(self) -> Dict:
+        model = self._active
+        return {
+            'version': model.version,
+            'loaded': model.is_trained,
+            'source': self.source,
+            'loaded_at': self.loaded_at,
+            'swaps': self.swaps,
+            'rejected': self.rejected,
+            'last_error': self.last_error,
+            'watch_interval': self.watch_interval
+        }
+    
+    def _watch(self):
+        while not self._stop.wait(self.watch_interval):
+            if self._read_source_signature() == self._source_signature:
+                continue
+            try:
+                self.reload()
+            except Exception as e:
+                self.last_error = str(e)
+                self._source_signature = self._read_source_signature()
+                print(f"Model reload error: {e}")
+    
+    def _load_candidate(self) -> Tuple[CropRiskModel, str]:
+        """Load the preferred model source into a new, unpublished CropRiskModel."""
+        model = CropRiskModel(self.crop_database_path)
+        if (self.serve_distilled and self._artifact_is_current(self.distilled_model_dir)
+                and self._load_artifact(model, self.distilled_model_dir)):
+            return model, 'distilled artifact'
+        if self._artifact_is_current(self.artifact_dir) and self._load_artifact(model, self.artifact_dir):
+            return model, 'artifact'
+        
+        model.load_model(self.model_path)
+        self._export_artifact(model)
+        return model, 'pickle'
+    
+    def _warm(self, model: CropRiskModel):
+        """Run every crop through both prediction paths before the model takes traffic."""
+        crops = list(model.catalog.crop_names)
+        values = model.catalog.optimal
+        model.predict_batch(crops, *values.T)
+        model.predict_risk(crops[0], *values[0])
+    
+    def _artifact_is_current(self, artifact_dir: str) -> bool:
+        """True if the serving artifact exists and is not older than the pickled model."""
+        manifest_path = artifact_manifest_path(artifact_dir)
+        if not os.path.exists(manifest_path):
+            return False
+        return (not os.path.exists(self.model_path)
+                or os.path.getmtime(manifest_path) >= os.path.getmtime(self.model_path))
+    
+    @staticmethod
+    def _load_artifact(model: CropRiskModel, artifact_dir: str) -> bool:
+        # The mmap artifact is shared between workers and skips unpickling
+        try:
+            model.load_artifact(artifact_dir)
+            return True
+        except Exception as e:
+            print(f"Error loading model artifact: {e}")
+            return False
+    
+    def _export_artifact(self, model: CropRiskModel):
+        """Best-effort export of the memory-mappable serving artifact."""
+        try:
+            model.export_artifact(self.artifact_dir)
+        except Exception as e:
+            print(f"Model artifact export warning: {e}")
+    
+    def _read_source_signature(self) -> Tuple:
+        """Modification times of every file a reload could pick up."""
+        paths = [self.model_path, artifact_manifest_path(self.artifact_dir)]
+        if self.serve_distilled:
+            paths.append(artifact_manifest_path(self.distilled_model_dir))
+        return tuple(os.path.getmtime(p) if os.path.exists(p) else None for p in paths)
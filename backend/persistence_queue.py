@@ -0,0 +1,198 @@
+"""
+Write-behind queue that persists assessment results off the request path
+"""
+
+import os
+import time
+import queue
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from metrics import UPSTREAM_ERRORS, stage_timer
+
+_STOP = object()
+
+class PersistenceQueue:
+    """
+    Bounded background writer for risk assessments, environmental readings
+    and cloud backups.
+    
+    Requests enqueue and return immediately. A single worker thread drains
+    the queue and flushes a batch once it reaches ``batch_size`` items or
+    its oldest item is ``flush_interval`` seconds old. When the queue is full
+    ``enqueue`` waits up to ``enqueue_timeout`` seconds, then drops the item.
+    """
+    
+    def __init__(self, database_manager, cloud_integration,
+                 max_size: Optional[int] = None, batch_size: Optional[int] = None,
+                 flush_interval: Optional[float] = None,
+                 enqueue_timeout: Optional[float] = None):
+        self.database_manager = database_manager
+        self.cloud_integration = cloud_integration
+        
+        self.max_size = max_size or int(os.getenv('PERSIST_QUEUE_MAX_SIZE', 10000))
+        self.batch_size = batch_size or int(os.getenv('PERSIST_BATCH_SIZE', 100))
+        self.flush_interval = flush_interval or float(os.getenv('PERSIST_FLUSH_INTERVAL', 2.0))
+        if enqueue_timeout is None:
+            enqueue_timeout = float(os.getenv('PERSIST_ENQUEUE_TIMEOUT', 0.05))
+        self.enqueue_timeout = enqueue_timeout
+        
+        self._queue = queue.Queue(maxsize=self.max_size)
+        self._worker = None
+        self._lock = threading.Lock()
+        self._stats = {
+            'enqueued': 0,
+            'dropped': 0,
+            'written': 0,
+            # Flushed while no database was connected, so not stored anywhere
+            'unpersisted': 0,
+            'failed': 0,
+            'batches': 0
+        }
+        self._last_flush_seconds = 0.0
+    
+    def start(self):
+        """Start the background writer thread."""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name='persistence-queue', daemon=True
+                )
+                self._worker.start()
+    
+    def enqueue(self, kind: str, payload: Dict[str, Any]) -> bool:
+        """
+        Queue a write; kind is 'assessment' or 'environmental'.
+        Returns False if the item was dropped because the queue stayed full.
+        """
+        item = (kind, datetime.now(), payload)
+        try:
+            if self.enqueue_timeout > 0:
+                self._queue.put(item, timeout=self.enqueue_timeout)
+            else:
+                self._queue.put_nowait(item)
+        except queue.Full:
+            self._count('dropped')
+            return False
+        
+        self._count('enqueued')
+        return True
+    
+    def enqueue_assessment(self, assessment: Dict[str, Any]) -> bool:
+        return self.enqueue('assessment', assessment)
+    
+    def enqueue_environmental_data(self, location: str, data: Dict[str, Any]) -> bool:
+        return self.enqueue('environmental', {'location': location, 'data': data})
+    
+    def shutdown(self, timeout: float = 10.0):
+        """Flush everything still queued and stop the writer."""
+        worker = self._worker
+        if worker is None or not worker.is_alive():
+            return
+        
+        # The stop marker must get in even if the queue is full
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self._queue.put(_STOP, timeout=0.1)
+                break
+            except queue.Full:
+                if time.monotonic() >= deadline:
+                    print("Persistence queue shutdown timed out with items still queued")
+                    return
+        
+        worker.join(max(0.0, deadline - time.monotonic()))
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Queue depth and write counters."""
+        with self._lock:
+            stats = dict(self._stats)
+        
+        return {
+            'running': self._worker is not None and self._worker.is_alive(),
+            'queue_depth': self._queue.qsize(),
+            'max_size': self.max_size,
+            'batch_size': self.batch_size,
+            'flush_interval': self.flush_interval,
+            'last_flush_seconds': round(self._last_flush_seconds, 4),
+            **stats
+        }
+    
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self._stats[key] += amount
+    
+    def _run(self):
+        batch = []
+        deadline = None
+        
+        while True:
+            timeout = self.flush_interval if not batch else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            
+            if item is _STOP:
+                # Drain whatever was queued ahead of the stop marker
+                self._flush(batch)
+                return
+            
+            if item is not None:
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+            
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+    
+    def _flush(self, batch: List):
+        if not batch:
+            return
+        
+        started = time.perf_counter()
+        assessments = [(ts, payload) for kind, ts, payload in batch if kind == 'assessment']
+        environmental = [(ts, payload) for kind, ts, payload in batch if kind == 'environmental']
+        
+        if assessments:
+            try:
+                with stage_timer('db_write'):
+                    saved = self.database_manager.save_risk_assessments(
+                        [payload for _, payload in assessments],
+                        [ts for ts, _ in assessments]
+                    )
+                self._count('written', len(saved))
+                self._count('unpersisted', len(assessments) - len(saved))
+            except Exception as e:
+                print(f"Database save error: {e}")
+                UPSTREAM_ERRORS.inc(service='database')
+                self._count('failed', len(assessments))
+            
+            try:
+                # One backup object per batch instead of one per assessment
+                with stage_timer('cloud_backup'):
+                    self.cloud_integration.backup_data_to_cloud(
+                        {'assessments': [payload for _, payload in assessments]},
+                        'risk_assessment'
+                    )
+            except Exception as e:
+                print(f"Cloud backup error: {e}")
+                UPSTREAM_ERRORS.inc(service='cloud')
+        
+        if environmental:
+            try:
+                with stage_timer('db_write'):
+                    saved = self.database_manager.save_environmental_data_many(
+                        [payload for _, payload in environmental],
+                        [ts for ts, _ in environmental]
+                    )
+                self._count('written', len(saved))
+                self._count('unpersisted', len(environmental) - len(saved))
+            except Exception as e:
+                print(f"Database save error: {e}")
+                UPSTREAM_ERRORS.inc(service='database')
+                self._count('failed', len(environmental))
+        
+        self._count('batches')
+        self._last_flush_seconds = time.perf_counter() - started
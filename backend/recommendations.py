@@ -1,12 +1,16 @@
 from typing import Dict, List, Tuple
-import json
+from crop_catalog import get_catalog_store
+from risk_calculator import risk_level
 
 class RecommendationEngine:
     """Generate actionable recommendations for crop risk mitigation."""
     
     def __init__(self, crop_database_path: str = "data/crop_database.json"):
-        with open(crop_database_path, 'r') as f:
-            self.crop_db = json.load(f)
+        self.catalog_store = get_catalog_store(crop_database_path)
+    
+    @property
+    def crop_db(self) -> Dict:
+        return self.catalog_store.current().crop_db
     
     def generate_recommendations(self, crop: str, risk_analysis: Dict, 
                                 current_values: Dict) -> List[Dict]:
@@ -312,13 +316,8 @@ class RecommendationEngine:
         return general_recs
     
     def _get_risk_level(self, risk_score: float) -> str:
-        """Convert risk score to risk level."""
-        if risk_score < 0.3:
-            return "Low"
-        elif risk_score < 0.6:
-            return "Medium"
-        else:
-            return "High"
+        """Convert risk score to risk level ("Low", "Medium" or "High")."""
+        return risk_level(risk_score).replace(' Risk', '')
     
     def calculate_expected_improvement(self, current_risk: float, 
                                     factor_improvements: Dict[str, float]) -> float:
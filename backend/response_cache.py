@@ -0,0 +1,143 @@
+"""
+LRU + TTL cache for assessment responses keyed on quantized location
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+def quantize_location(location: str, precision: float) -> str:
+    """
+    Snap a "lat,lon" string to a grid of ``precision`` degrees so nearby
+    requests for the same field share a key. Place names are normalized.
+    """
+    try:
+        lat, lon = map(float, location.split(','))
+    except (ValueError, AttributeError):
+        return ' '.join(str(location).lower().split())
+
+    lat = round(lat / precision) * precision
+    lon = round(lon / precision) * precision
+    return f"{lat:.5f},{lon:.5f}"
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache whose entries also expire after ``ttl_seconds``.
+    A ``max_entries`` of 0 disables caching.
+
+    Every invalidate() starts a new ``generation``. A caller that reads the
+    generation before computing a response and passes it to put() has the
+    put dropped if the cache was invalidated meanwhile, so a response
+    computed from replaced inputs is never stored after the invalidation.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0,
+            'stale_puts': 0
+        }
+
+    @property
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+
+            expires_at, value = entry
+            if now >= expires_at:
+                del self._entries[key]
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        """Store ``value``, unless ``generation`` was read before the latest invalidate()."""
+        if self.max_entries <= 0:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                self._stats['stale_puts'] += 1
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, reason: str = ''):
+        """Drop every entry, e.g. after the model or crop catalog changes."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._stats['invalidations'] += 1
+        if reason:
+            print(f"Response cache invalidated: {reason}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            size = len(self._entries)
+
+        lookups = stats['hits'] + stats['misses']
+        return {
+            'size': size,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hit_ratio': round(stats['hits'] / lookups, 4) if lookups else 0.0,
+            **stats
+        }
+
+class AssessmentCache(ResponseCache):
+    """Response cache for /api/assess-risk keyed on (location cell, crop, model version, time bucket)."""
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None,
+                 precision: Optional[float] = None, bucket_seconds: Optional[float] = None):
+        if max_entries is None:
+            max_entries = int(os.getenv('ASSESSMENT_CACHE_MAX_ENTRIES', 5000))
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv('ASSESSMENT_CACHE_TTL', 300))
+        super().__init__(max_entries, ttl_seconds)
+
+        # 0.01 degrees is roughly 1 km at the equator
+        self.precision = precision or float(os.getenv('ASSESSMENT_CACHE_PRECISION', 0.01))
+        self.bucket_seconds = bucket_seconds or float(os.getenv('ASSESSMENT_CACHE_BUCKET_SECONDS', 300))
+
+    def make_key(self, location: str, crop: str, model_version: Optional[str] = None,
+                 now: Optional[float] = None) -> Tuple:
+        """``model_version`` is the version that scores the response (None for rule-based)."""
+        now = time.time() if now is None else now
+        return (
+            quantize_location(location, self.precision),
+            crop,
+            model_version,
+            int(now // self.bucket_seconds)
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats['precision'] = self.precision
+        stats['bucket_seconds'] = self.bucket_seconds
+        return stats
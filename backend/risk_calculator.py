@@ -1,13 +1,28 @@
 import numpy as np
-from typing import Dict, List, Tuple
-import json
+from typing import Dict, List, Sequence, Tuple
+from crop_catalog import FACTORS, CropCatalog, get_catalog_store
+
+# Upper bounds (exclusive) of the Low and Medium risk bands
+RISK_LEVEL_THRESHOLDS = np.array([0.3, 0.6])
+RISK_LEVELS = np.array(["Low Risk", "Medium Risk", "High Risk"])
+
+def risk_level(risk_score: float) -> str:
+    """Risk level of one score, from the same bands as the vectorized path."""
+    return str(RISK_LEVELS[np.searchsorted(RISK_LEVEL_THRESHOLDS, risk_score, side='right')])
 
 class RiskCalculator:
     """Calculate crop risk scores and generate risk formulas."""
     
     def __init__(self, crop_database_path: str = "data/crop_database.json"):
-        with open(crop_database_path, 'r') as f:
-            self.crop_db = json.load(f)
+        self.catalog_store = get_catalog_store(crop_database_path)
+    
+    @property
+    def catalog(self) -> CropCatalog:
+        return self.catalog_store.current()
+    
+    @property
+    def crop_db(self) -> Dict:
+        return self.catalog.crop_db
     
     def calculate_risk_score(self, crop: str, temperature: float, moisture: float, 
                            humidity: float, ndvi: float, rainfall: float) -> Dict:
@@ -61,6 +76,64 @@ class RiskCalculator:
             }
         }
     
+    def calculate_risk_scores(self, crops: Sequence[str], temperature: np.ndarray,
+                              moisture: np.ndarray, humidity: np.ndarray,
+                              ndvi: np.ndarray, rainfall: np.ndarray) -> Dict[str, np.ndarray]:
+        """Vectorized calculate_risk_score over many rows; factor columns follow FACTORS."""
+        catalog = self.catalog
+        crop_idx = catalog.indices(crops)
+        values = np.column_stack([temperature, moisture, humidity, ndvi, rainfall]).astype(np.float64)
+        
+        factor_risks = self._calculate_factor_risks(
+            values, catalog.optimal[crop_idx], catalog.tolerance[crop_idx]
+        )
+        
+        weight_table = np.array([
+            [self._get_category_weights(category)[f] for f in FACTORS]
+            for category in catalog.categories
+        ])
+        weights = weight_table[catalog.category_ids[crop_idx]]
+        
+        risk_scores = np.clip(np.sum(weights * factor_risks, axis=1), 0.0, 1.0)
+        
+        return {
+            'risk_score': risk_scores,
+            'risk_level': RISK_LEVELS[np.searchsorted(RISK_LEVEL_THRESHOLDS, risk_scores, side='right')],
+            'factor_risks': factor_risks,
+            'weights': weights,
+            'weakest_factor': np.array(FACTORS)[np.argmax(factor_risks, axis=1)],
+            'current_values': values
+        }
+    
+    def _calculate_factor_risks(self, values: np.ndarray, optimal: np.ndarray,
+                                tolerance: np.ndarray) -> np.ndarray:
+        """Per-factor risks for a (rows, FACTORS) matrix, matching the scalar rules below."""
+        deviation = np.abs(values - optimal)
+        risks = np.minimum(deviation / tolerance, 1.0)
+        below = values < optimal - tolerance
+        
+        t, m, n, r = 0, 1, 3, 4
+        
+        # Extra risk for extreme temperatures
+        extreme_temp = (
+            (values[:, t] > optimal[:, t] + tolerance[:, t] * 2) |
+            (values[:, t] < optimal[:, t] - tolerance[:, t] * 2)
+        )
+        risks[:, t] = np.where(extreme_temp, np.minimum(risks[:, t] + 0.2, 1.0), risks[:, t])
+        
+        # Extra risk for very dry soil and drought conditions
+        risks[:, m] = np.where(below[:, m], np.minimum(risks[:, m] + 0.3, 1.0), risks[:, m])
+        risks[:, r] = np.where(below[:, r], np.minimum(risks[:, r] + 0.2, 1.0), risks[:, r])
+        
+        # NDVI above optimal is penalised half as much, capped at 0.5
+        risks[:, n] = np.where(
+            values[:, n] >= optimal[:, n],
+            np.minimum(deviation[:, n] / (tolerance[:, n] * 2), 0.5),
+            risks[:, n]
+        )
+        
+        return risks
+    
     def _calculate_temperature_risk(self, temperature: float, crop_data: Dict) -> float:
         """Calculate temperature-related risk."""
         optimal_temp = crop_data['optimal_temp']
@@ -168,12 +241,7 @@ class RiskCalculator:
     
     def _get_risk_level(self, risk_score: float) -> str:
         """Convert risk score to risk level."""
-        if risk_score < 0.3:
-            return "Low Risk"
-        elif risk_score < 0.6:
-            return "Medium Risk"
-        else:
-            return "High Risk"
+        return risk_level(risk_score)
     
     def generate_risk_formula(self, crop: str, weights: Dict[str, float]) -> str:
         """Generate human-readable risk formula."""
@@ -0,0 +1,224 @@
+"""
+Gridded crop risk over a bounding box or XYZ map tile
+"""
+
+import os
+import math
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Optional, Tuple
+from crop_catalog import FACTORS
+from response_cache import ResponseCache
+
+# Environmental fields interpolated between the sampled lattice points
+FIELDS = ('temperature', 'soil_moisture', 'humidity', 'ndvi', 'rainfall_index')
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """(min_lon, min_lat, max_lon, max_lat) of a Web Mercator XYZ tile."""
+    n = 2 ** z
+    min_lon = x / n * 360.0 - 180.0
+    max_lon = (x + 1) / n * 360.0 - 180.0
+    max_lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    min_lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return min_lon, min_lat, max_lon, max_lat
+
+def tile_cell_centers(z: int, x: int, y: int, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Latitudes (rows, north first) and longitudes (columns) of a tile's pixel centers."""
+    n = 2 ** z
+    offsets = (np.arange(size) + 0.5) / size
+    lons = (x + offsets) / n * 360.0 - 180.0
+    lats = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + offsets) / n))))
+    return lats, lons
+
+def bbox_cell_centers(bbox: Tuple[float, float, float, float], resolution: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Latitudes (rows, north first) and longitudes (columns) of a bbox grid's cell centers."""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    offsets = (np.arange(resolution) + 0.5) / resolution
+    lons = min_lon + offsets * (max_lon - min_lon)
+    lats = max_lat - offsets * (max_lat - min_lat)
+    return lats, lons
+
+class RiskGridService:
+    """
+    Scores a crop over every cell of a grid in one vectorized pass.
+    
+    Environmental fields are interpolated between live readings fetched on
+    a coarse lattice over the grid. Readings are cached per lattice point and
+    tiles per model version, so panning back over an area reuses earlier work.
+    """
+    
+    def __init__(self, data_fetcher, batch_scorer, tile_cache: ResponseCache = None):
+        self.data_fetcher = data_fetcher
+        self.batch_scorer = batch_scorer
+        self.max_resolution = int(os.getenv('MAX_GRID_RESOLUTION', 256))
+        self.sample_points = max(1, int(os.getenv('RISK_GRID_SAMPLE_POINTS', 4)))
+        self.fetch_workers = int(os.getenv('ENV_FETCH_WORKERS', 8))
+        # Lattice readings still pending after this many seconds use the climate estimate
+        self.sample_timeout = float(os.getenv('RISK_GRID_SAMPLE_TIMEOUT', 2))
+        self.sample_cache = ResponseCache(
+            int(os.getenv('RISK_GRID_SAMPLE_CACHE_MAX_ENTRIES', 5000)),
+            float(os.getenv('RISK_GRID_SAMPLE_CACHE_TTL', 300))
+        )
+        # Fetches outlive the request that started them, so a late reading
+        # still lands in sample_cache; one fetch per point is in flight at a time
+        self._fetch_pool = ThreadPoolExecutor(max_workers=self.fetch_workers,
+                                              thread_name_prefix='risk-grid-sample')
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self.tile_cache = tile_cache or ResponseCache(
+            int(os.getenv('TILE_CACHE_MAX_ENTRIES', 2000)),
+            float(os.getenv('TILE_CACHE_TTL', 900))
+        )
+    
+    def sample_environment(self, lats: np.ndarray, lons: np.ndarray,
+                           live_samples: bool = True) -> Dict[str, np.ndarray]:
+        """
+        Environmental fields on the lats x lons mesh, each shaped (rows, cols).
+        
+        Readings are fetched on a sample_points x sample_points lattice spanning
+        the grid and bilinearly interpolated to every cell. A lattice point whose
+        fetch fails or is still pending after sample_timeout seconds (or every
+        point, without ``live_samples``) uses the fetcher's climate estimate.
+        """
+        n = min(self.sample_points, len(lats), len(lons))
+        sample_lats = np.linspace(lats[0], lats[-1], n)
+        sample_lons = np.linspace(lons[0], lons[-1], n)
+        sample_lat_grid, sample_lon_grid = np.meshgrid(sample_lats, sample_lons, indexing='ij')
+        samples = self.data_fetcher.estimate_grid(sample_lat_grid, sample_lon_grid)
+        
+        if live_samples:
+            points = list(zip(sample_lat_grid.ravel().tolist(), sample_lon_grid.ravel().tolist()))
+            for i, reading in enumerate(self._read_samples(points)):
+                if reading is None:
+                    continue
+                row, col = divmod(i, n)
+                for field in FIELDS:
+                    samples[field][row, col] = reading[field]
+        
+        # Fractional lattice position of every cell center, along each axis
+        row_pos = self._lattice_positions(lats, n)
+        col_pos = self._lattice_positions(lons, n)
+        row0 = np.minimum(row_pos.astype(int), max(n - 2, 0))
+        col0 = np.minimum(col_pos.astype(int), max(n - 2, 0))
+        row1 = np.minimum(row0 + 1, n - 1)
+        col1 = np.minimum(col0 + 1, n - 1)
+        row_frac = (row_pos - row0)[:, None]
+        col_frac = (col_pos - col0)[None, :]
+        
+        fields = {}
+        for field in FIELDS:
+            values = samples[field]
+            top = values[row0][:, col0] * (1 - col_frac) + values[row0][:, col1] * col_frac
+            bottom = values[row1][:, col0] * (1 - col_frac) + values[row1][:, col1] * col_frac
+            fields[field] = top * (1 - row_frac) + bottom * row_frac
+        return fields
+    
+    def _read_samples(self, points) -> list:
+        """Cached or freshly fetched reading per point, None where unavailable in time."""
+        readings = [self.sample_cache.get(self._sample_key(point)) for point in points]
+        futures = {}
+        with self._pending_lock:
+            for i, point in enumerate(points):
+                if readings[i] is not None:
+                    continue
+                key = self._sample_key(point)
+                future = self._pending.get(key)
+                if future is None:
+                    future = self._fetch_pool.submit(self._fetch_sample, key, point)
+                    self._pending[key] = future
+                futures[i] = future
+        
+        if futures:
+            wait(list(futures.values()), timeout=self.sample_timeout)
+            for i, future in futures.items():
+                if future.done():
+                    readings[i] = future.result()
+        return readings
+    
+    @staticmethod
+    def _sample_key(point: Tuple[float, float]) -> Tuple[float, float]:
+        return round(point[0], 2), round(point[1], 2)
+    
+    def _fetch_sample(self, key: Tuple[float, float], point: Tuple[float, float]) -> Optional[Dict]:
+        lat, lon = point
+        try:
+            reading = self.data_fetcher.fetch_coordinates_data(lat, lon)
+            self.sample_cache.put(key, reading)
+            return reading
+        except Exception as e:
+            print(f"Grid sample fetch error at {lat:.4f},{lon:.4f}: {e}")
+            return None
+        finally:
+            with self._pending_lock:
+                self._pending.pop(key, None)
+    
+    @staticmethod
+    def _lattice_positions(values: np.ndarray, n: int) -> np.ndarray:
+        """Position of each value on an n-point lattice from values[0] to values[-1]."""
+        if n < 2 or values[-1] == values[0]:
+            return np.zeros(len(values))
+        return (values - values[0]) / (values[-1] - values[0]) * (n - 1)
+    
+    def compute(self, crop: str, lats: np.ndarray, lons: np.ndarray,
+                live_samples: bool = True) -> Dict:
+        """Risk for every cell of the lats x lons mesh."""
+        fields = self.sample_environment(lats, lons, live_samples)
+        shape = fields['temperature'].shape
+        n = fields['temperature'].size
+        
+        scored = self.batch_scorer.score(
+            [crop] * n,
+            fields['temperature'].ravel(),
+            fields['soil_moisture'].ravel(),
+            fields['humidity'].ravel(),
+            fields['ndvi'].ravel(),
+            fields['rainfall_index'].ravel(),
+            # Heatmap cells may come from the lookup grid, when one is built
+            approximate=True
+        )
+        risk_scores = np.asarray(scored['risk_score']).reshape(shape)
+        weakest = np.argmax(scored['analysis']['factor_risks'], axis=1).reshape(shape)
+        
+        return {
+            'crop': crop,
+            'rows': shape[0],
+            'cols': shape[1],
+            'lats': np.round(lats, 6).tolist(),
+            'lons': np.round(lons, 6).tolist(),
+            'scoring': scored['source'],
+            'model_version': scored['model_version'],
+            'risk_scores': np.round(risk_scores, 3).tolist(),
+            'weakest_factor': weakest.tolist(),
+            'factors': list(FACTORS),
+            'stats': {
+                'min': round(float(risk_scores.min()), 3),
+                'mean': round(float(risk_scores.mean()), 3),
+                'max': round(float(risk_scores.max()), 3)
+            }
+        }
+    
+    def compute_bbox(self, crop: str, bbox: Tuple[float, float, float, float],
+                     resolution: int) -> Dict:
+        """Risk over a (min_lon, min_lat, max_lon, max_lat) box at resolution x resolution cells."""
+        lats, lons = bbox_cell_centers(bbox, resolution)
+        grid = self.compute(crop, lats, lons)
+        grid['bbox'] = list(bbox)
+        grid['resolution'] = resolution
+        return grid
+    
+    def get_tile(self, crop: str, z: int, x: int, y: int, size: int) -> Tuple[Dict, bool]:
+        """Risk grid for an XYZ tile; returns (grid, served_from_cache)."""
+        # Keyed by the scoring model's version, so tiles from a replaced model are never served
+        generation = self.tile_cache.generation
+        key = (crop, z, x, y, size, self.batch_scorer.get_model().version)
+        cached = self.tile_cache.get(key)
+        if cached is not None:
+            return cached, True
+        
+        lats, lons = tile_cell_centers(z, x, y, size)
+        grid = self.compute(crop, lats, lons)
+        grid.update({'z': z, 'x': x, 'y': y, 'size': size, 'bbox': list(tile_bounds(z, x, y))})
+        
+        self.tile_cache.put(key, grid, generation)
+        return grid, False
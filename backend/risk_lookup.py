@@ -0,0 +1,131 @@
+"""
+Precomputed per-crop 5-D risk lookup table with multilinear interpolation
+
+Run from backend/ to build a table for the saved model and report its
+interpolation error:  python risk_lookup.py --points 9
+"""
+
+import os
+import time
+import numpy as np
+from typing import Dict, Sequence
+
+# Input bounds per factor, in crop catalog factor order; queries are clipped to them
+LOOKUP_AXES = (
+    ('temperature', -10.0, 50.0),
+    ('moisture', 0.1, 1.0),
+    ('humidity', 10.0, 100.0),
+    ('ndvi', 0.1, 1.0),
+    ('rainfall', 0.1, 2.0)
+)
+
+class RiskLookupGrid:
+    """
+    Risk scores sampled on a regular ``points``^5 grid for every crop.
+    
+    interpolate() answers any batch with 32 table reads per row and no
+    model call, so grid and heatmap workloads cost O(1) per cell. Only
+    callers that opt in with ``predict_batch(..., approximate=True)`` are
+    served from it; assessments and rankings stay exact. The
+    approximation error against the model is measured at build time and
+    kept in ``error``.
+    """
+    
+    def __init__(self, crop_names: Sequence[str], table: np.ndarray, points: int,
+                 catalog_version: str = None):
+        self.catalog_version = catalog_version
+        self.crop_index = {crop: i for i, crop in enumerate(crop_names)}
+        self.points = points
+        self.lows = np.array([low for _, low, _ in LOOKUP_AXES])
+        self.highs = np.array([high for _, _, high in LOOKUP_AXES])
+        self.table = table.reshape(-1)
+        self.table.setflags(write=False)
+        
+        n_axes = len(LOOKUP_AXES)
+        self.strides = points ** np.arange(n_axes - 1, -1, -1)
+        self.crop_stride = points ** n_axes
+        # The 32 hypercube corners as 0/1 offsets per axis
+        self.corner_bits = (np.arange(2 ** n_axes)[:, np.newaxis] >> np.arange(n_axes - 1, -1, -1)) & 1
+        self.corner_offsets = self.corner_bits @ self.strides
+        self.error: Dict = {}
+    
+    @classmethod
+    def build(cls, model, points: int = None, error_samples: int = 2000) -> 'RiskLookupGrid':
+        """Evaluate ``model`` at every grid node of every crop, then measure the error."""
+        points = points or int(os.getenv('RISK_LOOKUP_POINTS', 9))
+        axes = [np.linspace(low, high, points) for _, low, high in LOOKUP_AXES]
+        nodes = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, len(LOOKUP_AXES))
+        catalog = model.catalog
+        crop_names = catalog.crop_names
+        
+        started = time.perf_counter()
+        table = np.empty((len(crop_names), len(nodes)), dtype=np.float64)
+        for i, crop in enumerate(crop_names):
+            table[i] = model.predict_exact([crop] * len(nodes), nodes)
+        grid = cls(crop_names, table, points, catalog.version)
+        grid.error = grid.measure_error(model, error_samples)
+        grid.error['build_seconds'] = time.perf_counter() - started
+        return grid
+    
+    def measure_error(self, model, samples: int, seed: int = 0) -> Dict:
+        """Max and mean absolute error against the model at random in-range points."""
+        rng = np.random.default_rng(seed)
+        per_crop = {}
+        errors = []
+        for crop in self.crop_index:
+            values = rng.uniform(self.lows, self.highs, (samples, len(LOOKUP_AXES)))
+            crops = [crop] * samples
+            error = np.abs(self.interpolate(crops, values) - model.predict_exact(crops, values))
+            per_crop[crop] = float(error.max())
+            errors.append(error)
+        errors = np.concatenate(errors)
+        return {
+            'points_per_axis': self.points,
+            'table_entries': int(self.table.size),
+            'max_abs_error': float(errors.max()),
+            'mean_abs_error': float(errors.mean()),
+            'p99_abs_error': float(np.percentile(errors, 99)),
+            'max_abs_error_by_crop': per_crop
+        }
+    
+    def interpolate(self, crops: Sequence[str], values: np.ndarray) -> np.ndarray:
+        """Multilinear interpolation of risk for crop names and (n, 5) inputs."""
+        values = np.asarray(values, dtype=np.float64)
+        crop_ids = np.fromiter((self.crop_index[c] for c in crops), dtype=np.int64, count=len(values))
+        
+        position = (np.clip(values, self.lows, self.highs) - self.lows) / (self.highs - self.lows) * (self.points - 1)
+        cell = np.minimum(position.astype(np.int64), self.points - 2)
+        frac = position - cell
+        
+        base = crop_ids * self.crop_stride + cell @ self.strides
+        corner_values = self.table[base[:, np.newaxis] + self.corner_offsets]
+        weights = np.where(self.corner_bits[np.newaxis, :, :], frac[:, np.newaxis, :],
+                           1.0 - frac[:, np.newaxis, :]).prod(axis=2)
+        return np.einsum('ij,ij->i', weights, corner_values)
+
+if __name__ == "__main__":
+    import argparse
+    from model import CropRiskModel
+    
+    parser = argparse.ArgumentParser(description='Build a risk lookup grid and report its interpolation error')
+    parser.add_argument('--model-path', default='models/trained_model.pkl')
+    parser.add_argument('--points', type=int, default=9)
+    parser.add_argument('--error-samples', type=int, default=2000)
+    args = parser.parse_args()
+    
+    model = CropRiskModel()
+    model.load_model(args.model_path)
+    grid = RiskLookupGrid.build(model, args.points, args.error_samples)
+    
+    print(f"{args.points}^5 grid x {len(grid.crop_index)} crops = {grid.error['table_entries']:,} entries "
+          f"built in {grid.error['build_seconds']:.1f}s")
+    print(f"Interpolation error: max {grid.error['max_abs_error']:.4f}, "
+          f"p99 {grid.error['p99_abs_error']:.4f}, mean {grid.error['mean_abs_error']:.4f}")
+    
+    rng = np.random.default_rng(1)
+    crops = rng.choice(list(grid.crop_index), 10000)
+    values = rng.uniform(grid.lows, grid.highs, (10000, len(LOOKUP_AXES)))
+    for name, predict in (('lookup', grid.interpolate), ('model', model.predict_exact)):
+        started = time.perf_counter()
+        predict(crops, values)
+        print(f"  10,000 rows via {name}: {(time.perf_counter() - started) * 1000:.1f}ms")
@@ -0,0 +1,102 @@
+"""
+Per-process CPU thread budget for inference
+
+Every gunicorn worker runs its own copy of the model. Left alone, each one
+sizes joblib, BLAS and OpenMP pools to all cores of the node, so N workers
+start N x cores threads and slow each other down. This module gives each
+process a fixed share: native pools are capped, forest predicts run
+single-threaded, and all model calls go through one executor of
+INFERENCE_THREADS threads.
+
+Import this module and call apply_native_thread_limits() before numpy,
+scipy or sklearn are imported; the pools read their size at load time.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+# Environment variables read by OpenMP, OpenBLAS, MKL, Accelerate and numexpr
+NATIVE_THREAD_ENV_VARS = (
+    'OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS'
+)
+
+def inference_threads() -> int:
+    """INFERENCE_THREADS, or this process's share of the cores across WEB_CONCURRENCY workers."""
+    configured = os.getenv('INFERENCE_THREADS')
+    if configured:
+        return max(1, int(configured))
+    workers = max(1, int(os.getenv('WEB_CONCURRENCY', 1)))
+    return max(1, (os.cpu_count() or 1) // workers)
+
+def native_threads() -> int:
+    """Threads per native (BLAS/OpenMP) pool; each inference thread runs its kernels serially."""
+    return max(1, int(os.getenv('NATIVE_THREADS', 1)))
+
+def estimator_n_jobs() -> int:
+    """joblib workers used by a loaded forest's predict (INFERENCE_N_JOBS, default 1)."""
+    return int(os.getenv('INFERENCE_N_JOBS', 1))
+
+def apply_native_thread_limits(threads: int = None):
+    """
+    Cap BLAS/OpenMP pools. Explicitly set environment variables win; pools
+    already loaded are limited through threadpoolctl (a scikit-learn dependency).
+    """
+    threads = threads or native_threads()
+    for name in NATIVE_THREAD_ENV_VARS:
+        os.environ.setdefault(name, str(threads))
+    
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=threads)
+    except ImportError:
+        pass
+
+class InferenceExecutor:
+    """
+    Runs model calls on a dedicated pool of ``threads`` threads, so CPU
+    bound inference in a process never uses more threads than its budget
+    however many requests are in flight.
+    """
+    
+    def __init__(self, threads: int = None):
+        self.threads = threads or inference_threads()
+        self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='inference')
+        self._lock = threading.Lock()
+        self._active = 0
+        self._calls = 0
+    
+    def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Call ``fn`` on an inference thread and wait for its result."""
+        return self._executor.submit(self._call, fn, args, kwargs).result()
+    
+    def submit(self, fn: Callable, *args, **kwargs):
+        return self._executor.submit(self._call, fn, args, kwargs)
+    
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+    
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            active, calls = self._active, self._calls
+        
+        return {
+            'threads': self.threads,
+            'active': active,
+            'calls': calls,
+            'native_threads': native_threads(),
+            'estimator_n_jobs': estimator_n_jobs(),
+            'cpu_count': os.cpu_count()
+        }
+    
+    def _call(self, fn: Callable, args, kwargs):
+        with self._lock:
+            self._active += 1
+            self._calls += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
@@ -0,0 +1,185 @@
+"""
+Content-hashed cache of trained models and engineered feature matrices
+
+Run from backend/ to list or empty it:  python training_cache.py [--clear]
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+import sklearn
+from typing import Dict, List, Optional, Tuple
+from model import CropRiskModel, EncodingTables, FrozenDict, FEATURE_COLUMNS, INPUT_COLUMNS
+
+# Bump when feature engineering or the training procedure changes meaning
+TRAINING_CACHE_SCHEMA = 1
+
+# Seed for the synthetic training set, so identical retrains produce identical data
+TRAINING_DATA_SEED = int(os.getenv('TRAINING_DATA_SEED', 42))
+
+# Estimator parameters that change speed but not the fitted model
+NON_MODEL_PARAMS = ('n_jobs', 'verbose')
+
+class TrainingCache:
+    """
+    Trained models keyed by a hash of the training rows, crop catalog and
+    hyperparameters, plus feature matrices keyed by rows and catalog only.
+    
+    An identical retrain loads the cached model instead of refitting, and
+    experiments that vary only hyperparameters share one feature build.
+    Entries are plain files (a model pickle plus metrics, or an .npz), so
+    the cache can be copied between machines or deleted at any time. The
+    least recently used entries are removed beyond ``max_bytes``.
+    """
+    
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.cache_dir = cache_dir or os.getenv('TRAINING_CACHE_DIR', 'models/training_cache')
+        self.max_bytes = max_bytes or int(float(os.getenv('TRAINING_CACHE_MAX_BYTES', 2e9)))
+    
+    def data_key(self, df: pd.DataFrame, catalog) -> str:
+        """Hash of the training rows, the crop catalog and the feature schema."""
+        hasher = hashlib.sha256()
+        rows = df[['crop'] + INPUT_COLUMNS + ['risk_score']]
+        hasher.update(pd.util.hash_pandas_object(rows, index=False).to_numpy().tobytes())
+        hasher.update(json.dumps({
+            'schema': TRAINING_CACHE_SCHEMA,
+            'catalog': catalog.version,
+            'features': FEATURE_COLUMNS
+        }).encode())
+        return hasher.hexdigest()[:24]
+    
+    def model_key(self, data_key: str, model: CropRiskModel) -> str:
+        """Hash of the data key, the estimator's hyperparameters and the sklearn version."""
+        params = {k: v for k, v in model.model.get_params().items() if k not in NON_MODEL_PARAMS}
+        payload = json.dumps({
+            'data': data_key,
+            'estimator': type(model.model).__name__,
+            'params': params,
+            'sklearn': sklearn.__version__
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:24]
+    
+    def train(self, model: CropRiskModel, df: pd.DataFrame) -> Dict:
+        """
+        ``model.train(df)``, unless the same data, catalog and hyperparameters
+        were trained before; then the cached model is loaded into ``model``.
+        Returns the training metrics plus ``cached`` and ``cache_key``.
+        """
+        data_key = self.data_key(df, model.catalog)
+        key = self.model_key(data_key, model)
+        entry_dir = self._model_dir(key)
+        
+        if os.path.exists(os.path.join(entry_dir, 'metrics.json')):
+            try:
+                model.load_model(os.path.join(entry_dir, 'model.pkl'))
+                with open(os.path.join(entry_dir, 'metrics.json')) as f:
+                    metrics = json.load(f)
+                os.utime(entry_dir)
+                print(f"Reused cached training {key}; skipped refitting")
+                return {**metrics, 'cached': True, 'cache_key': key}
+            except Exception as e:
+                print(f"Training cache entry {key} unusable, retraining: {e}")
+        
+        X, y = self.features(df, model, data_key)
+        metrics = {k: float(v) for k, v in model.train_on_features(X, y).items()}
+        
+        tmp_dir = f"{entry_dir}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        model.save_model(os.path.join(tmp_dir, 'model.pkl'))
+        with open(os.path.join(tmp_dir, 'metrics.json'), 'w') as f:
+            json.dump(metrics, f, indent=2)
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.rename(tmp_dir, entry_dir)
+        self.prune()
+        
+        return {**metrics, 'cached': False, 'cache_key': key}
+    
+    def features(self, df: pd.DataFrame, model: CropRiskModel,
+                 data_key: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """``model.prepare_features(df)``, served from the cached .npz when the rows were seen before."""
+        data_key = data_key or self.data_key(df, model.catalog)
+        path = self._features_path(data_key)
+        
+        if os.path.exists(path):
+            try:
+                with np.load(path) as data:
+                    X, y = data['X'], data['y']
+                    encoding = json.loads(str(data['encoding']))
+                model.set_encoding(EncodingTables(
+                    FrozenDict(encoding['crops']), FrozenDict(encoding['categories'])
+                ))
+                os.utime(path)
+                print(f"Reused cached feature matrix {data_key} ({len(X):,} rows)")
+                return X, y
+            except Exception as e:
+                print(f"Feature cache entry {data_key} unusable, rebuilding: {e}")
+        
+        X, y = model.prepare_features(df)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path[:-len('.npz')]}.tmp-{os.getpid()}.npz"
+        np.savez(tmp_path, X=X, y=y, encoding=np.array(json.dumps({
+            'crops': dict(model.encoding.crops),
+            'categories': dict(model.encoding.categories)
+        })))
+        os.replace(tmp_path, path)
+        self.prune()
+        return X, y
+    
+    def entries(self) -> List[Tuple[float, int, str]]:
+        """(last used, bytes, path) of every cache entry, oldest first."""
+        entries = []
+        for kind in ('models', 'features'):
+            root = os.path.join(self.cache_dir, kind)
+            if not os.path.isdir(root):
+                continue
+            for name in os.listdir(root):
+                if '.tmp-' in name:
+                    continue
+                path = os.path.join(root, name)
+                if os.path.isdir(path):
+                    size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+                else:
+                    size = os.path.getsize(path)
+                entries.append((os.path.getmtime(path), size, path))
+        return sorted(entries)
+    
+    def prune(self):
+        """Remove least recently used entries until the cache fits in ``max_bytes``."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
+            total -= size
+            print(f"Training cache evicted {os.path.basename(path)}")
+    
+    def _model_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, 'models', key)
+    
+    def _features_path(self, data_key: str) -> str:
+        return os.path.join(self.cache_dir, 'features', f'{data_key}.npz')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Inspect or empty the training cache')
+    parser.add_argument('--clear', action='store_true', help='delete every cached model and feature matrix')
+    args = parser.parse_args()
+    
+    cache = TrainingCache()
+    if args.clear:
+        shutil.rmtree(cache.cache_dir, ignore_errors=True)
+        print(f"Cleared {cache.cache_dir}")
+    else:
+        entries = cache.entries()
+        for _, size, path in entries:
+            print(f"  {os.path.relpath(path, cache.cache_dir):45s} {size / 2**20:10.1f} MiB")
+        print(f"{len(entries)} entries, {sum(s for _, s, _ in entries) / 2**20:.1f} MiB "
+              f"of {cache.max_bytes / 2**20:.0f} MiB in {cache.cache_dir}")
@@ -7,10 +7,13 @@ import RiskGauge from '@/components/RiskGauge';
 import EnvironmentalDataCard from '@/components/EnvironmentalDataCard';
 import RecommendationCard from '@/components/RecommendationCard';
 import FactorChart from '@/components/FactorChart';
+import AIExplainer from '@/components/AIExplainer';
 import DarkModeToggle from '@/components/DarkModeToggle';
 import FormulaValidation from '@/components/FormulaValidation';
 import AdvancedAnalytics from '@/components/AdvancedAnalytics';
 import WeatherForecast from '@/components/WeatherForecast';
+import RiskHeatmap from '@/components/RiskHeatmap';
+import RealTimeDataStream from '@/components/RealTimeDataStream';
 import { useRiskAssessment } from '@/hooks/useRiskAssessment';
 import { Location, RiskAssessment, FarmBoundary } from '@/types';
 import { apiClient } from '@/lib/api';
@@ -185,6 +188,11 @@ export default function Home() {
                   optimalRanges={assessment.optimal_ranges}
                 />
               )}
+
+              {/* Live environmental data for the selected location */}
+              {location && (
+                <RealTimeDataStream location={`${location.lat},${location.lon}`} />
+              )}
             </div>
           </div>
           
@@ -242,14 +250,35 @@ export default function Home() {
                 <FactorChart
                   factorRisks={assessment.factor_risks}
                   weights={assessment.formula_weights}
+                  contributions={assessment.factor_contributions}
                 />
               </div>
 
+              {/* Model explanation for this field (ML predictions only) */}
+              {assessment.factor_contributions && (
+                <div className="mb-4">
+                  <AIExplainer
+                    weights={assessment.formula_weights}
+                    contributions={assessment.factor_contributions}
+                    baselineRisk={assessment.baseline_risk}
+                    cropContribution={assessment.crop_contribution}
+                    riskScore={assessment.risk_score}
+                  />
+                </div>
+              )}
+
               {/* Fourth Row: Recommendations - Full Width */}
               <div className="mb-4">
                 <RecommendationCard recommendations={assessment.recommendations} />
               </div>
 
+              {/* Gridded risk around the assessed location */}
+              {location && (
+                <div className="mb-4">
+                  <RiskHeatmap crop={assessment.crop} location={location} />
+                </div>
+              )}
+
               {/* Fifth Row: Advanced Analytics & Weather Side-by-Side */}
               <div className="grid grid-cols-1 xl:grid-cols-2 gap-4 mb-4">
                 <AdvancedAnalytics />
@@ -3,17 +3,39 @@
 import { useState } from 'react';
 import { CpuChipIcon, LightBulbIcon, AdjustmentsHorizontalIcon } from '@heroicons/react/24/outline';
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, PieChart, Pie, Cell } from 'recharts';
+import { AIExplainerProps } from '@/types';
 
-export default function AIExplainer() {
+const FACTOR_LABELS: Record<string, string> = {
+  temperature: 'Temperature',
+  moisture: 'Soil Moisture',
+  ndvi: 'NDVI',
+  humidity: 'Humidity',
+  rainfall: 'Rainfall',
+};
+
+const formatContribution = (value: number) =>
+  `${value >= 0 ? '+' : ''}${Math.round(value * 1000) / 10}%`;
+
+export default function AIExplainer({ weights, contributions, baselineRisk, cropContribution, riskScore }: AIExplainerProps = {}) {
   const [activeScenario, setActiveScenario] = useState('current');
 
-  // Feature importance data
-  const featureImportance = [
-    { feature: 'Temperature', importance: 0.35, contribution: '+28%' },
-    { feature: 'Soil Moisture', importance: 0.28, contribution: '-12%' },
-    { feature: 'NDVI', importance: 0.22, contribution: '-8%' },
-    { feature: 'Humidity', importance: 0.15, contribution: '+6%' },
-  ];
+  // Feature importance data; with an assessment, contributions are this field's own
+  const featureImportance = contributions
+    ? Object.entries(contributions)
+        .map(([factor, value]) => ({
+          feature: FACTOR_LABELS[factor] || factor,
+          importance: Math.round((weights?.[factor] || 0) * 100) / 100,
+          contribution: formatContribution(value),
+          value,
+        }))
+        .sort((a, b) => Math.abs(b.value) - Math.abs(a.value))
+    : [
+        { feature: 'Temperature', importance: 0.35, contribution: '+28%', value: 0.28 },
+        { feature: 'Soil Moisture', importance: 0.28, contribution: '-12%', value: -0.12 },
+        { feature: 'NDVI', importance: 0.22, contribution: '-8%', value: -0.08 },
+        { feature: 'Humidity', importance: 0.15, contribution: '+6%', value: 0.06 },
+      ];
+  const topDriver = featureImportance.reduce((top, item) => (item.value > top.value ? item : top));
 
   // Decision path visualization
   const decisionPath = [
@@ -31,7 +53,7 @@ export default function AIExplainer() {
       moisture: 0.35,
       ndvi: 0.52,
       humidity: 65,
-      riskScore: 72,
+      riskScore: riskScore !== undefined ? Math.round(riskScore * 100) : 72,
       confidence: 0.89
     },
     optimized: {
@@ -56,14 +78,24 @@ export default function AIExplainer() {
 
   const currentScenario = scenarios[activeScenario as keyof typeof scenarios];
 
-  // SHAP-like values (simplified)
-  const shapValues = [
-    { factor: 'Temperature', value: 0.18, color: '#ef4444' },
-    { factor: 'Soil Moisture', value: -0.08, color: '#10b981' },
-    { factor: 'NDVI', value: -0.05, color: '#10b981' },
-    { factor: 'Humidity', value: 0.03, color: '#ef4444' },
-    { factor: 'Base Risk', value: 0.42, color: '#6b7280' },
-  ];
+  // Decision-path contributions: base risk plus each factor's shift sums to the prediction
+  const shapValues = contributions && baselineRisk !== undefined
+    ? [
+        ...featureImportance.map(item => ({
+          factor: item.feature,
+          value: item.value,
+          color: item.value > 0 ? '#ef4444' : '#10b981',
+        })),
+        { factor: 'Crop', value: cropContribution || 0, color: '#3b82f6' },
+        { factor: 'Base Risk', value: baselineRisk, color: '#6b7280' },
+      ]
+    : [
+        { factor: 'Temperature', value: 0.18, color: '#ef4444' },
+        { factor: 'Soil Moisture', value: -0.08, color: '#10b981' },
+        { factor: 'NDVI', value: -0.05, color: '#10b981' },
+        { factor: 'Humidity', value: 0.03, color: '#ef4444' },
+        { factor: 'Base Risk', value: 0.42, color: '#6b7280' },
+      ];
 
   const COLORS = ['#ef4444', '#f59e0b', '#10b981', '#3b82f6', '#8b5cf6'];
 
@@ -194,7 +226,11 @@ export default function AIExplainer() {
         <div className="space-y-1 text-xs text-gray-700 dark:text-gray-300">
           <div className="flex items-start gap-1">
             <span className="text-red-500">•</span>
-            <span>Temperature is primary risk driver</span>
+            <span>
+              {topDriver.value > 0
+                ? `${topDriver.feature} is primary risk driver (${topDriver.contribution})`
+                : 'No factor is raising risk above the baseline'}
+            </span>
           </div>
           <div className="flex items-start gap-1">
             <span className="text-green-500">•</span>
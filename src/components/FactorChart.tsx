@@ -3,7 +3,7 @@
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, Cell } from 'recharts';
 import { FactorChartProps } from '@/types';
 
-export default function FactorChart({ factorRisks, weights }: FactorChartProps) {
+export default function FactorChart({ factorRisks, weights, contributions }: FactorChartProps) {
   // Handle undefined/null values
   if (!factorRisks || !weights) {
     return (
@@ -20,6 +20,8 @@ export default function FactorChart({ factorRisks, weights }: FactorChartProps)
     factor: factor.charAt(0).toUpperCase() + factor.slice(1),
     risk: Math.round((risk || 0) * 100),
     weight: Math.round((weights[factor] || 0) * 100),
+    // Percentage points this factor moved the model's prediction for this field
+    contribution: contributions ? Math.round((contributions[factor] || 0) * 1000) / 10 : null,
   }));
 
   const getBarColor = (risk: number) => {
@@ -102,7 +104,16 @@ export default function FactorChart({ factorRisks, weights }: FactorChartProps)
                 }`}>
                   {item.risk}%
                 </span>
-                <span className="text-gray-600 dark:text-gray-400">W:{item.weight}%</span>
+                {item.contribution !== null ? (
+                  <span
+                    className={item.contribution > 0 ? 'text-red-600 dark:text-red-400' : 'text-green-600 dark:text-green-400'}
+                    title="Effect on this field's predicted risk"
+                  >
+                    {item.contribution > 0 ? '+' : ''}{item.contribution}pt
+                  </span>
+                ) : (
+                  <span className="text-gray-600 dark:text-gray-400">W:{item.weight}%</span>
+                )}
               </div>
             </div>
           ))}
@@ -2,29 +2,56 @@
 
 import { useState, useEffect } from 'react';
 import { SignalIcon, CloudIcon, GlobeAltIcon } from '@heroicons/react/24/outline';
+import { apiClient } from '@/lib/api';
 
-export default function RealTimeDataStream() {
+// Streamed fields and where each one comes from
+const STREAM_METRICS: Record<string, { metric: string; source: string }> = {
+  temperature: { metric: 'Temperature', source: 'Weather API' },
+  humidity: { metric: 'Humidity', source: 'Weather API' },
+  soil_moisture: { metric: 'Soil Moisture', source: 'Ground Sensors' },
+  ndvi: { metric: 'NDVI', source: 'Sentinel-2' },
+  rainfall_index: { metric: 'Rainfall Index', source: 'Weather API' },
+};
+
+interface RealTimeDataStreamProps {
+  location?: string;
+}
+
+export default function RealTimeDataStream({ location }: RealTimeDataStreamProps) {
   const [dataPoints, setDataPoints] = useState<any[]>([]);
   const [isLive, setIsLive] = useState(true);
 
   useEffect(() => {
-    if (!isLive) return;
+    if (!isLive || !location) return;
+
+    // The server pushes a full snapshot first, then only the fields that changed
+    const source = apiClient.streamEnvironmentalData(location);
+
+    const handleFields = (fields: Record<string, any>) => {
+      const timestamp = new Date().toLocaleTimeString();
+      const newDataPoints = Object.entries(fields)
+        .filter(([key, value]) => key in STREAM_METRICS && typeof value === 'number')
+        .map(([key, value]) => ({
+          id: `${Date.now()}-${key}`,
+          timestamp,
+          source: STREAM_METRICS[key].source,
+          metric: STREAM_METRICS[key].metric,
+          value: (value as number).toFixed(key === 'temperature' || key === 'humidity' ? 1 : 2),
+          status: 'received',
+        }));
 
-    const interval = setInterval(() => {
-      const newDataPoint = {
-        id: Date.now(),
-        timestamp: new Date().toLocaleTimeString(),
-        source: ['Weather API', 'Sentinel-2', 'Ground Sensors'][Math.floor(Math.random() * 3)],
-        metric: ['Temperature', 'NDVI', 'Soil Moisture', 'Humidity'][Math.floor(Math.random() * 4)],
-        value: (Math.random() * 100).toFixed(1),
-        status: 'received',
-      };
+      setDataPoints((prev) => [...newDataPoints, ...prev].slice(0, 8));
+    };
 
-      setDataPoints((prev) => [newDataPoint, ...prev].slice(0, 8));
-    }, 3000);
+    source.addEventListener('snapshot', (event) => {
+      handleFields(JSON.parse((event as MessageEvent).data));
+    });
+    source.addEventListener('update', (event) => {
+      handleFields(JSON.parse((event as MessageEvent).data).changed);
+    });
 
-    return () => clearInterval(interval);
-  }, [isLive]);
+    return () => source.close();
+  }, [isLive, location]);
 
   const getSourceIcon = (source: string) => {
     if (source.includes('Weather')) return <CloudIcon className="w-4 h-4" />;
@@ -50,7 +77,7 @@ export default function RealTimeDataStream() {
       <div className="space-y-2 max-h-96 overflow-y-auto">
         {dataPoints.length === 0 ? (
           <div className="text-center py-8 text-gray-500 dark:text-gray-400 text-sm">
-            {isLive ? 'Waiting for data...' : 'Paused'}
+            {!location ? 'Select a location to stream data' : isLive ? 'Waiting for data...' : 'Paused'}
           </div>
         ) : (
           dataPoints.map((point) => (
@@ -1,29 +1,89 @@
 'use client';
 
-import { useState } from 'react';
+import { useState, useEffect } from 'react';
 import { MapPinIcon, EyeIcon } from '@heroicons/react/24/outline';
+import { apiClient } from '@/lib/api';
+import { Location } from '@/types';
 
-export default function RiskHeatmap() {
-  const [selectedDistrict, setSelectedDistrict] = useState<string | null>(null);
-
-  // Simulated district risk data
-  const districtData = [
-    { name: 'Ludhiana', risk: 72, color: 'bg-red-500', position: 'top-4 left-8' },
-    { name: 'Amritsar', risk: 45, color: 'bg-yellow-500', position: 'top-2 left-4' },
-    { name: 'Jalandhar', risk: 38, color: 'bg-green-500', position: 'top-6 left-12' },
-    { name: 'Patiala', risk: 68, color: 'bg-red-500', position: 'top-8 left-6' },
-    { name: 'Bathinda', risk: 55, color: 'bg-yellow-500', position: 'top-12 left-8' },
-    { name: 'Mohali', risk: 32, color: 'bg-green-500', position: 'top-4 left-14' },
-    { name: 'Hoshiarpur', risk: 41, color: 'bg-yellow-500', position: 'top-6 left-16' },
-    { name: 'Kapurthala', risk: 29, color: 'bg-green-500', position: 'top-8 left-10' },
-  ];
+// Zoom level and cells per side of the tile drawn around the location
+const TILE_ZOOM = 8;
+const TILE_SIZE = 32;
 
+interface RiskHeatmapProps {
+  crop: string;
+  location: Location;
+}
+
+interface SelectedCell {
+  row: number;
+  col: number;
+}
+
+// XYZ (Web Mercator) tile containing a point
+const tileForLocation = (location: Location, z: number) => {
+  const n = 2 ** z;
+  const latRad = (location.lat * Math.PI) / 180;
+  const x = Math.floor(((location.lon + 180) / 360) * n);
+  const y = Math.floor(((1 - Math.log(Math.tan(latRad) + 1 / Math.cos(latRad)) / Math.PI) / 2) * n);
+  return {
+    x: Math.min(Math.max(x, 0), n - 1),
+    y: Math.min(Math.max(y, 0), n - 1),
+  };
+};
+
+export default function RiskHeatmap({ crop, location }: RiskHeatmapProps) {
+  const [grid, setGrid] = useState<any>(null);
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState<string | null>(null);
+  const [selectedCell, setSelectedCell] = useState<SelectedCell | null>(null);
+
+  useEffect(() => {
+    if (!crop || !location) return;
+
+    let cancelled = false;
+    const { x, y } = tileForLocation(location, TILE_ZOOM);
+
+    setLoading(true);
+    setError(null);
+    setSelectedCell(null);
+    apiClient.getRiskTile(crop, TILE_ZOOM, x, y, TILE_SIZE)
+      .then((tile) => {
+        if (!cancelled) setGrid(tile);
+      })
+      .catch((err: Error) => {
+        if (!cancelled) setError(err.message);
+      })
+      .finally(() => {
+        if (!cancelled) setLoading(false);
+      });
+
+    return () => {
+      cancelled = true;
+    };
+  }, [crop, location?.lat, location?.lon]);
+
+  // Same bands as the backend's risk levels
   const getRiskLevel = (risk: number) => {
     if (risk >= 60) return 'High Risk';
-    if (risk >= 40) return 'Medium Risk';
+    if (risk >= 30) return 'Medium Risk';
     return 'Low Risk';
   };
 
+  const getRiskColor = (risk: number) => {
+    if (risk >= 60) return 'bg-red-500';
+    if (risk >= 30) return 'bg-yellow-500';
+    return 'bg-green-500';
+  };
+
+  const cells: number[] = grid ? grid.risk_scores.flat().map((score: number) => Math.round(score * 100)) : [];
+
+  const selected = grid && selectedCell ? {
+    risk: Math.round(grid.risk_scores[selectedCell.row][selectedCell.col] * 100),
+    lat: grid.lats[selectedCell.row],
+    lon: grid.lons[selectedCell.col],
+    factor: grid.factors[grid.weakest_factor[selectedCell.row][selectedCell.col]],
+  } : null;
+
   return (
     <div className="card">
       <div className="mb-4">
@@ -32,28 +92,41 @@ export default function RiskHeatmap() {
           Regional Risk Heatmap
         </h3>
         <p className="text-sm text-gray-600 dark:text-gray-400">
-          Interactive map showing risk levels across different districts
+          {crop} risk across the surrounding area ({TILE_SIZE}×{TILE_SIZE} cells)
         </p>
       </div>
 
       {/* Map Container */}
       <div className="relative bg-gradient-to-br from-green-100 to-blue-100 dark:from-green-900/20 dark:to-blue-900/20 rounded-lg h-64 mb-4 overflow-hidden border-2 border-gray-200 dark:border-gray-600">
-        {/* Simulated Map Background */}
-        <div className="absolute inset-0 bg-gradient-to-br from-green-50 to-blue-50 dark:from-gray-800 dark:to-gray-700"></div>
-        
-        {/* District Markers */}
-        {districtData.map((district) => (
+        {grid && (
           <div
-            key={district.name}
-            className={`absolute ${district.position} transform -translate-x-1/2 -translate-y-1/2 cursor-pointer transition-all duration-200 hover:scale-110`}
-            onClick={() => setSelectedDistrict(selectedDistrict === district.name ? null : district.name)}
+            className="absolute inset-0 grid"
+            style={{
+              gridTemplateColumns: `repeat(${grid.cols}, 1fr)`,
+              gridTemplateRows: `repeat(${grid.rows}, 1fr)`,
+            }}
           >
-            <div className={`w-4 h-4 ${district.color} rounded-full border-2 border-white shadow-lg animate-pulse`}></div>
-            <div className="absolute top-5 left-1/2 transform -translate-x-1/2 bg-black/80 text-white text-xs px-2 py-1 rounded whitespace-nowrap">
-              {district.name}: {district.risk}%
-            </div>
+            {cells.map((risk, i) => {
+              const row = Math.floor(i / grid.cols);
+              const col = i % grid.cols;
+              const isSelected = selectedCell?.row === row && selectedCell?.col === col;
+              return (
+                <div
+                  key={i}
+                  className={`${getRiskColor(risk)} cursor-pointer ${isSelected ? 'opacity-100 ring-2 ring-white' : 'opacity-70 hover:opacity-100'}`}
+                  title={`${risk}%`}
+                  onClick={() => setSelectedCell(isSelected ? null : { row, col })}
+                />
+              );
+            })}
+          </div>
+        )}
+
+        {(loading || error) && (
+          <div className="absolute inset-0 flex items-center justify-center text-sm text-gray-600 dark:text-gray-300">
+            {loading ? 'Loading risk map...' : error}
           </div>
-        ))}
+        )}
 
         {/* Legend */}
         <div className="absolute bottom-2 left-2 bg-white/90 dark:bg-gray-800/90 p-2 rounded-lg text-xs">
@@ -64,51 +137,45 @@ export default function RiskHeatmap() {
           </div>
           <div className="flex items-center gap-1 mb-1">
             <div className="w-3 h-3 bg-yellow-500 rounded-full"></div>
-            <span>Medium (40-59%)</span>
+            <span>Medium (30-59%)</span>
           </div>
           <div className="flex items-center gap-1">
             <div className="w-3 h-3 bg-green-500 rounded-full"></div>
-            <span>Low (&lt;40%)</span>
+            <span>Low (&lt;30%)</span>
           </div>
         </div>
       </div>
 
-      {/* District Details */}
-      {selectedDistrict && (
+      {/* Cell Details */}
+      {selected && (
         <div className="p-4 bg-blue-50 dark:bg-blue-900/20 rounded-lg border border-blue-200 dark:border-blue-700">
           <h4 className="font-semibold text-blue-900 dark:text-blue-100 mb-2 flex items-center gap-2">
             <EyeIcon className="w-4 h-4" />
-            {selectedDistrict} District Analysis
+            {selected.lat.toFixed(3)}, {selected.lon.toFixed(3)}
           </h4>
-          {(() => {
-            const district = districtData.find(d => d.name === selectedDistrict);
-            if (!district) return null;
-            return (
-              <div className="grid grid-cols-2 gap-4 text-sm">
-                <div>
-                  <div className="text-blue-800 dark:text-blue-200 font-medium">Risk Score:</div>
-                  <div className="text-lg font-bold">{district.risk}%</div>
-                </div>
-                <div>
-                  <div className="text-blue-800 dark:text-blue-200 font-medium">Risk Level:</div>
-                  <div className={`font-semibold ${
-                    district.risk >= 60 ? 'text-red-600' :
-                    district.risk >= 40 ? 'text-yellow-600' : 'text-green-600'
-                  }`}>
-                    {getRiskLevel(district.risk)}
-                  </div>
-                </div>
-                <div>
-                  <div className="text-blue-800 dark:text-blue-200 font-medium">Primary Factors:</div>
-                  <div className="text-xs">Temperature, Soil Moisture</div>
-                </div>
-                <div>
-                  <div className="text-blue-800 dark:text-blue-200 font-medium">Affected Area:</div>
-                  <div className="text-xs">~{Math.round(district.risk * 10)} km²</div>
-                </div>
+          <div className="grid grid-cols-2 gap-4 text-sm">
+            <div>
+              <div className="text-blue-800 dark:text-blue-200 font-medium">Risk Score:</div>
+              <div className="text-lg font-bold">{selected.risk}%</div>
+            </div>
+            <div>
+              <div className="text-blue-800 dark:text-blue-200 font-medium">Risk Level:</div>
+              <div className={`font-semibold ${
+                selected.risk >= 60 ? 'text-red-600' :
+                selected.risk >= 30 ? 'text-yellow-600' : 'text-green-600'
+              }`}>
+                {getRiskLevel(selected.risk)}
               </div>
-            );
-          })()}
+            </div>
+            <div>
+              <div className="text-blue-800 dark:text-blue-200 font-medium">Primary Factor:</div>
+              <div className="text-xs capitalize">{selected.factor}</div>
+            </div>
+            <div>
+              <div className="text-blue-800 dark:text-blue-200 font-medium">Scoring:</div>
+              <div className="text-xs">{grid.scoring === 'ml' ? `Model ${grid.model_version}` : 'Rule-based'}</div>
+            </div>
+          </div>
         </div>
       )}
 
@@ -116,21 +183,21 @@ export default function RiskHeatmap() {
       <div className="mt-4 grid grid-cols-3 gap-4 text-center">
         <div className="p-3 bg-red-50 dark:bg-red-900/20 rounded-lg">
           <div className="text-2xl font-bold text-red-600 dark:text-red-400">
-            {districtData.filter(d => d.risk >= 60).length}
+            {cells.filter(risk => risk >= 60).length}
           </div>
-          <div className="text-xs text-red-700 dark:text-red-300">High Risk Districts</div>
+          <div className="text-xs text-red-700 dark:text-red-300">High Risk Cells</div>
         </div>
         <div className="p-3 bg-yellow-50 dark:bg-yellow-900/20 rounded-lg">
           <div className="text-2xl font-bold text-yellow-600 dark:text-yellow-400">
-            {districtData.filter(d => d.risk >= 40 && d.risk < 60).length}
+            {cells.filter(risk => risk >= 30 && risk < 60).length}
           </div>
-          <div className="text-xs text-yellow-700 dark:text-yellow-300">Medium Risk Districts</div>
+          <div className="text-xs text-yellow-700 dark:text-yellow-300">Medium Risk Cells</div>
         </div>
         <div className="p-3 bg-green-50 dark:bg-green-900/20 rounded-lg">
           <div className="text-2xl font-bold text-green-600 dark:text-green-400">
-            {districtData.filter(d => d.risk < 40).length}
+            {cells.filter(risk => risk < 30).length}
           </div>
-          <div className="text-xs text-green-700 dark:text-green-300">Low Risk Districts</div>
+          <div className="text-xs text-green-700 dark:text-green-300">Low Risk Cells</div>
         </div>
       </div>
     </div>
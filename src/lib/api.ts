@@ -98,6 +98,12 @@ export const apiClient = {
     }
   },
 
+  // Open a server-sent event stream of live environmental data for a location
+  streamEnvironmentalData(location: string): EventSource {
+    const params = new URLSearchParams({ location });
+    return new EventSource(`${API_BASE_URL}/environmental-data/stream?${params}`);
+  },
+
   // Assess crop risk
   async assessRisk(data: {
     location: string;
@@ -117,6 +123,42 @@ export const apiClient = {
     }
   },
 
+  // Rank every crop by risk at one location
+  async getCropSuitability(location: string): Promise<any> {
+    try {
+      const response = await api.get('/crop-suitability', {
+        params: { location }
+      });
+      return response.data;
+    } catch (error: any) {
+      throw new Error(`Failed to fetch crop suitability: ${error.message}`);
+    }
+  },
+
+  // Get gridded risk for a crop over a bounding box (minLon,minLat,maxLon,maxLat)
+  async getRiskGrid(crop: string, bbox: number[], resolution: number = 50): Promise<any> {
+    try {
+      const response = await api.get('/risk-grid', {
+        params: { crop, bbox: bbox.join(','), resolution }
+      });
+      return response.data;
+    } catch (error: any) {
+      throw new Error(`Failed to fetch risk grid: ${error.message}`);
+    }
+  },
+
+  // Get a cached risk tile for map overlays
+  async getRiskTile(crop: string, z: number, x: number, y: number, size: number = 64): Promise<any> {
+    try {
+      const response = await api.get(`/risk-tiles/${crop}/${z}/${x}/${y}`, {
+        params: { size }
+      });
+      return response.data;
+    } catch (error: any) {
+      throw new Error(`Failed to fetch risk tile: ${error.message}`);
+    }
+  },
+
   // Get crop information
   async getCropInfo(crop: string): Promise<CropInfo> {
     try {
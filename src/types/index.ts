@@ -30,6 +30,10 @@ export interface RiskAssessment {
   risk_score: number;
   risk_level: 'Low Risk' | 'Medium Risk' | 'High Risk';
   formula_weights: Record<string, number>;
+  model_version?: string | null;
+  baseline_risk?: number; // Model's average risk before this field's conditions
+  factor_contributions?: Record<string, number>; // Per-factor shift from baseline_risk
+  crop_contribution?: number;
   current_values: EnvironmentalData;
   environmental_data?: EnvironmentalData; // Optional environmental data
   factor_risks: Record<string, number>;
@@ -108,6 +112,15 @@ export interface RecommendationCardProps {
 export interface FactorChartProps {
   factorRisks: Record<string, number>;
   weights: Record<string, number>;
+  contributions?: Record<string, number>;
+}
+
+export interface AIExplainerProps {
+  weights?: Record<string, number>;
+  contributions?: Record<string, number>;
+  baselineRisk?: number;
+  cropContribution?: number;
+  riskScore?: number;
 }
 
 export interface LocationSelectorProps {